@@ -0,0 +1,172 @@
+import io
+import os
+
+from analyzer.registry import get_analyzer
+
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".c": "c",
+    ".h": "c",
+    ".cpp": "cpp",
+    ".cc": "cpp",
+    ".cxx": "cpp",
+    ".hpp": "cpp",
+    ".java": "java"
+}
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def language_for(filename):
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(filename)[1].lower())
+
+
+def is_archive(filename):
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+# ============================================================
+# Per-file analysis (runs inside a worker process)
+# ============================================================
+
+def analyze_file(filename, language, code):
+    try:
+        result = get_analyzer(language)(code)
+    except SyntaxError as e:
+        return {"file": filename, "language": language, "error": f"Syntax error: {e.msg} (line {e.lineno})"}
+    except Exception as e:
+        return {"file": filename, "language": language, "error": str(e)}
+
+    return {"file": filename, "language": language, "result": result}
+
+
+# ============================================================
+# Archive extraction
+# ============================================================
+# Runs off the event loop (see collect_sources). The file count and the
+# decompressed size are checked member by member, so an archive bomb is
+# rejected after reading at most the budget, not after inflating it all.
+
+class BatchLimitError(ValueError):
+    pass
+
+
+class _Budget:
+    __slots__ = ("files", "bytes", "max_files", "max_bytes")
+
+    def __init__(self, max_files, max_bytes):
+        self.files = 0
+        self.bytes = 0
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+
+    def add_file(self):
+        self.files += 1
+        if self.files > self.max_files:
+            raise BatchLimitError(f"Batch has more than {self.max_files} files")
+
+    def add_bytes(self, size):
+        self.bytes += size
+        if self.bytes > self.max_bytes:
+            raise BatchLimitError(f"Batch has more than {self.max_bytes} bytes of source")
+
+
+def iter_archive(filename, data, max_file_bytes, budget):
+    # Yields (member name, source text) for supported source files.
+    # Members over max_file_bytes are reported with text None; they count
+    # toward the file limit like the rest.
+    if filename.lower().endswith(".zip"):
+        import zipfile
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or language_for(info.filename) is None:
+                    continue
+                budget.add_file()
+                if info.file_size > max_file_bytes:
+                    yield info.filename, None
+                    continue
+                budget.add_bytes(info.file_size)
+                yield info.filename, archive.read(info).decode(errors="replace")
+        return
+
+    import tarfile
+
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+        for member in archive:
+            # A compressed tar inflates every member on the way to the
+            # next one, sources or not
+            budget.add_bytes(member.size)
+            if not member.isfile() or language_for(member.name) is None:
+                continue
+            budget.add_file()
+            if member.size > max_file_bytes:
+                yield member.name, None
+                continue
+            yield member.name, archive.extractfile(member).read().decode(errors="replace")
+
+
+def collect_sources(uploads, max_files, max_file_bytes, max_total_bytes):
+    # uploads: [(filename, bytes)] -> (sources, skipped), where sources
+    # are (name, language, text) and skipped are error entries. Raises
+    # BatchLimitError once the batch is over max_files or max_total_bytes.
+    budget = _Budget(max_files, max_total_bytes)
+    sources = []
+    skipped = []
+
+    for name, data in uploads:
+        if is_archive(name):
+            try:
+                for member, text in iter_archive(name, data, max_file_bytes, budget):
+                    if text is None:
+                        skipped.append({"file": member, "error": "File too large"})
+                    else:
+                        sources.append((member, language_for(member), text))
+            except BatchLimitError:
+                raise
+            except Exception as e:
+                skipped.append({"file": name, "error": f"Unreadable archive: {e}"})
+
+        elif language_for(name) is None:
+            skipped.append({"file": name, "error": "Unsupported file type"})
+
+        else:
+            budget.add_file()
+            if len(data) > max_file_bytes:
+                skipped.append({"file": name, "error": "File too large"})
+                continue
+            budget.add_bytes(len(data))
+            sources.append((name, language_for(name), data.decode(errors="replace")))
+
+    return sources, skipped
+
+
+# ============================================================
+# Aggregated summary
+# ============================================================
+
+def summarize(results):
+    analyzed = [entry for entry in results if "result" in entry]
+    languages = {}
+
+    for entry in results:
+        languages[entry["language"]] = languages.get(entry["language"], 0) + 1
+
+    scores = [entry["result"]["quality_score"] for entry in analyzed]
+    worst = sorted(analyzed, key=lambda entry: entry["result"]["quality_score"])[:5]
+
+    return {
+        "files": len(results),
+        "analyzed": len(analyzed),
+        "errors": len(results) - len(analyzed),
+        "languages": languages,
+        "average_quality_score": round(sum(scores) / len(scores), 2) if scores else None,
+        "max_loop_depth": max((entry["result"]["loop_depth"] for entry in analyzed), default=0),
+        "total_cyclomatic_complexity": sum(entry["result"]["cyclomatic_complexity"] for entry in analyzed),
+        "recursive_functions": sum(len(entry["result"]["recursive_functions"]) for entry in analyzed),
+        "lowest_quality_files": [
+            {"file": entry["file"], "quality_score": entry["result"]["quality_score"]}
+            for entry in worst
+        ]
+    }
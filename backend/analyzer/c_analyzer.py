@@ -1,64 +1,28 @@
-import re
+from bisect import bisect_left, bisect_right
 
-def analyze_c(code: str):
-
-    issues = []
-    recursive_functions = []
-    loop_depth = 0
-    max_depth = 0
-
-    lines = code.splitlines()
-    brace_stack = 0
-
-    # -------- LOOP DEPTH --------
-    for line in lines:
-        stripped = line.strip()
-
-        if re.search(r'\b(for|while)\b', stripped):
-            brace_stack += 1
-            max_depth = max(max_depth, brace_stack)
+from analyzer.clike_scanner import scan
 
-        if "}" in stripped and brace_stack > 0:
-            brace_stack -= 1
+# Sources above this many lines get the function-level CFG: one node per
+# source line stops being readable (and small) long before this
+MAX_LINE_CFG_LINES = 20000
 
-    loop_depth = max_depth
 
-    # -------- RECURSION --------
-    functions = re.findall(r'\b(int|void|float|double|char)\s+(\w+)\s*\(', code)
-
-    for _, fname in functions:
-        body = code.split(fname, 1)[-1]
-        if re.search(r'\b' + fname + r'\s*\(', body):
-            recursive_functions.append(fname)
-
-    # -------- CYCLOMATIC COMPLEXITY --------
-    complexity = 1
-    complexity += len(re.findall(r'\bif\b', code))
-    complexity += len(re.findall(r'\bfor\b', code))
-    complexity += len(re.findall(r'\bwhile\b', code))
-    complexity += len(re.findall(r'\bcase\b', code))
-    complexity += len(re.findall(r'&&|\|\|', code))
-
-    # -------- ISSUES --------
-    if loop_depth > 3:
-        issues.append("Deep nested loops")
-
-    if complexity > 15:
-        issues.append("High cyclomatic complexity")
+def analyze_c(code: str):
 
-    quality_score = max(
-        0,
-        100 - (complexity * 2) - (loop_depth * 5) - (len(issues) * 5)
-    )
+    # -------- LOOP DEPTH / RECURSION / COMPLEXITY (single pass) --------
+    summary = scan(code)
 
     # -------- SIMPLE CFG GENERATION --------
+    if code.count("\n") >= MAX_LINE_CFG_LINES:
+        return build_result(summary, function_cfg(summary))
+
     nodes = []
     edges = []
 
     node_id = 1
     prev_node = None
 
-    for i, line in enumerate(lines):
+    for i, line in enumerate(code.splitlines()):
         stripped = line.strip()
         if stripped:
             nodes.append({
@@ -78,16 +42,106 @@ def analyze_c(code: str):
 
     cfg = {
         "nodes": nodes,
-        "edges": edges
+        "edges": edges,
+        "functions": line_functions(nodes, summary)
+    }
+
+    return build_result(summary, cfg)
+
+
+def line_functions(nodes, summary):
+    # Position range of each function body in a per-line CFG (nodes in
+    # line order), in the shape of ControlFlowGraph.to_dict()'s. Lines
+    # outside every function (includes, globals, class headers) are
+    # listed as "<file>" ranges, so every node belongs to some entry.
+    linenos = [node["lineno"] for node in nodes]
+    functions = []
+
+    for name, stats in summary.stats.items():
+        first = bisect_left(linenos, stats.lineno)
+        last = bisect_right(linenos, stats.end_lineno) - 1
+        if first <= last:
+            functions.append({"name": name, "lineno": stats.lineno, "first": first, "last": last})
+
+    gaps = []
+    position = 0
+    for function in sorted(functions, key=lambda function: function["first"]):
+        if function["first"] > position:
+            gaps.append((position, function["first"] - 1))
+        position = max(position, function["last"] + 1)
+    if position < len(nodes):
+        gaps.append((position, len(nodes) - 1))
+
+    functions.extend(
+        {"name": "<file>", "lineno": linenos[first], "first": first, "last": last}
+        for first, last in gaps
+    )
+    functions.sort(key=lambda function: function["first"])
+    return functions
+
+
+def function_cfg(summary):
+    # Summarized CFG: one node per function body (its lines, loop nesting
+    # and decision points) and one edge per call between functions
+    # defined in the source
+    recursive = set(summary.recursive_functions)
+    ids = {}
+    nodes = []
+
+    for name, stats in summary.stats.items():
+        ids[name] = len(nodes) + 1
+        nodes.append({
+            "id": ids[name],
+            "label": name,
+            "lineno": stats.lineno,
+            "end_lineno": stats.end_lineno,
+            "loop_depth": stats.loop_depth,
+            "cyclomatic_complexity": 1 + stats.decision_points,
+            "recursive": name in recursive
+        })
+
+    edges = [
+        {"source": ids[caller], "target": ids[callee], "type": "call"}
+        for caller, callees in summary.call_graph().items()
+        for callee in callees
+    ]
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "summarized": True
     }
 
+
+def build_result(summary, cfg):
+    # Shared by the C, C++ and Java analyzers
+
+    issues = []
+
+    loop_depth = summary.loop_depth
+    recursive_functions = summary.recursive_functions
+    complexity = 1 + summary.decision_points
+
+    # -------- ISSUES --------
+    if loop_depth > 3:
+        issues.append("Deep nested loops")
+
+    if complexity > 15:
+        issues.append("High cyclomatic complexity")
+
+    quality_score = max(
+        0,
+        100 - (complexity * 2) - (loop_depth * 5) - (len(issues) * 5)
+    )
+
     return {
         "loop_depth": loop_depth,
         "recursive_functions": recursive_functions,
+        "call_graph": summary.call_graph(),
         "estimated_complexity": f"O(n^{loop_depth})" if loop_depth > 0 else "O(1)",
         "cyclomatic_complexity": complexity,
         "quality_score": quality_score,
         "issues": issues,
         "suggestions": ["Consider refactoring"] if issues else [],
         "cfg": cfg
-    }
\ No newline at end of file
+    }
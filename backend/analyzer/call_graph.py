@@ -0,0 +1,79 @@
+def strongly_connected_components(graph):
+    # Iterative Tarjan, O(V + E). `graph` maps node -> iterable of callees;
+    # callees that are not keys (library calls) are ignored.
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in graph:
+        if root in index_of:
+            continue
+
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, callees = work[-1]
+            advanced = False
+
+            for callee in callees:
+                if callee not in graph:
+                    continue
+
+                if callee not in index_of:
+                    index_of[callee] = lowlink[callee] = counter
+                    counter += 1
+                    stack.append(callee)
+                    on_stack.add(callee)
+                    work.append((callee, iter(graph[callee])))
+                    advanced = True
+                    break
+
+                if callee in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[callee])
+
+            if advanced:
+                continue
+
+            work.pop()
+
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def recursive_cycles(graph):
+    # Components that actually recurse: mutual recursion (size > 1)
+    # or a function that calls itself.
+    return [
+        component
+        for component in strongly_connected_components(graph)
+        if len(component) > 1 or component[0] in graph[component[0]]
+    ]
+
+
+def recursive_functions(graph):
+    recursive = set()
+    for component in recursive_cycles(graph):
+        recursive.update(component)
+
+    # Keep definition order (dicts preserve insertion order)
+    return [name for name in graph if name in recursive]
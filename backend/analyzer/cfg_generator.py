@@ -1,55 +1,314 @@
 import ast
-import networkx as nx
 
+from analyzer.cfg_graph import CFGFunction, ControlFlowGraph
+from analyzer.engine import AnalyzerPlugin
+
+
+MAX_LABEL_LENGTH = 60
+
+
+class CFGGenerator(AnalyzerPlugin):
+    # Basic-block control-flow graph builder.
+    #
+    # The module body and every function body get their own subgraph with
+    # an entry and an exit node. Straight-line statements are merged into
+    # one block; if/elif/else, loops (with break/continue and back edges),
+    # try/except/else/finally, with and match get branch nodes of their
+    # own. Only statements are visited, so the build is linear in the
+    # size of the tree.
+    #
+    # Every builder takes the "frontier" - the nodes whose fallthrough
+    # reaches the next statement - and returns the new frontier. An empty
+    # frontier means the following code is unreachable.
 
-class CFGGenerator(ast.NodeVisitor):
     def __init__(self, source_code):
-        self.graph = nx.DiGraph()
-        self.node_count = 0
-        self.previous_node = None
+        self.graph = ControlFlowGraph()
         self.source_lines = source_code.split("\n")
 
-    # ---- Helper to add nodes ----
-    def add_node(self, label, lineno=None):
-        node_id = f"node_{self.node_count}"
+        self.open_block = None          # plain block that can absorb the next statement
+        self.exit_node = None
+        self.loops = []                 # (header, break_sources)
+        self.handlers = []              # handler entry nodes of enclosing try blocks
+        self.pending_functions = []     # (def node, line offset) found in the current body
+
+        # Added to every AST line number; lets incremental analysis reuse
+        # statements parsed when they sat at a different line.
+        self.line_offset = 0
+
+    # ---- Node helpers ----
+
+    def label(self, node):
+        line = self.source_lines[node.lineno + self.line_offset - 1].strip()
+        if len(line) > MAX_LABEL_LENGTH:
+            return line[:MAX_LABEL_LENGTH - 3] + "..."
+        return line
+
+    def header_end(self, node):
+        # Last line before the body starts (multi-line conditions/signatures)
+        body = getattr(node, "body", None)
+        end = max(node.lineno, body[0].lineno - 1) if body else node.lineno
+        return end + self.line_offset
 
-        self.graph.add_node(
-            node_id,
-            label=label,
-            lineno=lineno
+    def add_node(self, label, node, end_lineno=None):
+        offset = self.line_offset
+        return self.graph.add_node(
+            label,
+            node.lineno + offset,
+            end_lineno if end_lineno is not None else node.lineno + offset
         )
 
-        if self.previous_node:
-            self.graph.add_edge(self.previous_node, node_id)
+    def add_header(self, node, frontier):
+        # Branching statements own a node covering just their header lines
+        header = self.add_node(self.label(node), node, self.header_end(node))
+        self.link(frontier, header)
+        self.open_block = None
+        return header
+
+    def link(self, sources, target):
+        for source in sources:
+            self.graph.add_edge(source, target)
+
+    # ---- Statement dispatch ----
+
+    def build(self, statements, frontier):
+        for statement in statements:
+            handler = getattr(self, "build_" + type(statement).__name__, self.build_simple)
+            frontier = handler(statement, frontier)
+        return frontier
+
+    def build_simple(self, node, frontier, end_lineno=None):
+        open_block = self.open_block
+        end_lineno = end_lineno or node.end_lineno + self.line_offset
+
+        # Single fallthrough from the open block: extend it
+        if open_block is not None and len(frontier) == 1 and frontier[0] == open_block:
+            self.graph.nodes[open_block].end_lineno = end_lineno
+            return frontier
+
+        block = self.add_node(self.label(node), node, end_lineno)
+        self.link(frontier, block)
+        self.open_block = block
+        return [block]
+
+    def terminate(self, node, frontier, targets):
+        frontier = self.build_simple(node, frontier)
+        for target in targets:
+            self.link(frontier, target)
+        self.open_block = None
+        return []
+
+    # ---- Jumps ----
+
+    def build_Return(self, node, frontier):
+        return self.terminate(node, frontier, [self.exit_node])
+
+    def build_Raise(self, node, frontier):
+        targets = self.handlers[-1] if self.handlers and self.handlers[-1] else [self.exit_node]
+        return self.terminate(node, frontier, targets)
+
+    def build_Break(self, node, frontier):
+        if not self.loops:
+            return self.build_simple(node, frontier)
+
+        frontier = self.build_simple(node, frontier)
+        self.loops[-1][1].extend(frontier)
+        self.open_block = None
+        return []
+
+    def build_Continue(self, node, frontier):
+        if not self.loops:
+            return self.build_simple(node, frontier)
+
+        return self.terminate(node, frontier, [self.loops[-1][0]])
+
+    # ---- Branches ----
+
+    def build_If(self, node, frontier):
+        header = self.add_header(node, frontier)
+
+        body = self.build(node.body, [header])
+
+        self.open_block = None
+        orelse = self.build(node.orelse, [header]) if node.orelse else [header]
+
+        return body + orelse
+
+    def build_While(self, node, frontier):
+        header = self.add_header(node, frontier)
+        always_true = isinstance(node.test, ast.Constant) and bool(node.test.value)
+        return self.build_loop(node, header, exits=[] if always_true else [header])
+
+    def build_For(self, node, frontier):
+        header = self.add_header(node, frontier)
+        return self.build_loop(node, header, exits=[header])
+
+    build_AsyncFor = build_For
+
+    def build_loop(self, node, header, exits):
+        breaks = []
+
+        self.loops.append((header, breaks))
+        body = self.build(node.body, [header])
+        self.loops.pop()
 
-        self.previous_node = node_id
-        self.node_count += 1
+        # Back edge
+        self.link(body, header)
 
-    # ---- Visitors ----
+        # else runs only when the loop ends without break
+        if node.orelse:
+            self.open_block = None
+            exits = self.build(node.orelse, exits)
 
-    def visit_FunctionDef(self, node):
-        self.add_node(f"def {node.name}(...)", node.lineno)
-        self.generic_visit(node)
+        self.open_block = None
+        return exits + breaks
 
-    def visit_For(self, node):
-        self.add_node("for loop", node.lineno)
-        self.generic_visit(node)
+    def build_Try(self, node, frontier):
+        header = self.add_header(node, frontier)
 
-    def visit_While(self, node):
-        self.add_node("while loop", node.lineno)
-        self.generic_visit(node)
+        handler_nodes = []
+        for handler in node.handlers:
+            handler_node = self.add_node(self.label(handler), handler)
+            self.graph.add_edge(header, handler_node)
+            handler_nodes.append(handler_node)
 
-    def visit_If(self, node):
-        self.add_node("if condition", node.lineno)
-        self.generic_visit(node)
+        self.handlers.append(handler_nodes)
+        ends = self.build(node.body, [header])
+        self.handlers.pop()
+
+        if node.orelse:
+            self.open_block = None
+            ends = self.build(node.orelse, ends)
+
+        for handler, handler_node in zip(node.handlers, handler_nodes):
+            self.open_block = None
+            ends = ends + self.build(handler.body, [handler_node])
+
+        if node.finalbody:
+            self.open_block = None
+
+            # finally runs even if every path above left early
+            final = self.build(node.finalbody, ends or [header])
+            if not ends:
+                self.link(final, self.exit_node)
+                self.open_block = None
+                return []
+            ends = final
+
+        self.open_block = None
+        return ends
+
+    build_TryStar = build_Try
+
+    def build_With(self, node, frontier):
+        header = self.add_header(node, frontier)
+        return self.build(node.body, [header])
+
+    build_AsyncWith = build_With
+
+    def build_Match(self, node, frontier):
+        header = self.add_header(node, frontier)
+        ends = []
+        exhaustive = False
+
+        for case in node.cases:
+            case_node = self.add_node(self.label(case.pattern), case.pattern)
+            self.graph.add_edge(header, case_node)
+            self.open_block = None
+            ends = ends + self.build(case.body, [case_node])
+
+            if isinstance(case.pattern, ast.MatchAs) and case.pattern.pattern is None and case.guard is None:
+                exhaustive = True
+
+        if not exhaustive:
+            ends.append(header)
+
+        self.open_block = None
+        return ends
+
+    # ---- Definitions ----
+
+    # Only the header line belongs to the enclosing block; the body
+    # lines belong to the definition's own subgraph.
+
+    def build_FunctionDef(self, node, frontier):
+        self.pending_functions.append((node, self.line_offset))
+        return self.build_simple(node, frontier, self.header_end(node))
+
+    build_AsyncFunctionDef = build_FunctionDef
+
+    def build_ClassDef(self, node, frontier):
+        self.queue_methods(node.body)
+        return self.build_simple(node, frontier, self.header_end(node))
+
+    def queue_methods(self, statements):
+        for statement in statements:
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.pending_functions.append((statement, self.line_offset))
+            elif isinstance(statement, ast.ClassDef):
+                self.queue_methods(statement.body)
+
+    # ---- Subgraphs ----
+    # Functions are built in pre-order (each one directly followed by the
+    # functions nested in it), so a definition and everything inside it
+    # occupy one contiguous id range.
+
+    def start_subgraph(self, name, lineno, entry_label, exit_label, exit_lineno):
+        entry = self.graph.add_node(entry_label, lineno)
+        exit_node = self.graph.add_node(exit_label, exit_lineno)
+
+        self.exit_node = exit_node
+        self.loops = []
+        self.handlers = []
+        self.open_block = None
+        self.pending_functions = []
+
+        return CFGFunction(name, lineno, entry, exit_node)
+
+    def finish_subgraph(self, function, frontier):
+        self.link(frontier, function.exit)
+        function.last = len(self.graph.nodes) - 1
+        self.graph.functions.append(function)
+
+        pending = self.pending_functions
+        self.pending_functions = []
+        return pending
+
+    def build_module(self, segments):
+        # segments: (statements, line offset) pairs in source order.
+        # Returns, per segment, the (def node, line offset) pairs it
+        # queued; their subgraphs are still to be built.
+        function = self.start_subgraph("<module>", None, "start", "end", None)
+        frontier = [function.entry]
+        queued = []
+
+        for statements, offset in segments:
+            self.line_offset = offset
+            frontier = self.build(statements, frontier)
+            queued.append(self.pending_functions)
+            self.pending_functions = []
+
+        self.finish_subgraph(function, frontier)
+        return queued
+
+    def build_function(self, node, offset):
+        self.line_offset = offset
+
+        function = self.start_subgraph(
+            node.name,
+            node.lineno + offset,
+            f"def {node.name}(...)",
+            f"end {node.name}",
+            node.end_lineno + offset
+        )
+        frontier = self.build(node.body, [function.entry])
 
-    def visit_Return(self, node):
-        self.add_node("return statement", node.lineno)
-        self.generic_visit(node)
+        for nested, nested_offset in self.finish_subgraph(function, frontier):
+            self.build_function(nested, nested_offset)
 
-    def visit_Expr(self, node):
-        self.add_node("expression", node.lineno)
-        self.generic_visit(node)
+    def enter_Module(self, node):
+        for pending in self.build_module([(node.body, 0)]):
+            for function, offset in pending:
+                self.build_function(function, offset)
 
     # ---- Generate CFG ----
 
@@ -0,0 +1,164 @@
+from array import array
+
+
+class CFGNode:
+    __slots__ = ("id", "label", "lineno", "end_lineno")
+
+    def __init__(self, node_id, label, lineno=None, end_lineno=None):
+        self.id = node_id
+        self.label = label
+        self.lineno = lineno
+        self.end_lineno = end_lineno if end_lineno is not None else lineno
+
+
+class CFGFunction:
+    # One connected subgraph (a function body or the module body).
+    # Its nodes occupy the contiguous id range [first, last].
+    __slots__ = ("name", "lineno", "entry", "exit", "first", "last")
+
+    def __init__(self, name, lineno, entry, exit):
+        self.name = name
+        self.lineno = lineno
+        self.entry = entry
+        self.exit = exit
+        self.first = entry
+        self.last = exit
+
+
+class ControlFlowGraph:
+    # Nodes are addressed by integer id (their index in self.nodes).
+    # Edges live in two parallel int arrays instead of per-node dicts.
+
+    def __init__(self):
+        self.nodes = []
+        self.sources = array("i")
+        self.targets = array("i")
+        self.functions = []
+
+    def add_node(self, label, lineno=None, end_lineno=None):
+        node = CFGNode(len(self.nodes), label, lineno, end_lineno)
+        self.nodes.append(node)
+        return node.id
+
+    def add_edge(self, source, target):
+        self.sources.append(source)
+        self.targets.append(target)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        return len(self.sources)
+
+    def edges(self):
+        return zip(self.sources, self.targets)
+
+    def extend(self, other, line_shift=0):
+        # Append a separately built graph (a cached function subgraph),
+        # renumbering its ids and moving its lines by line_shift.
+        base = len(self.nodes)
+
+        def shift(lineno):
+            return lineno + line_shift if lineno is not None else None
+
+        for node in other.nodes:
+            self.nodes.append(CFGNode(base + node.id, node.label, shift(node.lineno), shift(node.end_lineno)))
+
+        self.sources.extend(source + base for source in other.sources)
+        self.targets.extend(target + base for target in other.targets)
+
+        for function in other.functions:
+            copy = CFGFunction(function.name, shift(function.lineno), function.entry + base, function.exit + base)
+            copy.first = function.first + base
+            copy.last = function.last + base
+            self.functions.append(copy)
+
+    # ---- Metrics ----
+
+    def connected_components(self):
+        # Union-find over the edge arrays, O(V + E) in practice
+        parent = list(range(len(self.nodes)))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        components = len(parent)
+
+        for source, target in zip(self.sources, self.targets):
+            root_a = find(source)
+            root_b = find(target)
+            if root_a != root_b:
+                parent[root_a] = root_b
+                components -= 1
+
+        return components
+
+    def cyclomatic_complexity(self):
+        # McCabe: M = E - N + 2P
+        if not self.nodes:
+            return 1
+        return self.edge_count - len(self.nodes) + 2 * self.connected_components()
+
+    # ---- Serialization ----
+
+    @staticmethod
+    def node_name(node_id):
+        return f"node_{node_id}"
+
+    def to_dict(self):
+        name = self.node_name
+
+        return {
+            "nodes": [
+                {
+                    "id": name(node.id),
+                    "label": node.label,
+                    "lineno": node.lineno,
+                    "end_lineno": node.end_lineno
+                }
+                for node in self.nodes
+            ],
+            "edges": [
+                {
+                    "source": name(source),
+                    "target": name(target)
+                }
+                for source, target in zip(self.sources, self.targets)
+            ],
+            # Each body's own nodes, a contiguous position range
+            "functions": [
+                {
+                    "name": function.name,
+                    "lineno": function.lineno,
+                    "first": function.first,
+                    "last": function.last
+                }
+                for function in self.functions
+            ]
+        }
+
+    def to_networkx(self):
+        # networkx is only needed by callers that want graph algorithms;
+        # import it on demand so the request path never pays for it.
+        import networkx as nx
+
+        graph = nx.DiGraph()
+
+        for node in self.nodes:
+            graph.add_node(
+                self.node_name(node.id),
+                label=node.label,
+                lineno=node.lineno,
+                end_lineno=node.end_lineno
+            )
+
+        graph.add_edges_from(
+            (self.node_name(source), self.node_name(target))
+            for source, target in self.edges()
+        )
+
+        return graph
@@ -0,0 +1,155 @@
+from bisect import bisect_right
+
+
+# ============================================================
+# Compact CFG wire format
+# ============================================================
+# The analyzers' "cfg" is one dict per node and per edge. The compact
+# form stores the same graph column-wise:
+#
+#   {"format": "compact", "first": 0, "count": n,
+#    "labels": ["start", "x = 1", ...],       each distinct label once
+#    "label": [0, 1, 1, ...],                 per node, into "labels"
+#    "lineno": [...], "end_lineno": [...],    per node
+#    "edges": [s0, t0, s1, t1, ...]}          node positions, flat
+#
+# Nodes are addressed by position in the full graph: the compact node k
+# is position first + k, and edges always use full-graph positions, so
+# subgraphs fetched one by one fit together. /analyze's id for position
+# p is "node_p" for Python and p + 1 for C, C++ and Java.
+#
+# Functions. Analyzers list each function body as a contiguous position
+# range in cfg["functions"] ({"name", "lineno", "first", "last"}), and
+# top-level code as "<module>" (Python) or "<file>" ranges. The
+# overview gives one entry per function, indexed by its position in
+# that list, which is the id a single function's subgraph is fetched by.
+
+def _positions(cfg):
+    return {node["id"]: position for position, node in enumerate(cfg["nodes"])}
+
+
+def _edge_positions(cfg, positions):
+    for edge in cfg["edges"]:
+        yield positions[edge["source"]], positions[edge["target"]]
+
+
+def compact_cfg(cfg, first=0, last=None):
+    # Positions first..last (default: all nodes) and the edges leaving
+    # them that stay inside
+    nodes = cfg["nodes"]
+    last = len(nodes) - 1 if last is None else last
+    positions = _positions(cfg)
+
+    labels = []
+    label_index = {}
+    label_column = []
+    linenos = []
+    end_linenos = []
+
+    for node in nodes[first:last + 1]:
+        label = node["label"]
+        index = label_index.get(label)
+        if index is None:
+            index = label_index[label] = len(labels)
+            labels.append(label)
+        label_column.append(index)
+        linenos.append(node.get("lineno"))
+        end_linenos.append(node.get("end_lineno", node.get("lineno")))
+
+    edges = []
+    for source, target in _edge_positions(cfg, positions):
+        if first <= source <= last and first <= target <= last:
+            edges.append(source)
+            edges.append(target)
+
+    compact = {
+        "format": "compact",
+        "first": first,
+        "count": len(label_column),
+        "labels": labels,
+        "label": label_column,
+        "lineno": linenos,
+        "end_lineno": end_linenos,
+        "edges": edges
+    }
+    if cfg.get("summarized"):
+        compact["summarized"] = True
+    return compact
+
+
+# ============================================================
+# Function overview and expansion
+# ============================================================
+
+def cfg_functions(cfg):
+    # Results cached before functions were listed count as one body
+    functions = cfg.get("functions")
+    if functions is None:
+        return [{"name": "<all>", "lineno": None, "first": 0, "last": len(cfg["nodes"]) - 1}]
+    return functions
+
+
+def cfg_overview(cfg, call_graph=None):
+    functions = cfg_functions(cfg)
+    positions = _positions(cfg)
+
+    # Function of a position: the last range starting at or before it
+    ranges = sorted((function["first"], function["last"], index) for index, function in enumerate(functions))
+    starts = [first for first, _, _ in ranges]
+    edge_counts = [0] * len(functions)
+
+    for source, target in _edge_positions(cfg, positions):
+        slot = bisect_right(starts, source) - 1
+        if slot >= 0:
+            first, last, index = ranges[slot]
+            if source <= last and first <= target <= last:
+                edge_counts[index] += 1
+
+    ids = {}
+    entries = []
+    for index, function in enumerate(functions):
+        ids.setdefault(function["name"], index)
+        entries.append({
+            "id": index,
+            "name": function["name"],
+            "lineno": function["lineno"],
+            "first": function["first"],
+            "nodes": function["last"] - function["first"] + 1,
+            "edges": edge_counts[index]
+        })
+
+    calls = sorted({
+        (ids[caller], ids[callee])
+        for caller, callees in (call_graph or {}).items() if caller in ids
+        for callee in callees if callee in ids
+    })
+
+    return {
+        "nodes": len(cfg["nodes"]),
+        "edges": len(cfg["edges"]),
+        "summarized": bool(cfg.get("summarized")),
+        "functions": entries,
+        "calls": [list(call) for call in calls]
+    }
+
+
+def function_subgraph(cfg, function_id, compact=False):
+    # -> one function's nodes and edges, or None for an unknown id
+    functions = cfg_functions(cfg)
+    if not 0 <= function_id < len(functions):
+        return None
+
+    function = functions[function_id]
+    first, last = function["first"], function["last"]
+
+    if compact:
+        graph = compact_cfg(cfg, first, last)
+    else:
+        nodes = cfg["nodes"][first:last + 1]
+        ids = {node["id"] for node in nodes}
+        graph = {
+            "nodes": nodes,
+            "edges": [edge for edge in cfg["edges"] if edge["source"] in ids and edge["target"] in ids]
+        }
+
+    return {"id": function_id, "name": function["name"], "lineno": function["lineno"], "cfg": graph}
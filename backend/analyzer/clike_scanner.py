@@ -0,0 +1,298 @@
+import re
+
+from analyzer.call_graph import recursive_functions
+
+
+# ============================================================
+# Lexer
+# ============================================================
+# One regex alternation, scanned left to right. Comments, string/char
+# literals, numbers and preprocessor lines are matched (so their
+# contents can never look like code) and then dropped; only names and
+# punctuation reach the scanner. Whitespace is skipped by finditer.
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<number>\.?\d[\w.]*)
+  | (?P<comment>/\*.*?(?:\*/|\Z)|//[^\n]*)
+  | (?P<string>\"\"\".*?(?:\"\"\"|\Z)|"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?)
+  | (?P<preprocessor>^[ \t]*\#(?:\\\n|[^\n])*)
+  | (?P<op>&&|\|\||::|->|[^\s\w])
+""", re.VERBOSE | re.DOTALL | re.MULTILINE)
+
+SKIPPED = frozenset(("comment", "string", "preprocessor", "number"))
+
+
+def tokenize(code):
+    # Yields (kind, text, offset) for names and operators only.
+    for match in TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        if kind not in SKIPPED:
+            yield kind, match.group(kind), match.start()
+
+
+def tokenize_chunks(chunks, lines=None):
+    # tokenize() over consecutive pieces of one source, each ending at a
+    # line break, with offsets into the whole source. Only a skipped
+    # token can span lines (block comment, text block, continued
+    # preprocessor line); one that reaches the end of a chunk is carried
+    # over and rescanned with the next. `lines` (a LineCounter) follows
+    # the chunk being tokenized.
+    carry = ""
+    base = 0
+
+    for chunk in chunks:
+        text = carry + chunk if carry else chunk
+        carry = ""
+        end = len(text)
+        if lines is not None:
+            lines.feed(text, base)
+
+        for match in TOKEN_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind not in SKIPPED:
+                yield kind, match.group(kind), base + match.start()
+            elif match.end() == end:
+                carry = text[match.start():]
+
+        base += end - len(carry)
+
+
+class LineCounter:
+    # Line number of an offset, for offsets that never decrease. Holds
+    # only the chunk being tokenized, so it works on streamed sources.
+    __slots__ = ("text", "base", "position", "line")
+
+    def __init__(self):
+        self.text = ""
+        self.base = 0
+        self.position = 0
+        self.line = 1
+
+    def feed(self, text, base):
+        self.line += self.text.count("\n", self.position, base - self.base)
+        self.text = text
+        self.base = base
+        self.position = 0
+
+    def line_at(self, offset):
+        local = offset - self.base
+        self.line += self.text.count("\n", self.position, local)
+        self.position = local
+        return self.line
+
+
+# ============================================================
+# Scanner
+# ============================================================
+
+LOOP_KEYWORDS = frozenset(("for", "while"))
+DECISION_KEYWORDS = frozenset(("if", "for", "while", "case"))
+TYPE_KEYWORDS = frozenset(("class", "struct", "union", "namespace", "interface", "enum", "record"))
+
+# Names followed by "(" that are not calls or definitions
+NOT_CALLABLE = frozenset((
+    "if", "for", "while", "switch", "catch", "return", "sizeof", "alignof",
+    "decltype", "typeof", "synchronized", "new", "delete", "throw", "do",
+    "else", "try", "case", "assert", "static_assert", "defined", "super", "this"
+))
+
+# Scope kinds, one per open "{"
+BLOCK, LOOP, DO_LOOP, FUNCTION, TYPE = range(5)
+
+
+class FunctionStats:
+    # One function body; overloads with the same name are merged
+    __slots__ = ("lineno", "end_lineno", "loop_depth", "decision_points")
+
+    def __init__(self, lineno):
+        self.lineno = lineno
+        self.end_lineno = lineno
+        self.loop_depth = 0
+        self.decision_points = 0
+
+
+class ClikeSummary:
+    __slots__ = ("loop_depth", "decision_points", "functions", "calls", "recursive_functions", "stats")
+
+    def __init__(self):
+        self.loop_depth = 0
+        self.decision_points = 0
+        self.functions = {}      # name -> line of definition
+        self.calls = {}          # name -> set of called names
+        self.recursive_functions = []
+        self.stats = {}          # name -> FunctionStats
+
+    def call_graph(self):
+        # Calls between functions defined in this file only
+        return {
+            name: sorted(callee for callee in callees if callee in self.calls)
+            for name, callees in self.calls.items()
+        }
+
+
+def scan(code):
+    return scan_chunks((code,))
+
+
+def scan_chunks(chunks):
+    # Single pass over the token stream with brace-aware scope tracking:
+    # loop nesting, function bodies and their calls, decision points.
+    # `chunks` is the source in pieces that end at line breaks (see
+    # tokenize_chunks); only the piece being scanned is held.
+    summary = ClikeSummary()
+    calls = summary.calls
+    lines = LineCounter()
+
+    scopes = []              # scope kind per open "{"
+    parens = []              # per open "(": the name before it, or None
+    braced_loops = 0
+    function_depth = 0
+    current_function = None
+    function_stats = None
+    function_start = 0       # decision points before the current function
+
+    previous = None
+    before_previous = None
+
+    pending_loop = None      # LOOP/DO_LOOP once a loop header is complete
+    virtual_loops = []       # (brace depth, paren depth) of brace-less loop bodies
+    closed_do = False        # last token closed a do { ... } body
+    do_condition = False     # "while" of a "do { ... } while (...)"
+    candidate = None         # "name(...)" just closed outside any function
+    candidate_locked = False # inside a C++ constructor initializer list
+    pending_type = False     # saw class/struct/namespace/..., expecting "{"
+
+    for kind, text, offset in tokenize_chunks(chunks, lines):
+
+        # ---- A loop header was complete: does a brace follow? ----
+        if pending_loop is not None and text != "{":
+            if text != ";":
+                virtual_loops.append((len(scopes), len(parens)))
+                summary.loop_depth = max(summary.loop_depth, braced_loops + len(virtual_loops))
+                if function_stats is not None:
+                    function_stats.loop_depth = max(function_stats.loop_depth, braced_loops + len(virtual_loops))
+            pending_loop = None
+
+        if kind == "name":
+            if text in DECISION_KEYWORDS:
+                summary.decision_points += 1
+
+            if text == "do":
+                pending_loop = DO_LOOP
+
+            elif text == "while" and closed_do:
+                do_condition = True
+
+            elif text in TYPE_KEYWORDS and not function_depth:
+                pending_type = True
+
+        elif text == "(":
+            opener = None
+
+            if previous in LOOP_KEYWORDS:
+                # "} while (...)" closes a do-loop, it is not a new loop
+                opener = None if do_condition else previous
+                do_condition = False
+
+            elif previous is not None and _is_name(previous) and previous not in NOT_CALLABLE:
+                opener = previous
+
+                if function_depth and before_previous != "new":
+                    calls[current_function].add(opener)
+
+            parens.append(opener)
+
+        elif text == ")":
+            opener = parens.pop() if parens else None
+
+            if opener in LOOP_KEYWORDS:
+                pending_loop = LOOP
+
+            elif opener is not None and not parens and not function_depth and not candidate_locked:
+                candidate = opener
+
+        elif text == "{":
+            if pending_loop is not None:
+                scopes.append(pending_loop)
+                pending_loop = None
+                braced_loops += 1
+                summary.loop_depth = max(summary.loop_depth, braced_loops + len(virtual_loops))
+                if function_stats is not None:
+                    function_stats.loop_depth = max(function_stats.loop_depth, braced_loops + len(virtual_loops))
+
+            elif candidate is not None and not function_depth:
+                line = lines.line_at(offset)
+
+                current_function = candidate
+                summary.functions.setdefault(candidate, line)
+                calls.setdefault(candidate, set())
+                function_stats = summary.stats.get(candidate)
+                if function_stats is None:
+                    function_stats = summary.stats[candidate] = FunctionStats(line)
+                function_start = summary.decision_points
+                scopes.append(FUNCTION)
+                function_depth = 1
+
+            elif pending_type and not function_depth:
+                scopes.append(TYPE)
+
+            else:
+                scopes.append(BLOCK)
+
+            candidate = None
+            candidate_locked = False
+            pending_type = False
+
+        elif text == "}":
+            scope = scopes.pop() if scopes else BLOCK
+
+            if scope == LOOP or scope == DO_LOOP:
+                braced_loops -= 1
+            elif scope == FUNCTION:
+                function_stats.end_lineno = lines.line_at(offset)
+                function_stats.decision_points += summary.decision_points - function_start
+                function_depth = 0
+                current_function = None
+                function_stats = None
+
+            # A braced statement can be the whole body of a brace-less loop
+            if virtual_loops:
+                _close_virtual_loops(virtual_loops, len(scopes), len(parens))
+
+            closed_do = scope == DO_LOOP
+            before_previous = previous
+            previous = text
+            continue
+
+        elif text == ";":
+            candidate = None
+            candidate_locked = False
+            pending_type = False
+
+            if virtual_loops:
+                _close_virtual_loops(virtual_loops, len(scopes), len(parens))
+
+        elif text == ":":
+            # C++ constructor initializer list: "Foo(int x) : a(x) {"
+            if candidate is not None:
+                candidate_locked = True
+
+        elif text == "&&" or text == "||":
+            summary.decision_points += 1
+
+        closed_do = False
+        before_previous = previous
+        previous = text
+
+    summary.recursive_functions = recursive_functions(calls)
+    return summary
+
+
+def _close_virtual_loops(virtual_loops, brace_depth, paren_depth):
+    while virtual_loops and virtual_loops[-1][0] >= brace_depth and virtual_loops[-1][1] >= paren_depth:
+        virtual_loops.pop()
+
+
+def _is_name(text):
+    return text[0].isalpha() or text[0] in "_$"
@@ -1,12 +1,32 @@
+from analyzer.recurrence import Growth, dominant
+
+
 class ComplexityEngine:
-    def estimate(self, loop_depth, recursive_functions):
+    def estimate(self, loop_depth, recursive_functions, recursion=None, symbolic=None):
         
         # If recursion exists
         if recursive_functions:
+
+            # Every recursive cycle solved as a recurrence: the estimate
+            # is whichever grows fastest, loops elsewhere included
+            if recursion and all(summary.growth is not None for summary in recursion):
+                bound = dominant([summary.growth for summary in recursion])
+                loops = symbolic.growth() if symbolic is not None else Growth(degree=loop_depth)
+                if symbolic is not None and loops.key() >= bound.key():
+                    return symbolic.text()
+                return str(dominant([bound, loops]))
+
+            if recursion and any(summary.shape == "backtracking" for summary in recursion):
+                return "Unknown (backtracking: the fan-out depends on the input)"
+
             if loop_depth > 0:
                 return "O(n * recursive complexity)"
             return "O(2^n) (recursive growth detected)"
 
+        # Symbolic loop bounds are tighter than counting nesting depth
+        if symbolic is not None:
+            return symbolic.text()
+
         # No recursion → loop-based estimation
         if loop_depth == 0:
             return "O(1)"
@@ -1,29 +1,24 @@
-import ast
+from analyzer.engine import AnalyzerPlugin
 
-class CyclomaticComplexity(ast.NodeVisitor):
+class CyclomaticComplexity(AnalyzerPlugin):
     def __init__(self):
         self.complexity = 1  # Base path
 
-    def visit_If(self, node):
+    def enter_If(self, node):
         self.complexity += 1
-        self.generic_visit(node)
 
-    def visit_For(self, node):
+    def enter_For(self, node):
         self.complexity += 1
-        self.generic_visit(node)
 
-    def visit_While(self, node):
+    def enter_While(self, node):
         self.complexity += 1
-        self.generic_visit(node)
 
-    def visit_Try(self, node):
+    def enter_Try(self, node):
         self.complexity += len(node.handlers)
-        self.generic_visit(node)
 
-    def visit_BoolOp(self, node):
+    def enter_BoolOp(self, node):
         # count and/or
         self.complexity += len(node.values) - 1
-        self.generic_visit(node)
 
     def calculate(self, tree):
         self.visit(tree)
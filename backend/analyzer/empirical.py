@@ -0,0 +1,143 @@
+import math
+import random
+
+
+# ============================================================
+# Input Generation
+# ============================================================
+# Every generated input starts with n on its own line so programs can
+# read the size first, the way competitive-programming inputs do.
+
+INPUT_KINDS = ("n", "array", "sorted_array", "string")
+
+DEFAULT_SIZES = [250, 500, 1000, 2000, 4000, 8000, 16000]
+
+
+def generate_input(kind, n):
+    rng = random.Random(n)
+
+    if kind == "n":
+        return f"{n}\n"
+
+    if kind == "array":
+        values = (str(rng.randint(-10**6, 10**6)) for _ in range(n))
+        return f"{n}\n" + " ".join(values) + "\n"
+
+    if kind == "sorted_array":
+        values = sorted(rng.randint(-10**6, 10**6) for _ in range(n))
+        return f"{n}\n" + " ".join(map(str, values)) + "\n"
+
+    if kind == "string":
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        return f"{n}\n" + "".join(rng.choice(letters) for _ in range(n)) + "\n"
+
+    raise ValueError(f"Unknown input kind '{kind}'")
+
+
+# ============================================================
+# Curve Fitting
+# ============================================================
+
+def _exp2(n):
+    # 2^n overflows a float past n ~ 1023; such sizes rule the model out
+    try:
+        return math.ldexp(1.0, n)
+    except OverflowError:
+        return math.inf
+
+
+MODELS = [
+    ("O(1)", lambda n: 0.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: float(n) ** 2),
+    ("O(n^3)", lambda n: float(n) ** 3),
+    ("O(2^n)", _exp2),
+]
+
+
+def _fit(xs, ys):
+    # Least squares for y = a + b*x with b >= 0 (run time never shrinks
+    # as n grows). Returns (a, b, sse).
+    count = len(xs)
+    mean_x = sum(xs) / count
+    mean_y = sum(ys) / count
+
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+
+    b = sxy / sxx if sxx > 0 else 0.0
+    if b < 0:
+        b = 0.0
+
+    a = mean_y - b * mean_x
+    sse = sum((y - a - b * x) ** 2 for x, y in zip(xs, ys))
+
+    return a, b, sse
+
+
+def fit_complexity(sizes, timings):
+    # sizes/timings are parallel lists; at least three points are needed
+    # to tell the models apart.
+    if len(sizes) < 3:
+        return {
+            "best_fit": None,
+            "confidence": 0.0,
+            "fits": []
+        }
+
+    mean_y = sum(timings) / len(timings)
+    sst = sum((y - mean_y) ** 2 for y in timings)
+
+    fits = []
+
+    for label, model in MODELS:
+        xs = [model(n) for n in sizes]
+
+        if any(math.isinf(x) for x in xs):
+            continue
+
+        # Rescale so huge n^3 / 2^n values don't lose float precision
+        scale = max(xs) or 1.0
+        a, b, sse = _fit([x / scale for x in xs], timings)
+
+        fits.append({
+            "complexity": label,
+            "intercept": a,
+            "coefficient": b / scale,
+            "sse": sse,
+            "r2": 1 - sse / sst if sst > 0 else 1.0
+        })
+
+    # Ties go to the simpler model, which comes first in MODELS
+    ranked = sorted(fits, key=lambda fit: fit["sse"])
+    best = ranked[0]
+
+    # Confidence blends how well the best model explains the timings (R²)
+    # with how clearly it beats the runner-up.
+    if len(ranked) > 1 and ranked[1]["sse"] > 0:
+        separation = 1 - best["sse"] / ranked[1]["sse"]
+    else:
+        separation = 1.0
+
+    confidence = max(0.0, best["r2"]) * separation
+
+    # A flat series is O(1) no matter which curve fits the noise best
+    if best["complexity"] != "O(1)" and sst <= (mean_y * 0.05) ** 2 * len(timings):
+        best = next(fit for fit in fits if fit["complexity"] == "O(1)")
+        confidence = 1.0 - math.sqrt(sst / len(timings)) / mean_y if mean_y else 1.0
+
+    return {
+        "best_fit": best["complexity"],
+        "confidence": round(min(1.0, max(0.0, confidence)), 4),
+        "fits": [
+            {
+                "complexity": fit["complexity"],
+                "coefficient": fit["coefficient"],
+                "intercept": fit["intercept"],
+                "r2": round(fit["r2"], 4)
+            }
+            for fit in fits
+        ]
+    }
@@ -0,0 +1,90 @@
+import ast
+import time
+
+
+class AnalyzerPlugin:
+    # Plugins declare enter_<NodeType> / leave_<NodeType> handlers.
+    # enter_* runs before the node's children are walked, leave_* after.
+
+    def visit(self, tree):
+        AnalysisEngine([self]).run(tree)
+
+
+class AnalysisEngine:
+    def __init__(self, plugins, timings=None):
+        self.plugins = plugins
+        self._handlers = {}
+
+        # plugin -> seconds spent in its handlers. Timing wraps every
+        # handler call, so it is only switched on for debugging.
+        self.timings = timings
+        if timings is not None:
+            for plugin in plugins:
+                timings.setdefault(plugin, 0.0)
+
+    # ---- Resolve (and cache) handlers for a node type ----
+    def _resolve(self, node_type):
+        name = node_type.__name__
+        enters = []
+        leaves = []
+
+        for plugin in self.plugins:
+            enter = getattr(plugin, "enter_" + name, None)
+            if enter is not None:
+                enters.append(enter if self.timings is None else self._timed(plugin, enter))
+
+            leave = getattr(plugin, "leave_" + name, None)
+            if leave is not None:
+                leaves.append(leave if self.timings is None else self._timed(plugin, leave))
+
+        handlers = (tuple(enters), tuple(leaves))
+        self._handlers[node_type] = handlers
+        return handlers
+
+    def _timed(self, plugin, handler):
+        timings = self.timings
+        clock = time.perf_counter
+
+        def timed(node):
+            start = clock()
+            handler(node)
+            timings[plugin] += clock() - start
+
+        return timed
+
+    # ---- Single traversal dispatching to every plugin ----
+    def _walk(self, node):
+        handlers = self._handlers.get(type(node))
+        if handlers is None:
+            handlers = self._resolve(type(node))
+
+        enters, leaves = handlers
+
+        for handler in enters:
+            handler(node)
+
+        for child in ast.iter_child_nodes(node):
+            self._walk(child)
+
+        for handler in leaves:
+            handler(node)
+
+    def run(self, tree):
+        self._walk(tree)
+        return self.plugins
+
+
+class StageTimer:
+    # Adds the time since the previous mark to timings[stage]. Without a
+    # timings dict every mark is a no-op.
+    __slots__ = ("timings", "last")
+
+    def __init__(self, timings):
+        self.timings = timings
+        self.last = time.perf_counter() if timings is not None else 0.0
+
+    def mark(self, stage):
+        if self.timings is not None:
+            now = time.perf_counter()
+            self.timings[stage] = self.timings.get(stage, 0.0) + now - self.last
+            self.last = now
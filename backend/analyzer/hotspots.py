@@ -0,0 +1,100 @@
+from analyzer.ast_parser import ASTParser
+from analyzer.cfg_generator import CFGGenerator
+from analyzer.cfg_graph import ControlFlowGraph
+
+
+# Joins a line profile (see runner/line_tracer.py) to the CFG that
+# /analyze returns for the same code, so the frontend can shade nodes by
+# where the time went. Node ids match analyze_python's "cfg" output.
+
+# Nodes listed under "hotspots"
+TOP_HOTSPOTS = 5
+
+
+def _node_for_line(graph):
+    # line -> id of the narrowest block or header covering it: a module
+    # block spans the whole `def` statements it holds, the function's own
+    # blocks span just their lines. Function entry and exit nodes only
+    # mark a subgraph's boundaries and own no lines.
+    boundaries = set()
+    for function in graph.functions:
+        boundaries.update((function.entry, function.exit))
+
+    owner = {}
+    span = {}
+    for node in graph.nodes:
+        if node.lineno is None or node.id in boundaries:
+            continue
+        size = node.end_lineno - node.lineno
+        for line in range(node.lineno, node.end_lineno + 1):
+            if size < span.get(line, size + 1):
+                owner[line] = node.id
+                span[line] = size
+
+    return owner
+
+
+def map_hotspots(code, summary):
+    cfg_generator = CFGGenerator(code)
+    cfg_generator.visit(ASTParser(code).get_tree())
+    graph = cfg_generator.graph
+    owner = _node_for_line(graph)
+
+    lines = {}
+    for line, hits, time_ns in summary.get("lines", []):
+        lines[int(line)] = {"line": int(line), "hits": int(hits), "time_ns": int(time_ns), "alloc_bytes": 0, "alloc_blocks": 0}
+    for line, size, blocks in summary.get("allocations", []):
+        entry = lines.setdefault(int(line), {"line": int(line), "hits": 0, "time_ns": 0, "alloc_bytes": 0, "alloc_blocks": 0})
+        entry["alloc_bytes"] = int(size)
+        entry["alloc_blocks"] = int(blocks)
+
+    # A block runs once per hit of its busiest line; its time and
+    # allocations are those of all its lines
+    nodes = {}
+    for line, entry in lines.items():
+        node_id = owner.get(line)
+        entry["node"] = ControlFlowGraph.node_name(node_id) if node_id is not None else None
+        if node_id is None:
+            continue
+
+        node = nodes.get(node_id)
+        if node is None:
+            cfg_node = graph.nodes[node_id]
+            node = nodes[node_id] = {
+                "id": ControlFlowGraph.node_name(node_id),
+                "lineno": cfg_node.lineno,
+                "end_lineno": cfg_node.end_lineno,
+                "hits": 0,
+                "time_ns": 0,
+                "alloc_bytes": 0,
+                "alloc_blocks": 0
+            }
+        node["hits"] = max(node["hits"], entry["hits"])
+        node["time_ns"] += entry["time_ns"]
+        node["alloc_bytes"] += entry["alloc_bytes"]
+        node["alloc_blocks"] += entry["alloc_blocks"]
+
+    # heat: share of the hottest node's time, 0..1
+    hottest = max((node["time_ns"] for node in nodes.values()), default=0)
+    for node in nodes.values():
+        node["heat"] = round(node["time_ns"] / hottest, 4) if hottest else 0.0
+
+    ranked = sorted(nodes.values(), key=lambda node: node["time_ns"], reverse=True)
+
+    return {
+        "mode": summary.get("mode"),
+        "complete": bool(summary.get("complete")),
+        "allocations_complete": bool(summary.get("allocations_complete")),
+        "events": int(summary.get("events", 0)),
+        "elapsed_ms": round(int(summary.get("elapsed_ns", 0)) / 1e6, 3),
+        "peak_alloc_kb": round(int(summary.get("peak_alloc", 0)) / 1024, 1),
+        "nodes": [_in_ms(node) for _, node in sorted(nodes.items())],
+        "lines": [_in_ms(entry) for _, entry in sorted(lines.items())],
+        "hotspots": [node["id"] for node in ranked[:TOP_HOTSPOTS] if node["time_ns"]]
+    }
+
+
+def _in_ms(entry):
+    entry = dict(entry)
+    entry["time_ms"] = round(entry.pop("time_ns") / 1e6, 3)
+    return entry
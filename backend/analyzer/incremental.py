@@ -0,0 +1,218 @@
+import ast
+import time
+import uuid
+from collections import OrderedDict
+
+from analyzer.cfg_generator import CFGGenerator
+from analyzer.cfg_graph import ControlFlowGraph
+from analyzer.python_analyzer import StatementMetrics, build_result, collect_metrics, same_module_scope
+
+
+# ============================================================
+# Segments
+# ============================================================
+# A Python buffer is kept as its top-level statements ("segments").
+# Each one carries its parsed node, the metrics and CFG subgraphs of
+# the functions it defines, so an edit only costs the statements it
+# touches. Nodes keep the line numbers they were parsed with; `offset`
+# maps them to the current buffer.
+#
+# A statement's metrics also depend on the module-level names bound
+# before it (a set assigned at the top makes `x in NAMES` O(1) further
+# down), so a segment is re-analyzed when that scope changes too.
+
+class Segment:
+    __slots__ = ("start", "end", "node", "offset", "metrics", "scope", "cfg", "cfg_offset")
+
+    def __init__(self, start, end, node, offset):
+        self.start = start          # first line, decorators included
+        self.end = end
+        self.node = node
+        self.offset = offset
+        self.metrics = None
+        self.scope = None           # module scope the metrics were collected with
+        self.cfg = None             # subgraphs of the functions defined here
+        self.cfg_offset = None      # offset the subgraphs were built at
+
+    def shift(self, delta):
+        self.start += delta
+        self.end += delta
+        self.offset += delta
+
+
+def split_segments(tree, offset=0):
+    segments = []
+
+    for node in tree.body:
+        first = node.lineno
+        for decorator in getattr(node, "decorator_list", ()):
+            first = min(first, decorator.lineno)
+
+        segments.append(Segment(first + offset, node.end_lineno + offset, node, offset))
+
+    return segments
+
+
+# ============================================================
+# Session
+# ============================================================
+
+class PythonSession:
+
+    def __init__(self, code):
+        self.reset(code)
+
+    def reset(self, code):
+        self.lines = code.split("\n")
+        self.segments = None        # None until the buffer parses again
+        self.reparsed_lines = 0
+        self.full_parse = False
+        self.last_used = time.monotonic()
+
+    @property
+    def code(self):
+        return "\n".join(self.lines)
+
+    def parse(self):
+        # Full parse; raises SyntaxError and leaves the session dirty
+        tree = ast.parse(self.code)
+        self.segments = split_segments(tree)
+        self.reparsed_lines += len(self.lines)
+        self.full_parse = True
+
+    def apply_edit(self, start_line, end_line, text):
+        # Replace lines start_line..end_line (1-based, inclusive) with the
+        # lines of `text`. end_line = start_line - 1 inserts before
+        # start_line; an empty text deletes the range.
+        line_count = len(self.lines)
+        if not 1 <= start_line <= line_count + 1 or not start_line - 1 <= end_line <= line_count:
+            raise ValueError(f"Edit range {start_line}-{end_line} is outside the buffer (1-{line_count})")
+
+        new_lines = text.splitlines()
+        delta = len(new_lines) - (end_line - start_line + 1)
+        self.lines[start_line - 1:end_line] = new_lines
+
+        if self.segments is None:
+            return
+
+        # Reparse from the statement before the edit up to the statement
+        # after it: indentation can join or split neighbours, and a new
+        # decorator belongs to the statement that follows.
+        segments = self.segments
+        first = 0
+        for index, segment in enumerate(segments):
+            if segment.start >= start_line:
+                break
+            first = index
+
+        last = len(segments)
+        for index in range(first, len(segments)):
+            if segments[index].end > end_line:
+                last = index
+                break
+
+        region_start = segments[first].start if segments and segments[first].start < start_line else 1
+        region_end = (segments[last].end if last < len(segments) else line_count) + delta
+        if region_start == 1:
+            first = 0
+
+        # Both ends of the region sit on top-level statement boundaries,
+        # so parsing it alone gives the same statements as a full parse.
+        try:
+            tree = ast.parse("\n".join(self.lines[region_start - 1:region_end]))
+        except SyntaxError:
+            self.segments = None
+            return
+
+        self.reparsed_lines += region_end - region_start + 1
+
+        following = segments[last + 1:] if last < len(segments) else []
+        for segment in following:
+            segment.shift(delta)
+
+        self.segments = segments[:first] + split_segments(tree, region_start - 1) + following
+
+    # ---- Analysis ----
+
+    def analyze(self):
+        if self.segments is None:
+            self.parse()
+
+        segments = self.segments
+        metrics = StatementMetrics()
+        reanalyzed = 0
+
+        scope = None
+        for segment in segments:
+            if segment.metrics is None or not same_module_scope(segment.scope, scope):
+                segment.metrics = collect_metrics(segment.node, module_scope=scope)
+                segment.scope = scope
+                reanalyzed += 1
+            metrics.merge(segment.metrics, segment.offset)
+            scope = segment.metrics.module_scope
+
+        # The module subgraph links every statement, so it is rebuilt;
+        # function subgraphs are reused from unchanged segments.
+        generator = CFGGenerator(self.code)
+        queued = generator.build_module([([segment.node], segment.offset) for segment in segments])
+        graph = generator.graph
+
+        for segment, pending in zip(segments, queued):
+            if segment.cfg is None:
+                generator.graph = ControlFlowGraph()
+                for function, offset in pending:
+                    generator.build_function(function, offset)
+                segment.cfg = generator.graph
+                segment.cfg_offset = segment.offset
+
+            graph.extend(segment.cfg, segment.offset - segment.cfg_offset)
+
+        stats = {
+            "full_parse": self.full_parse,
+            "reparsed_lines": self.reparsed_lines,
+            "segments": len(segments),
+            "reanalyzed_segments": reanalyzed
+        }
+
+        self.reparsed_lines = 0
+        self.full_parse = False
+
+        return build_result(metrics, graph), stats
+
+
+# ============================================================
+# Session store
+# ============================================================
+
+class SessionStore:
+    # LRU of editor sessions; a session idle for longer than ttl is dropped
+
+    def __init__(self, max_sessions=64, ttl=900):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = OrderedDict()
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+
+        if time.monotonic() - session.last_used > self.ttl:
+            del self.sessions[session_id]
+            return None
+
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def create(self, code):
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = PythonSession(code)
+
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+
+        return session_id, self.sessions[session_id]
+
+    def stats(self):
+        return {"sessions": len(self.sessions), "max_sessions": self.max_sessions, "ttl": self.ttl}
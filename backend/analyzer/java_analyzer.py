@@ -1,55 +1,17 @@
 import re
 
-def analyze_java(code: str):
-
-    issues = []
-    recursive_functions = []
-    loop_depth = 0
-    max_depth = 0
-
-    lines = code.splitlines()
-    brace_stack = 0
-
-    # -------- LOOP DEPTH --------
-    for line in lines:
-        stripped = line.strip()
-
-        if re.search(r'\b(for|while)\b', stripped):
-            brace_stack += 1
-            max_depth = max(max_depth, brace_stack)
+from analyzer.c_analyzer import MAX_LINE_CFG_LINES, build_result, function_cfg, line_functions
+from analyzer.clike_scanner import scan
 
-        if "}" in stripped and brace_stack > 0:
-            brace_stack -= 1
-
-    loop_depth = max_depth
-
-    # -------- RECURSION --------
-    functions = re.findall(r'\b(public|private|protected)?\s*(static)?\s*(void|int|double|float|String)\s+(\w+)\s*\(', code)
-
-    for match in functions:
-        fname = match[-1]
-        body = code.split(fname, 1)[-1]
-        if re.search(r'\b' + fname + r'\s*\(', body):
-            recursive_functions.append(fname)
-
-    # -------- COMPLEXITY --------
-    complexity = 1
-    complexity += len(re.findall(r'\bif\b', code))
-    complexity += len(re.findall(r'\bfor\b', code))
-    complexity += len(re.findall(r'\bwhile\b', code))
-    complexity += len(re.findall(r'\bcase\b', code))
-    complexity += len(re.findall(r'&&|\|\|', code))
+def analyze_java(code: str):
 
-    if loop_depth > 3:
-        issues.append("Deep nested loops")
+    # -------- LOOP DEPTH / RECURSION / COMPLEXITY (single pass) --------
+    summary = scan(code)
 
-    if complexity > 15:
-        issues.append("High cyclomatic complexity")
+    if code.count("\n") >= MAX_LINE_CFG_LINES:
+        return build_result(summary, function_cfg(summary))
 
-    quality_score = max(
-        0,
-        100 - (complexity * 2) - (loop_depth * 5) - (len(issues) * 5)
-    )
+    lines = code.splitlines()
 
 # -------- STRUCTURED CFG WITH LOOP BACK EDGES --------
 
@@ -97,16 +59,8 @@ def analyze_java(code: str):
 
     cfg = {
         "nodes": nodes,
-        "edges": edges
+        "edges": edges,
+        "functions": line_functions(nodes, summary)
     }
-    
-    return {
-        "loop_depth": loop_depth,
-        "recursive_functions": recursive_functions,
-        "estimated_complexity": f"O(n^{loop_depth})" if loop_depth > 0 else "O(1)",
-        "cyclomatic_complexity": complexity,
-        "quality_score": quality_score,
-        "issues": issues,
-        "suggestions": ["Consider refactoring"] if issues else [],
-        "cfg": cfg
-    }
\ No newline at end of file
+
+    return build_result(summary, cfg)
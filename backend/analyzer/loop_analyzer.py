@@ -1,19 +1,16 @@
-import ast
+from analyzer.engine import AnalyzerPlugin
 
-class LoopAnalyzer(ast.NodeVisitor):
+class LoopAnalyzer(AnalyzerPlugin):
     def __init__(self):
         self.loop_depth = 0
         self.max_depth = 0
 
-    def visit_For(self, node):
+    def enter_For(self, node):
         self.loop_depth += 1
         self.max_depth = max(self.max_depth, self.loop_depth)
-        self.generic_visit(node)
-        self.loop_depth -= 1
 
-    def visit_While(self, node):
-        self.loop_depth += 1
-        self.max_depth = max(self.max_depth, self.loop_depth)
-        self.generic_visit(node)
+    def leave_For(self, node):
         self.loop_depth -= 1
-1
\ No newline at end of file
+
+    enter_While = enter_For
+    leave_While = leave_For
@@ -1,29 +1,42 @@
-import ast
-
-class PatternDetector(ast.NodeVisitor):
-    def __init__(self):
-        self.issues = []
-
-    def visit_For(self, node):
-        # nested loop detection
-        for child in ast.walk(node):
-            if isinstance(child, ast.For):
-                self.issues.append("Nested loop detected — may cause O(n²) complexity.")
-        self.generic_visit(node)
-
-    def visit_Call(self, node):
-        # inefficient list search
-        if isinstance(node.func, ast.Attribute):
-            if node.func.attr == "append":
-                pass
-        self.generic_visit(node)
-
-    def visit_FunctionDef(self, node):
-        # long function warning
-        if len(node.body) > 20:
-            self.issues.append(f"Function '{node.name}' is too long. Consider breaking it into smaller functions.")
-        self.generic_visit(node)
+from analyzer.engine import AnalysisEngine, AnalyzerPlugin
+from analyzer.perf_rules import INFO, RULES, LoopContext
+
+
+class PatternDetector(AnalyzerPlugin):
+    # Hosts the performance rules registered in analyzer.perf_rules.
+    # The rules are plugins themselves: add plugins() to the shared
+    # engine so they run in the same traversal as every other analyzer.
+
+    def __init__(self, module_kinds=None):
+        # module_kinds: kinds of module-level names bound by earlier
+        # statements (see module_kinds())
+        self.context = LoopContext(module_kinds)
+        self.rules = [rule(self.context) for rule in RULES]
+
+    def module_kinds(self):
+        return dict(self.context.kinds[0])
+
+    def plugins(self):
+        return [self.context] + self.rules
+
+    def visit(self, tree):
+        AnalysisEngine(self.plugins()).run(tree)
+
+    @property
+    def findings(self):
+        findings = [finding for rule in self.rules for finding in rule.findings]
+        findings.sort(key=lambda finding: (finding.line, finding.rule))
+        return findings
+
+    @property
+    def issues(self):
+        return issue_messages(self.findings)
 
     def detect(self, tree):
         self.visit(tree)
         return self.issues
+
+
+def issue_messages(findings):
+    # Plain strings for clients that only render text; hints are left out
+    return [f"Line {finding.line}: {finding.message}" for finding in findings if finding.severity != INFO]
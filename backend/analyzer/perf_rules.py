@@ -0,0 +1,441 @@
+import ast
+
+from analyzer.engine import AnalyzerPlugin
+from analyzer.symbolic_engine import HASH, LIST, annotation_kind, value_kind
+
+
+INFO, WARNING, ERROR = "info", "warning", "error"
+
+STRING = "str"
+
+# Methods that change a collection's length
+MUTATING_METHODS = frozenset((
+    "append", "extend", "insert", "pop", "remove", "clear", "add", "discard",
+    "update", "popitem", "appendleft", "popleft", "extendleft", "setdefault"
+))
+
+# Calls whose result only depends on their arguments, each O(n) or worse
+PURE_CALLS = frozenset(("sum", "min", "max", "sorted", "set", "list", "tuple", "any", "all", "Counter"))
+
+
+class Finding:
+    __slots__ = ("rule", "line", "severity", "message", "fix")
+
+    def __init__(self, rule, line, severity, message, fix):
+        self.rule = rule
+        self.line = line
+        self.severity = severity
+        self.message = message
+        self.fix = fix
+
+    def moved(self, offset):
+        if not offset:
+            return self
+        return Finding(self.rule, self.line + offset, self.severity, self.message, self.fix)
+
+    def to_dict(self):
+        return {
+            "rule": self.rule,
+            "line": self.line,
+            "severity": self.severity,
+            "message": self.message,
+            "fix": self.fix
+        }
+
+
+# ============================================================
+# Shared loop / type context
+# ============================================================
+
+class LoopContext(AnalyzerPlugin):
+    # Loops around the current node (inside the current function) and
+    # what kind of value local names hold. Runs before every rule.
+
+    def __init__(self, module_kinds=None):
+        self.loops = []                 # For/While/comprehension nodes
+        self.statement_loops = 0        # For/While only
+        self.kinds = [dict(module_kinds or {})]
+        self.saved = []
+
+    def enter_FunctionDef(self, node):
+        self.saved.append((self.loops, self.statement_loops))
+        self.loops = []
+        self.statement_loops = 0
+
+        kinds = {}
+        for argument in node.args.args + node.args.kwonlyargs:
+            if argument.annotation is not None:
+                kind = annotation_kind(argument.annotation)
+                if kind is not None:
+                    kinds[argument.arg] = kind
+        self.kinds.append(kinds)
+
+    def leave_FunctionDef(self, node):
+        self.loops, self.statement_loops = self.saved.pop()
+        self.kinds.pop()
+
+    enter_AsyncFunctionDef = enter_FunctionDef
+    leave_AsyncFunctionDef = leave_FunctionDef
+
+    def enter_loop(self, node):
+        self.loops.append(node)
+        self.statement_loops += 1
+
+    def leave_loop(self, node):
+        self.loops.pop()
+        self.statement_loops -= 1
+
+    enter_For = enter_AsyncFor = enter_While = enter_loop
+    leave_For = leave_AsyncFor = leave_While = leave_loop
+
+    def enter_comprehension_node(self, node):
+        self.loops.append(node)
+
+    def leave_comprehension_node(self, node):
+        self.loops.pop()
+
+    enter_ListComp = enter_SetComp = enter_DictComp = enter_GeneratorExp = enter_comprehension_node
+    leave_ListComp = leave_SetComp = leave_DictComp = leave_GeneratorExp = leave_comprehension_node
+
+    def enter_Assign(self, node):
+        kind = value_kind(node.value)
+        if kind is None and (
+            isinstance(node.value, ast.JoinedStr)
+            or isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+        ):
+            kind = STRING
+
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                if kind is not None:
+                    self.kinds[-1][target.id] = kind
+                else:
+                    self.kinds[-1].pop(target.id, None)
+
+    def kind(self, node):
+        if isinstance(node, ast.Name):
+            return self.kinds[-1].get(node.id, self.kinds[0].get(node.id))
+        return value_kind(node)
+
+    def per_iteration(self, node):
+        # True when `node` runs once per iteration of an enclosing loop
+        # (a for-loop's iterable is evaluated only once)
+        position = (node.lineno, node.col_offset)
+        for loop in reversed(self.loops):
+            if isinstance(loop, (ast.For, ast.AsyncFor)):
+                if position >= (loop.body[0].lineno, loop.body[0].col_offset):
+                    return True
+                continue
+            if isinstance(loop, ast.While):
+                return True
+            generator = loop.generators[0].iter
+            if not (generator.lineno, generator.col_offset) <= position < (generator.end_lineno, generator.end_col_offset):
+                return True
+        return False
+
+
+# ============================================================
+# Rule registry
+# ============================================================
+
+RULES = []
+
+
+def register(rule):
+    RULES.append(rule)
+    return rule
+
+
+class Rule(AnalyzerPlugin):
+    # A rule is an analyzer plugin with access to the shared context.
+    # All registered rules run in the same traversal as the analyzers.
+    id = None
+    severity = WARNING
+
+    def __init__(self, context):
+        self.context = context
+        self.findings = []
+
+    def report(self, node, message, fix, severity=None, rule=None):
+        self.findings.append(Finding(rule or self.id, node.lineno, severity or self.severity, message, fix))
+
+
+@register
+class NestedLoopRule(Rule):
+    id = "nested-loop"
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.reported = set()
+
+    def enter_loop(self, node):
+        # Reported once per loop nest, at its outermost loop
+        if self.context.statement_loops < 2:
+            return
+
+        outer = next(loop for loop in self.context.loops if not hasattr(loop, "generators"))
+        if id(outer) in self.reported:
+            return
+
+        self.reported.add(id(outer))
+        self.report(
+            outer,
+            "Nested loop detected — may cause O(n²) complexity.",
+            "Replace the inner loop with a dict/set lookup, sorting with two pointers, or a prefix sum."
+        )
+
+    enter_For = enter_AsyncFor = enter_While = enter_loop
+
+
+@register
+class LongFunctionRule(Rule):
+    id = "long-function"
+
+    def enter_FunctionDef(self, node):
+        if len(node.body) > 20:
+            self.report(
+                node,
+                f"Function '{node.name}' is too long. Consider breaking it into smaller functions.",
+                f"Split '{node.name}' into smaller helper functions."
+            )
+
+    enter_AsyncFunctionDef = enter_FunctionDef
+
+
+@register
+class ListMembershipRule(Rule):
+    id = "list-membership-in-loop"
+
+    def enter_Compare(self, node):
+        if not self.context.loops or not self.context.per_iteration(node):
+            return
+
+        for op, container in zip(node.ops, node.comparators):
+            if not isinstance(op, (ast.In, ast.NotIn)) or not isinstance(container, ast.Name):
+                continue
+            if self.context.kind(container) != LIST:
+                continue
+
+            self.report(
+                node,
+                f"Membership test on list '{container.id}' inside a loop is O(n) per check.",
+                f"Build a set once before the loop (e.g. {container.id}_set = set({container.id})) and test against it."
+            )
+
+
+@register
+class StringConcatRule(Rule):
+    id = "string-concat-in-loop"
+
+    def enter_AugAssign(self, node):
+        if not isinstance(node.op, ast.Add) or not isinstance(node.target, ast.Name):
+            return
+        if not self.context.loops or not self.context.per_iteration(node):
+            return
+
+        value = node.value
+        is_string = (
+            self.context.kind(node.target) == STRING
+            or isinstance(value, ast.JoinedStr)
+            or isinstance(value, ast.Constant) and isinstance(value.value, str)
+        )
+        if is_string:
+            self.report(
+                node,
+                f"String '{node.target.id}' is built with += inside a loop (quadratic copying).",
+                "Append the pieces to a list and ''.join() it after the loop."
+            )
+
+
+@register
+class ListFrontRule(Rule):
+    id = "list-front-operation"
+
+    def enter_Call(self, node):
+        func = node.func
+        if not isinstance(func, ast.Attribute) or func.attr not in ("pop", "insert") or not node.args:
+            return
+
+        first = node.args[0]
+        if not (isinstance(first, ast.Constant) and first.value == 0):
+            return
+        if self.context.kind(func.value) == HASH:
+            return
+
+        receiver = ast.unparse(func.value)
+        in_loop = bool(self.context.loops) and self.context.per_iteration(node)
+        self.report(
+            node,
+            f"'{receiver}.{func.attr}(0, ...)' shifts every element (O(n))."
+            if func.attr == "insert" else
+            f"'{receiver}.pop(0)' shifts every element (O(n)).",
+            "Use collections.deque with appendleft()/popleft() (O(1))."
+            if func.attr == "insert" else
+            "Use collections.deque and popleft() (O(1)).",
+            severity=WARNING if in_loop else INFO
+        )
+
+
+@register
+class SortedIndexRule(Rule):
+    id = "sorted-then-index"
+
+    def enter_Subscript(self, node):
+        call = node.value
+        if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == "sorted"):
+            return
+
+        index = node.slice
+        if isinstance(index, ast.UnaryOp) and isinstance(index.op, ast.USub):
+            index = index.operand
+
+        if isinstance(index, ast.Constant) and index.value in (0, 1):
+            self.report(
+                node,
+                "Sorting the whole sequence to read its smallest/largest element is O(n log n).",
+                "Use min(...) or max(...) instead (O(n))."
+            )
+        elif isinstance(index, ast.Slice):
+            self.report(
+                node,
+                "Sorting the whole sequence to take its first/last k elements is O(n log n).",
+                "Use heapq.nsmallest(k, ...) or heapq.nlargest(k, ...) (O(n log k))."
+            )
+
+
+@register
+class LoopInvariantRule(Rule):
+    # len(x) / pure O(n) calls / long attribute chains whose inputs do not
+    # change inside the loop are recomputed on every iteration.
+    id = "loop-invariant-call"
+    severity = INFO
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.frames = []                # per For/While: candidates, assigned names
+        self.saved = []
+
+    def enter_FunctionDef(self, node):
+        self.saved.append(self.frames)
+        self.frames = []
+
+    def leave_FunctionDef(self, node):
+        self.frames = self.saved.pop()
+
+    enter_AsyncFunctionDef = enter_FunctionDef
+    leave_AsyncFunctionDef = leave_FunctionDef
+
+    def enter_loop(self, node):
+        assigned = set()
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            assigned.update(_names(node.target))
+        self.frames.append((node, [], assigned))
+
+    def leave_loop(self, node):
+        loop, candidates, assigned = self.frames.pop()
+        reported = set()
+
+        for call, kind, text, names in candidates:
+            if names & assigned or text in reported:
+                continue
+            reported.add(text)
+
+            if kind == "len":
+                self.report(
+                    call, f"{text} is recomputed on every iteration.",
+                    f"Compute it once before the loop (e.g. size = {text}).",
+                    rule="hoist-len"
+                )
+            elif kind == "attribute":
+                self.report(
+                    call, f"Attribute chain '{text}' is looked up on every iteration of a nested loop.",
+                    f"Bind it to a local before the loop (e.g. {text.rsplit('.', 1)[-1]} = {text}).",
+                    rule="hoist-attribute"
+                )
+            else:
+                self.report(
+                    call, f"{text} does not change inside the loop but is recomputed on every iteration.",
+                    "Compute it once before the loop, or memoize it if it depends on slowly changing state.",
+                    severity=WARNING
+                )
+
+        # Whatever changes in an inner loop changes in the outer one too
+        if self.frames:
+            self.frames[-1][2].update(assigned)
+
+    enter_For = enter_AsyncFor = enter_While = enter_loop
+    leave_For = leave_AsyncFor = leave_While = leave_loop
+
+    def enter_Assign(self, node):
+        if self.frames:
+            for target in node.targets:
+                self.frames[-1][2].update(_names(target))
+
+    def enter_AugAssign(self, node):
+        if self.frames:
+            self.frames[-1][2].update(_names(node.target))
+
+    enter_AnnAssign = enter_AugAssign
+
+    def enter_Call(self, node):
+        if not self.frames:
+            return
+
+        func = node.func
+        loop, candidates, assigned = self.frames[-1]
+
+        if isinstance(func, ast.Attribute):
+            base = func.value
+            if func.attr in MUTATING_METHODS and isinstance(base, ast.Name):
+                assigned.add(base.id)
+                return
+
+            # a.b.c(...) in a nested loop
+            if isinstance(base, ast.Attribute) and self.context.statement_loops >= 2 and self.context.per_iteration(node):
+                chain = ast.unparse(func)
+                root = base
+                while isinstance(root, ast.Attribute):
+                    root = root.value
+                if isinstance(root, ast.Name):
+                    candidates.append((node, "attribute", chain, {root.id}))
+            return
+
+        if not isinstance(func, ast.Name) or not node.args or not self.context.per_iteration(node):
+            return
+
+        if func.id == "len" and isinstance(node.args[0], ast.Name):
+            candidates.append((node, "len", f"len({node.args[0].id})", {node.args[0].id}))
+
+        elif func.id in PURE_CALLS and all(isinstance(argument, (ast.Name, ast.Attribute)) for argument in node.args):
+            names = set()
+            for argument in node.args:
+                names.update(_names(argument))
+            candidates.append((node, "pure", ast.unparse(node), names))
+
+
+def _names(node):
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+
+
+# ============================================================
+# Whole-program rules
+# ============================================================
+
+def recursion_findings(recursion, lines):
+    # Branching recursion without a cache recomputes the same subproblems
+    findings = []
+
+    for summary in recursion:
+        if summary.shape != "branching" or summary.memoized or summary.reduction != "decrement":
+            continue
+
+        name = summary.functions[0]
+        findings.append(Finding(
+            "memoize-recursion",
+            lines.get(name),
+            WARNING,
+            f"'{name}' recomputes overlapping subproblems ({summary.recurrence}).",
+            "Cache results with @functools.cache, or rewrite it bottom-up as dynamic programming."
+        ))
+
+    return findings
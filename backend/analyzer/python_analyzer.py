@@ -0,0 +1,228 @@
+import time
+
+from analyzer.ast_parser import ASTParser
+from analyzer.engine import AnalysisEngine, StageTimer
+from analyzer.loop_analyzer import LoopAnalyzer
+from analyzer.recursion_detector import RecursionDetector
+from analyzer.complexity_engine import ComplexityEngine
+from analyzer.optimizer import Optimizer
+from analyzer.cfg_generator import CFGGenerator
+from analyzer.cyclomatic import CyclomaticComplexity
+from analyzer.pattern_detector import PatternDetector, issue_messages
+from analyzer.perf_rules import recursion_findings
+from analyzer.quality_score import QualityScorer
+from analyzer.recurrence import analyze_recursion
+from analyzer.symbolic_engine import FunctionCost, SymbolicCostModel, summarize_costs
+
+
+# Stateless, shared by every request
+COMPLEXITY_ENGINE = ComplexityEngine()
+OPTIMIZER = Optimizer()
+QUALITY_SCORER = QualityScorer()
+
+
+class StatementMetrics:
+    # Metrics of one or more statements. Apart from what module-level
+    # names hold (module_scope, as of the end of the statements), none of
+    # the plugins carries state across a top-level statement boundary, so
+    # metrics of consecutive statements can be merged without re-walking
+    # them.
+    # Recursion is a property of the whole call graph, so statements only
+    # contribute their functions and resolved call sites.
+    # The same holds for symbolic costs: calls between functions are
+    # substituted after merging.
+    #
+    # Line numbers (findings, function lines) are those of the parse that
+    # produced the metrics; merge() moves them by the statement's offset.
+    __slots__ = (
+        "max_depth", "functions", "lines", "call_sites", "costs", "decision_points", "findings", "module_scope"
+    )
+
+    def __init__(self, max_depth=0, functions=None, call_sites=None, costs=None, decision_points=0, findings=(),
+                 module_scope=None):
+        self.max_depth = max_depth
+        self.functions = functions if functions is not None else {}
+        self.lines = {name: info.node.lineno for name, info in self.functions.items()}
+        self.call_sites = call_sites if call_sites is not None else {}
+        self.costs = costs if costs is not None else {}
+        self.decision_points = decision_points
+        self.findings = list(findings)
+        self.module_scope = module_scope
+
+    def merge(self, other, line_offset=0):
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.functions.update(other.functions)
+        for name, line in other.lines.items():
+            self.lines[name] = line + line_offset
+        for name, sites in other.call_sites.items():
+            self.call_sites.setdefault(name, []).extend(sites)
+
+        module = self.costs.get("<module>")
+        self.costs.update(other.costs)
+        if module is not None and "<module>" in other.costs:
+            extra = other.costs["<module>"]
+            self.costs["<module>"] = FunctionCost(module.cost + extra.cost, module.calls + extra.calls)
+
+        self.decision_points += other.decision_points
+        self.findings.extend(finding.moved(line_offset) for finding in other.findings)
+        self.module_scope = other.module_scope
+
+
+def collect_metrics(node, cfg_generator=None, plugin_timings=None, module_scope=None):
+    # Single traversal, each node dispatched to every plugin.
+    # module_scope: that of the metrics of the statements before `node`.
+    kinds, bounds, pattern_kinds = module_scope or (None, None, None)
+
+    loop_analyzer = LoopAnalyzer()
+    recursion_detector = RecursionDetector()
+    cost_model = SymbolicCostModel(recursion_detector, (kinds, bounds) if module_scope else None)
+    cyclomatic = CyclomaticComplexity()
+    pattern_detector = PatternDetector(pattern_kinds)
+
+    # The cost model reads the detector's scopes, so it runs right after it
+    plugins = [loop_analyzer, recursion_detector, cost_model, cyclomatic] + pattern_detector.plugins()
+    if cfg_generator is not None:
+        plugins.insert(3, cfg_generator)
+
+    if plugin_timings is None:
+        AnalysisEngine(plugins).run(node)
+    else:
+        _timed_run(plugins, node, plugin_timings, {
+            loop_analyzer: "loops",
+            recursion_detector: "calls",
+            cost_model: "symbolic",
+            cyclomatic: "cyclomatic",
+            cfg_generator: "cfg"
+        })
+
+    call_sites = recursion_detector.call_sites()
+
+    return StatementMetrics(
+        loop_analyzer.max_depth,
+        recursion_detector.functions,
+        call_sites,
+        cost_model.function_costs(call_sites),
+        cyclomatic.complexity - 1,
+        pattern_detector.findings,
+        (*cost_model.module_scope(), pattern_detector.module_kinds())
+    )
+
+
+def same_module_scope(a, b):
+    # True when statements after either scope get the same metrics
+    if a is None or b is None:
+        return a is b
+    kinds, bounds, pattern_kinds = a
+    other_kinds, other_bounds, other_pattern_kinds = b
+    return (
+        kinds == other_kinds
+        and pattern_kinds == other_pattern_kinds
+        and bounds.keys() == other_bounds.keys()
+        and all(cost.terms == other_bounds[name].terms for name, cost in bounds.items())
+    )
+
+
+def _timed_run(plugins, node, plugin_timings, stages):
+    # Time per plugin; the rule plugins are summed as "patterns" and the
+    # walk itself (what no handler accounts for) is "walk"
+    timings = {}
+    start = time.perf_counter()
+    AnalysisEngine(plugins, timings).run(node)
+    total = time.perf_counter() - start
+
+    for plugin, seconds in timings.items():
+        stage = stages.get(plugin, "patterns")
+        plugin_timings[stage] = plugin_timings.get(stage, 0.0) + seconds
+    plugin_timings["walk"] = plugin_timings.get("walk", 0.0) + total - sum(timings.values())
+
+
+def build_result(metrics, cfg_graph, timings=None):
+    timer = StageTimer(timings)
+    loop_depth = metrics.max_depth
+    cyclomatic_complexity = 1 + metrics.decision_points
+
+    # Recursive cycles of the call graph, with their recurrences
+    recursion = analyze_recursion(metrics.functions, metrics.call_sites)
+    recursive = set()
+    for summary in recursion:
+        recursive.update(summary.functions)
+    recursive_functions = [name for name in metrics.functions if name in recursive]
+    timer.mark("recursion")
+
+    # Symbolic cost of every function from its loop bounds
+    symbolic = summarize_costs(metrics.functions, metrics.costs)
+    timer.mark("symbolic")
+
+    # Complexity estimation
+    estimated_complexity = COMPLEXITY_ENGINE.estimate(loop_depth, recursive_functions, recursion, symbolic)
+    timer.mark("complexity")
+
+    # Performance findings, recursion that needs a cache included
+    findings = metrics.findings + recursion_findings(recursion, metrics.lines)
+    findings.sort(key=lambda finding: (finding.line, finding.rule))
+    issues = issue_messages(findings)
+
+    # Optimization suggestions
+    suggestions = OPTIMIZER.suggest(findings)
+    timer.mark("patterns")
+
+    # Quality score
+    quality_score = QUALITY_SCORER.score(
+        cyclomatic_complexity,
+        loop_depth,
+        recursive_functions,
+        issues
+    )
+    timer.mark("scoring")
+
+    result = {
+        "loop_depth": loop_depth,
+        "recursive_functions": recursive_functions,
+        "recursion": [summary.to_dict() for summary in recursion],
+        "symbolic_complexity": symbolic.to_dict(),
+        "estimated_complexity": estimated_complexity,
+        "suggestions": suggestions,
+        "cyclomatic_complexity": cyclomatic_complexity,
+        # McCabe's E - N + 2P over the CFG: each function and the module
+        # body count as separate graphs, so every function adds a base
+        # path that cyclomatic_complexity (1 + decision points) has once.
+        # Only branches of the graph count: and/or and `while True` do
+        # not, each match case does.
+        "cfg_graph_complexity": cfg_graph.cyclomatic_complexity(),
+        "quality_score": quality_score,
+        "issues": issues,
+        "findings": [finding.to_dict() for finding in findings],
+        "call_graph": {
+            name: sorted({callee for callee, _, _ in sites if callee in metrics.functions})
+            for name, sites in metrics.call_sites.items()
+            if name in metrics.functions
+        },
+        "cfg": cfg_graph.to_dict()
+    }
+    timer.mark("serialize")
+
+    return result
+
+
+def analyze_python(code: str, timings=None, detailed=False):
+    # timings: optional dict, filled with seconds per stage. `detailed`
+    # also splits the traversal per plugin ("traverse.loops", ...), at
+    # the cost of timing every handler call.
+    timer = StageTimer(timings)
+
+    # Single parse shared by every analyzer
+    parser = ASTParser(code)
+    tree = parser.get_tree()
+    timer.mark("parse")
+
+    plugin_timings = {} if detailed and timings is not None else None
+
+    cfg_generator = CFGGenerator(code)
+    metrics = collect_metrics(tree, cfg_generator, plugin_timings)
+    timer.mark("traverse")
+
+    if plugin_timings is not None:
+        for stage, seconds in plugin_timings.items():
+            timings["traverse." + stage] = seconds
+
+    return build_result(metrics, cfg_generator.graph, timings)
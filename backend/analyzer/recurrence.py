@@ -0,0 +1,414 @@
+import ast
+import math
+
+from analyzer.call_graph import recursive_cycles
+
+
+MEMO_DECORATORS = frozenset(("cache", "lru_cache"))
+
+
+# ============================================================
+# Growth classes
+# ============================================================
+
+class Growth:
+    # base^n * n^degree * log(n)^log, ordered by how fast it grows
+
+    __slots__ = ("base", "degree", "log")
+
+    def __init__(self, base=1, degree=0, log=0):
+        self.base = base
+        self.degree = degree
+        self.log = log
+
+    def key(self):
+        return (self.base, round(self.degree, 6), self.log)
+
+    def __str__(self):
+        if self.base > 1:
+            return f"O({self.base}^n)"
+
+        parts = []
+        if self.degree == 1:
+            parts.append("n")
+        elif self.degree:
+            degree = round(self.degree, 2)
+            parts.append(f"n^{int(degree) if degree == int(degree) else degree}")
+
+        if self.log == 1:
+            parts.append("log n")
+        elif self.log:
+            parts.append(f"log^{self.log} n")
+
+        return f"O({' '.join(parts) or '1'})"
+
+
+def dominant(growths):
+    return max(growths, key=Growth.key)
+
+
+def master_theorem(a, b, d):
+    # T(n) = a T(n/b) + O(n^d)
+    critical = math.log(a, b)
+
+    if abs(d - critical) < 1e-9:
+        return Growth(degree=d, log=1)
+    if d > critical:
+        return Growth(degree=d)
+    return Growth(degree=critical)
+
+
+# ============================================================
+# Argument reduction
+# ============================================================
+
+def _constant(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _constant(node.operand)
+        return -value if value is not None else None
+    return None
+
+
+def _divisor(node, halving_names):
+    # n // 2, n / 3, n >> 1, or a name assigned from such an expression
+    for child in ast.walk(node):
+        if isinstance(child, ast.BinOp):
+            value = _constant(child.right)
+            if value is None:
+                continue
+            if isinstance(child.op, (ast.FloorDiv, ast.Div)) and value >= 2:
+                return int(value)
+            if isinstance(child.op, ast.RShift) and value >= 1:
+                return 2 ** int(value)
+
+        elif isinstance(child, ast.Name) and child.id in halving_names:
+            return 2
+
+    return None
+
+
+def _decrements(node):
+    # n - 1, arr[1:], arr[:-1]
+    for child in ast.walk(node):
+        if isinstance(child, ast.BinOp) and isinstance(child.op, ast.Sub):
+            value = _constant(child.right)
+            if value is not None and value > 0:
+                return True
+
+        elif isinstance(child, ast.Slice):
+            lower = _constant(child.lower) if child.lower is not None else None
+            upper = _constant(child.upper) if child.upper is not None else None
+            if (lower is not None and lower > 0) or (upper is not None and upper < 0):
+                return True
+
+    return False
+
+
+def _halving_names(function):
+    # Names assigned from a halving expression: mid = (lo + hi) // 2
+    names = set()
+
+    for node in function.assignments:
+        if node.value is None or _divisor(node.value, ()) is None:
+            continue
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        for target in targets:
+            for name in ast.walk(target):
+                if isinstance(name, ast.Name):
+                    names.add(name.id)
+
+    return names
+
+
+def _is_memoized(function):
+    for decorator in function.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        name = target.attr if isinstance(target, ast.Attribute) else getattr(target, "id", None)
+        if name in MEMO_DECORATORS:
+            return True
+    return False
+
+
+def _reduction(call, halving_names):
+    arguments = list(call.args) + [keyword.value for keyword in call.keywords]
+
+    divisors = [_divisor(argument, halving_names) for argument in arguments]
+    divisors = [divisor for divisor in divisors if divisor]
+    if divisors:
+        return "halving", min(divisors)
+
+    if any(_decrements(argument) for argument in arguments):
+        return "decrement", None
+
+    return "unknown", None
+
+
+# ============================================================
+# Branching factor
+# ============================================================
+# The branches of an if/match are alternatives, so the calls made by one
+# invocation are counted along the most expensive path: each call's
+# context is turned into a path of (branch node, arm) steps, the paths
+# are merged into a trie, and alternative arms take the max.
+#
+# An if whose body always returns or raises makes the statements after
+# it an implicit else: in
+#
+#   if a[mid] < x:
+#       return search(a, mid + 1, hi, x)
+#   return search(a, lo, mid - 1, x)
+#
+# only one of the two calls runs.
+
+def _position(node):
+    return (node.lineno, node.col_offset)
+
+
+def _end(node):
+    return (node.end_lineno, node.end_col_offset)
+
+
+def _leaves(body):
+    # True when running `body` always ends with a return or raise
+    if not body:
+        return False
+    last = body[-1]
+    if isinstance(last, (ast.Return, ast.Raise)):
+        return True
+    if isinstance(last, ast.If):
+        return _leaves(last.body) and _leaves(last.orelse)
+    return False
+
+
+def _early_exits(function):
+    # [(if node, end of its enclosing block)] for every if in `function`
+    # whose body always leaves it
+    exits = []
+    for node in ast.walk(function):
+        for field in ("body", "orelse", "finalbody"):
+            block = getattr(node, field, None)
+            if not isinstance(block, list) or not block or not isinstance(block[0], ast.stmt):
+                continue
+            for statement in block:
+                if isinstance(statement, ast.If) and _leaves(statement.body):
+                    exits.append((statement, _end(block[-1])))
+    return exits
+
+
+def _arm(control, call):
+    # Which part of `control` the call sits in; None when it runs
+    # regardless of the branch taken (the test) or is not a branch.
+    position = _position(call)
+
+    if isinstance(control, ast.If):
+        if control.orelse and position >= _position(control.orelse[0]):
+            return 1
+        return 0 if position >= _position(control.body[0]) else None
+
+    if isinstance(control, ast.IfExp):
+        # "body if test else orelse"
+        if position >= _position(control.orelse):
+            return 1
+        return None if position >= _position(control.test) else 0
+
+    if isinstance(control, ast.Match):
+        arm = None
+        for index, case in enumerate(control.cases):
+            if position >= _position(case.pattern):
+                arm = index
+        return arm
+
+    return None
+
+
+def _in_loop(control, call):
+    if isinstance(control, (ast.For, ast.AsyncFor)):
+        return _position(call) >= _position(control.body[0])
+    return isinstance(control, (ast.While, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp))
+
+
+def _fan_out(loop):
+    # Iterations of a loop with a fixed trip count: range(4), range(1, 5),
+    # a literal tuple of moves. None when it depends on the data.
+    if isinstance(loop, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+        if len(loop.generators) != 1 or loop.generators[0].ifs:
+            return None
+        iterable = loop.generators[0].iter
+    elif isinstance(loop, (ast.For, ast.AsyncFor)):
+        iterable = loop.iter
+    else:
+        return None
+
+    if isinstance(iterable, (ast.Tuple, ast.List, ast.Set)):
+        return len(iterable.elts)
+
+    if (
+        isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name)
+        and iterable.func.id == "range" and 1 <= len(iterable.args) <= 2
+    ):
+        bounds = [_constant(argument) for argument in iterable.args]
+        if all(isinstance(bound, int) for bound in bounds):
+            return max(bounds[-1] - (bounds[0] if len(bounds) == 2 else 0), 0)
+
+    return None
+
+
+class _PathTrie:
+    __slots__ = ("calls", "branches")
+
+    def __init__(self):
+        self.calls = 0
+        self.branches = {}          # id(branch node) -> {arm: _PathTrie}
+
+    def add(self, steps, calls=1):
+        trie = self
+        for branch, arm in steps:
+            trie = trie.branches.setdefault(id(branch), {}).setdefault(arm, _PathTrie())
+        trie.calls += calls
+
+    def count(self):
+        return self.calls + sum(
+            max(arm.count() for arm in arms.values())
+            for arms in self.branches.values()
+        )
+
+
+# ============================================================
+# Recursion summaries
+# ============================================================
+
+class RecursionSummary:
+    __slots__ = ("functions", "shape", "branching_factor", "reduction", "memoized", "recurrence", "growth")
+
+    def __init__(self, functions):
+        self.functions = functions
+        self.shape = "unknown"
+        self.branching_factor = 0
+        self.reduction = "unknown"
+        self.memoized = False
+        self.recurrence = None
+        self.growth = None
+
+    def to_dict(self):
+        return {
+            "functions": self.functions,
+            "shape": self.shape,
+            "branching_factor": self.branching_factor,
+            "reduction": self.reduction,
+            "memoized": self.memoized,
+            "recurrence": self.recurrence,
+            "complexity": str(self.growth) if self.growth is not None else None
+        }
+
+
+def analyze_recursion(functions, call_sites):
+    # functions: qualified name -> FunctionInfo; call_sites: caller ->
+    # [(callee, call node, context)]. Tarjan over the call graph is
+    # O(V + E), and only the recursive call sites are examined after it.
+    graph = {
+        name: {callee for callee, _, _ in call_sites.get(name, ())}
+        for name in functions
+    }
+    order = {name: index for index, name in enumerate(functions)}
+    summaries = []
+
+    for component in recursive_cycles(graph):
+        members = set(component)
+        summary = RecursionSummary(sorted(component, key=order.get))
+
+        reductions = []
+        in_loop = False
+        work = 0
+
+        for name in summary.functions:
+            function = functions[name]
+            halving_names = None
+            exits = None
+            trie = _PathTrie()
+
+            for callee, call, context in call_sites.get(name, ()):
+                if callee not in members:
+                    continue
+
+                if halving_names is None:
+                    halving_names = _halving_names(function)
+                    exits = _early_exits(function.node)
+                reductions.append(_reduction(call, halving_names))
+
+                position = _position(call)
+                steps = [
+                    (branch, 1) for branch, block_end in exits
+                    if _end(branch) <= position <= block_end
+                ]
+                calls = 1
+                while context is not None:
+                    control, context = context
+                    arm = _arm(control, call)
+                    if arm is not None:
+                        steps.append((control, arm))
+                    if _in_loop(control, call):
+                        # A call in a loop runs once per iteration
+                        fan_out = _fan_out(control)
+                        if fan_out is None:
+                            in_loop = True
+                        else:
+                            calls *= fan_out
+                steps.sort(key=lambda step: _position(step[0]))
+                trie.add(steps, calls)
+
+            summary.branching_factor = max(summary.branching_factor, trie.count())
+            summary.memoized = summary.memoized or _is_memoized(function.node)
+
+            # Non-recursive work done by one call
+            work = max(work, function.loop_depth, 1 if function.copies_input else 0)
+            for callee in graph[name] - members:
+                if callee in functions:
+                    work = max(work, functions[callee].loop_depth)
+
+        kinds = {kind for kind, _ in reductions}
+        if kinds == {"halving"}:
+            summary.reduction = "halving"
+        elif "decrement" in kinds and "unknown" not in kinds:
+            summary.reduction = "decrement"
+
+        _solve(summary, reductions, in_loop, work)
+        summaries.append(summary)
+
+    return summaries
+
+
+def _solve(summary, reductions, in_loop, work):
+    calls = summary.branching_factor
+    cost = Growth(degree=work)
+
+    if in_loop:
+        # Backtracking: the fan-out depends on the data, so neither the
+        # branching factor nor the growth is known
+        summary.shape = "backtracking"
+        summary.branching_factor = None
+        return
+
+    if summary.reduction == "halving":
+        divisor = min(divisor for _, divisor in reductions)
+        summary.shape = "divide_and_conquer"
+        summary.recurrence = f"T(n) = {_times(calls)}T(n/{divisor}) + {cost}"
+        summary.growth = master_theorem(calls, divisor, work)
+
+    elif summary.reduction == "decrement":
+        summary.shape = "linear" if calls == 1 else "branching"
+        summary.recurrence = f"T(n) = {_times(calls)}T(n-1) + {cost}"
+
+        # Memoized calls are computed once per distinct argument
+        if calls == 1 or summary.memoized:
+            summary.growth = Growth(degree=work + 1)
+        else:
+            summary.growth = Growth(base=calls)
+
+    elif calls > 1:
+        summary.shape = "branching"
+
+
+def _times(calls):
+    return "" if calls == 1 else str(calls)
@@ -1,17 +1,178 @@
 import ast
 
-class RecursionDetector(ast.NodeVisitor):
+from analyzer.engine import AnalyzerPlugin
+
+
+class FunctionInfo:
+    # What the recurrence solver needs to know about one function,
+    # gathered during the shared traversal so it never re-walks bodies.
+    __slots__ = (
+        "name", "node", "parent", "class_name", "receiver",
+        "loop_depth", "open_loops", "assignments", "copies_input"
+    )
+
+    def __init__(self, name, node, parent, class_name, receiver):
+        self.name = name                # qualified: "Solver.solve", "outer.inner"
+        self.node = node
+        self.parent = parent            # enclosing FunctionInfo (class bodies are not scopes)
+        self.class_name = class_name    # set for methods
+        self.receiver = receiver        # "self" / "cls" for methods
+
+        self.loop_depth = 0
+        self.open_loops = 0
+        self.assignments = []           # Assign/AugAssign/AnnAssign nodes in the body
+        self.copies_input = False       # slicing copies O(n) elements per call
+
+
+class RecursionDetector(AnalyzerPlugin):
+    # Builds the call graph between the functions and methods it sees.
+    # Calls are resolved like Python does: enclosing function scopes
+    # first, then module level; self.m() / cls.m() resolve to the method
+    # of the enclosing class. Recursion is found on the merged graph
+    # (see analyzer.recurrence), so mutual recursion across statements
+    # is caught too.
+    #
+    # Every call also records its control context: the if/match/loop
+    # nodes around it inside its function, as a linked (node, parent)
+    # tuple so recording it is O(1).
+
     def __init__(self):
-        self.recursive_functions = set()
-        self.current_function = None
-
-    def visit_FunctionDef(self, node):
-        self.current_function = node.name
-        self.generic_visit(node)
-        self.current_function = None
-
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name):
-            if node.func.id == self.current_function:
-                self.recursive_functions.add(self.current_function)
-        self.generic_visit(node)
+        self.functions = {}
+        self.scopes = []                # FunctionInfo or class qualname per open def/class
+        self.raw_calls = []             # (caller, call node, name, receiver name or None, context)
+        self.context = None
+        self.saved_contexts = []
+
+    # ---- Scopes ----
+
+    def qualify(self, name):
+        if not self.scopes:
+            return name
+        scope = self.scopes[-1]
+        return (scope.name if isinstance(scope, FunctionInfo) else scope) + "." + name
+
+    def enclosing_function(self):
+        for scope in reversed(self.scopes):
+            if isinstance(scope, FunctionInfo):
+                return scope
+        return None
+
+    def enter_FunctionDef(self, node):
+        scope = self.scopes[-1] if self.scopes else None
+        class_name = scope if isinstance(scope, str) else None
+
+        receiver = None
+        if class_name is not None and node.args.args:
+            receiver = node.args.args[0].arg
+
+        info = FunctionInfo(self.qualify(node.name), node, self.enclosing_function(), class_name, receiver)
+        self.functions[info.name] = info
+        self.scopes.append(info)
+
+        self.saved_contexts.append(self.context)
+        self.context = None
+
+    def leave_FunctionDef(self, node):
+        self.scopes.pop()
+        self.context = self.saved_contexts.pop()
+
+    enter_AsyncFunctionDef = enter_FunctionDef
+    leave_AsyncFunctionDef = leave_FunctionDef
+
+    def enter_ClassDef(self, node):
+        self.scopes.append(self.qualify(node.name))
+
+    def leave_ClassDef(self, node):
+        self.scopes.pop()
+
+    # ---- Control context ----
+
+    def enter_branch(self, node):
+        self.context = (node, self.context)
+
+    def leave_branch(self, node):
+        self.context = self.context[1]
+
+    enter_If = enter_IfExp = enter_Match = enter_branch
+    leave_If = leave_IfExp = leave_Match = leave_branch
+
+    def enter_loop(self, node):
+        self.context = (node, self.context)
+
+        function = self.enclosing_function()
+        if function is not None:
+            function.open_loops += 1
+            function.loop_depth = max(function.loop_depth, function.open_loops)
+
+    def leave_loop(self, node):
+        self.context = self.context[1]
+
+        function = self.enclosing_function()
+        if function is not None:
+            function.open_loops -= 1
+
+    enter_For = enter_AsyncFor = enter_While = enter_loop
+    leave_For = leave_AsyncFor = leave_While = leave_loop
+
+    enter_ListComp = enter_SetComp = enter_DictComp = enter_GeneratorExp = enter_branch
+    leave_ListComp = leave_SetComp = leave_DictComp = leave_GeneratorExp = leave_branch
+
+    # ---- Facts for the recurrence solver ----
+
+    def enter_Assign(self, node):
+        function = self.enclosing_function()
+        if function is not None:
+            function.assignments.append(node)
+
+    enter_AugAssign = enter_AnnAssign = enter_Assign
+
+    def enter_Slice(self, node):
+        function = self.enclosing_function()
+        if function is not None:
+            function.copies_input = True
+
+    # ---- Calls ----
+
+    def enter_Call(self, node):
+        caller = self.enclosing_function()
+        if caller is None:
+            return
+
+        func = node.func
+        if isinstance(func, ast.Name):
+            self.raw_calls.append((caller, node, func.id, None, self.context))
+
+        elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            self.raw_calls.append((caller, node, func.attr, func.value.id, self.context))
+
+    def resolve(self, caller, name, receiver):
+        if receiver is not None:
+            # self.m() inside a method (or a function nested in one)
+            scope = caller
+            while scope is not None and scope.class_name is None:
+                scope = scope.parent
+            if scope is not None and receiver == scope.receiver:
+                return scope.class_name + "." + name
+            return None
+
+        scope = caller
+        while scope is not None:
+            qualified = scope.name + "." + name
+            if qualified in self.functions:
+                return qualified
+            scope = scope.parent
+
+        # Module level: may be defined in another statement
+        return name
+
+    def call_sites(self):
+        # caller -> [(callee qualified name, call node, context)],
+        # resolved once all definitions of this tree are known
+        sites = {name: [] for name in self.functions}
+
+        for caller, node, name, receiver, context in self.raw_calls:
+            callee = self.resolve(caller, name, receiver)
+            if callee is not None:
+                sites[caller.name].append((callee, node, context))
+
+        return sites
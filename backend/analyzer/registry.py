@@ -0,0 +1,38 @@
+import importlib
+
+
+# ============================================================
+# Language backends
+# ============================================================
+# "module:function" per language, imported on first use: a server that
+# only ever sees Python never loads the C-family scanner, and startup
+# loads none of them.
+
+ANALYZERS = {
+    "python": "analyzer.python_analyzer:analyze_python",
+    "c": "analyzer.c_analyzer:analyze_c",
+    "cpp": "analyzer.cpp_analyzer:analyze_cpp",
+    "java": "analyzer.java_analyzer:analyze_java"
+}
+
+_loaded = {}
+
+
+def register(language, target):
+    ANALYZERS[language] = target
+    _loaded.pop(language, None)
+
+
+def get_analyzer(language):
+    # -> analyze(code) for the language, or None if unsupported
+    analyzer = _loaded.get(language)
+
+    if analyzer is None:
+        target = ANALYZERS.get(language)
+        if target is None:
+            return None
+
+        module, _, name = target.partition(":")
+        analyzer = _loaded[language] = getattr(importlib.import_module(module), name)
+
+    return analyzer
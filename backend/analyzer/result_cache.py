@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================================
+# Source Normalization
+# ============================================================
+# Only differences that cannot change the analysis result are removed,
+# so line numbers and CFG labels of a cached result stay correct. Labels
+# are source lines with their surrounding whitespace stripped, comments
+# included, so comments are part of the key in every language:
+#   python -> trailing whitespace per line (indentation is syntax)
+#   c/cpp/java -> leading/trailing whitespace per line
+
+def normalize_source(language, code):
+    # A lone "\r" stays: labels are split on "\n" only
+    code = code.replace("\r\n", "\n")
+
+    if language == "python":
+        lines = [line.rstrip() for line in code.split("\n")]
+    else:
+        lines = [line.strip() for line in code.split("\n")]
+
+    while lines and not lines[-1]:
+        lines.pop()
+
+    return "\n".join(lines)
+
+
+def _source_version():
+    # Hash of the analyzer package's sources: any change to them (a
+    # deploy) changes every key, so neither tier serves results in an
+    # older shape or from older rules
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".py"):
+            with open(os.path.join(directory, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:16]
+
+
+ANALYZER_VERSION = _source_version()
+
+
+def cache_key(language, code):
+    digest = hashlib.sha256(f"{ANALYZER_VERSION}\0{normalize_source(language, code)}".encode()).hexdigest()
+    return f"{language}:{digest}"
+
+
+# ============================================================
+# Analysis Result Cache
+# ============================================================
+
+class AnalysisCache:
+    # In-process LRU with TTL, optionally backed by a sqlite file that
+    # survives restarts and is shared by worker processes. Results are
+    # stored as JSON text so callers always get a private copy. With the
+    # disk tier, get/put block on sqlite: call them off the event loop.
+
+    def __init__(self, max_entries=512, ttl=3600, db_path=None, max_disk_entries=50000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> (expires_at, payload)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " payload TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    # ---- Public API ----
+
+    @property
+    def disk_tier(self):
+        return self._db is not None
+
+    def get(self, language, code):
+        return self.get_by_key(cache_key(language, code))
+
+    def put(self, language, code, result):
+        key = cache_key(language, code)
+        self.put_by_key(key, result)
+        return key
+
+    def get_by_key(self, key):
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+
+            if entry is not None:
+                expires_at, payload = entry
+
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(payload)
+
+                del self._memory[key]
+                self.expirations += 1
+
+            payload = self._disk_get(key, now)
+
+            if payload is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._memory_put(key, now + self.ttl, payload)
+
+        return json.loads(payload)
+
+    def put_by_key(self, key, result):
+        payload = json.dumps(result)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._memory_put(key, expires_at, payload)
+            self._disk_put(key, expires_at, payload)
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk_tier": self.disk_tier,
+                "analyzer_version": ANALYZER_VERSION,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+    # ---- Memory tier (caller holds self._lock) ----
+
+    def _memory_put(self, key, expires_at, payload):
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # ---- Disk tier (caller holds self._lock) ----
+
+    def _disk_get(self, key, now):
+        if self._db is None:
+            return None
+
+        row = self._db.execute(
+            "SELECT expires_at, payload FROM results WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        expires_at, payload = row
+
+        if expires_at <= now:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+            self.expirations += 1
+            return None
+
+        self._db.execute(
+            "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._db.commit()
+        return payload
+
+    def _disk_put(self, key, expires_at, payload):
+        if self._db is None:
+            return
+
+        now = time.time()
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, expires_at, accessed_at, payload)"
+            " VALUES (?, ?, ?, ?)",
+            (key, expires_at, now, payload)
+        )
+
+        # Drop expired rows, then the least recently used overflow
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM results WHERE key IN ("
+            " SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+        self._db.commit()
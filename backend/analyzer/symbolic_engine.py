@@ -0,0 +1,813 @@
+import ast
+import builtins
+
+from analyzer.engine import AnalyzerPlugin
+from analyzer.recurrence import Growth
+
+
+# ============================================================
+# Cost expressions
+# ============================================================
+# A cost is a sum of monomials; a monomial is a sorted tuple of
+# (variable, degree, log degree). Constant factors are dropped and a
+# monomial that another one bounds from above is pruned, so
+# n + n*m + n*log(n) simplifies to n*m + n*log(n).
+#
+# Variables are hashable keys:
+#   ("value", name)  a numeric name used as a bound: range(n)
+#   ("size", text)   the length of a collection: len(arr), for x in arr
+#   ("expr", text)   any other bound, by its source text
+
+MAX_EXPRESSION_LENGTH = 30
+
+
+def _multiply(a, b):
+    factors = dict((var, (degree, log)) for var, degree, log in a)
+    for var, degree, log in b:
+        old_degree, old_log = factors.get(var, (0, 0))
+        factors[var] = (old_degree + degree, old_log + log)
+    return tuple(sorted((var, degree, log) for var, (degree, log) in factors.items()))
+
+
+def _bounds(a, b):
+    # a >= b for every value of the variables (all of them >= 2)
+    factors = dict((var, (degree, log)) for var, degree, log in a)
+    return all(factors.get(var, (0, 0)) >= (degree, log) for var, degree, log in b)
+
+
+def _prune(terms):
+    terms = set(terms)
+    return frozenset(
+        term for term in terms
+        if not any(other != term and _bounds(other, term) for other in terms)
+    )
+
+
+class Cost:
+    __slots__ = ("terms",)
+
+    def __init__(self, terms):
+        self.terms = _prune(terms)
+
+    @classmethod
+    def variable(cls, var, degree=1, log=0):
+        return cls([((var, degree, log),)])
+
+    def is_constant(self):
+        return self.terms == ONE.terms
+
+    def __add__(self, other):
+        if other.is_constant():
+            return self
+        if self.is_constant():
+            return other
+        return Cost(self.terms | other.terms)
+
+    def __mul__(self, other):
+        if other.is_constant():
+            return self
+        if self.is_constant():
+            return other
+        return Cost(_multiply(a, b) for a in self.terms for b in other.terms)
+
+    def log(self):
+        # log(n^2 * m) = 2 log n + log m, which is O(log n + log m)
+        terms = [((var, 0, 1),) for term in self.terms for var, degree, _ in term if degree]
+        return Cost(terms) if terms else ONE
+
+    def power(self, exponent):
+        return Cost(
+            tuple((var, degree * exponent, log) for var, degree, log in term)
+            for term in self.terms
+        )
+
+    def rename(self, mapping):
+        terms = []
+        for term in self.terms:
+            factors = {}
+            for var, degree, log in term:
+                var = mapping.get(var, var)
+                old_degree, old_log = factors.get(var, (0, 0))
+                factors[var] = (old_degree + degree, old_log + log)
+            terms.append(tuple(sorted((var, degree, log) for var, (degree, log) in factors.items())))
+        return Cost(terms)
+
+    def variables(self):
+        return {var for term in self.terms for var, _, _ in term}
+
+    def growth(self):
+        # Every variable read as n, for comparison with single-variable bounds
+        return max(
+            (Growth(degree=sum(degree for _, degree, _ in term), log=sum(log for _, _, log in term))
+             for term in self.terms),
+            key=Growth.key
+        )
+
+    def format(self, names):
+        def factor(name, degree, log):
+            parts = []
+            if degree == 1:
+                parts.append(name)
+            elif degree:
+                parts.append(f"{name}^{int(degree) if degree == int(degree) else round(degree, 2)}")
+            if log == 1:
+                parts.append(f"log {name}")
+            elif log:
+                parts.append(f"log^{log} {name}")
+            return parts
+
+        # Fastest-growing first; ties in letter order (n before m before
+        # k), never in set order, which varies with the hash seed
+        ordered = []
+        for term in self.terms:
+            factors = sorted(term, key=lambda item: _letter_order(names[item[0]]))
+            parts = []
+            for var, degree, log in factors:
+                parts.extend(factor(names[var], degree, log))
+            letters = tuple(_letter_order(names[var]) for var, _, _ in factors)
+            ordered.append((Cost([term]).growth().key(), letters, "·".join(parts) or "1"))
+
+        ordered.sort(key=lambda item: item[1:])
+        ordered.sort(key=lambda item: item[0], reverse=True)
+
+        return f"O({' + '.join(text for _, _, text in ordered)})"
+
+
+ONE = Cost([()])
+
+LETTERS = "nmkpqrstuvwxyzabcdefghij"
+
+
+def _letter_order(name):
+    return (LETTERS.index(name), name) if name in LETTERS else (len(LETTERS), name)
+
+
+def display_names(costs):
+    # Short numeric names keep their own name (n, m, k); collection
+    # sizes and other bounds get the next free letter.
+    names = {}
+    used = set()
+    pending = []
+
+    for cost in costs:
+        for term in sorted(cost.terms):
+            for var, _, _ in term:
+                if var in names or var in pending:
+                    continue
+                kind, text = var
+                if kind == "value" and len(text) <= 2 and text not in used:
+                    names[var] = text
+                    used.add(text)
+                else:
+                    pending.append(var)
+
+    # Past the last letter, the variable's own text (len(arr)), which no
+    # letter can clash with
+    letters = (letter for letter in LETTERS if letter not in used)
+    for var in pending:
+        names[var] = next(letters, None) or describe(var)
+        used.add(names[var])
+
+    return names
+
+
+def describe(var):
+    kind, text = var
+    return f"len({text})" if kind == "size" else text
+
+
+# ============================================================
+# Built-in costs
+# ============================================================
+
+BUILTIN_NAMES = frozenset(dir(builtins))
+LINEAR_BUILTINS = frozenset(("sum", "min", "max", "any", "all", "list", "tuple", "set", "frozenset", "dict"))
+LINEAR_METHODS = frozenset(("remove", "index", "count", "copy", "reverse"))
+HEAP_LOG = frozenset(("heappush", "heappop", "heappushpop", "heapreplace"))
+BISECT_LOG = frozenset(("bisect", "bisect_left", "bisect_right", "insort", "insort_left", "insort_right"))
+
+LIST_CALLS = frozenset(("list", "sorted", "deque"))
+HASH_CALLS = frozenset(("set", "frozenset", "dict", "defaultdict", "Counter", "OrderedDict"))
+LIST_ANNOTATIONS = frozenset(("list", "List", "Sequence", "tuple", "Tuple", "deque"))
+HASH_ANNOTATIONS = frozenset(("set", "Set", "frozenset", "FrozenSet", "dict", "Dict", "Mapping", "defaultdict", "Counter"))
+
+LIST, HASH = "list", "hash"
+
+
+def value_kind(node):
+    if isinstance(node, (ast.List, ast.ListComp, ast.Tuple)):
+        return LIST
+    if isinstance(node, (ast.Set, ast.SetComp, ast.Dict, ast.DictComp)):
+        return HASH
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult) and isinstance(node.left, ast.List):
+        return LIST
+    if isinstance(node, ast.Call):
+        name = _call_name(node)
+        if name in LIST_CALLS or name == "split":
+            return LIST
+        if name in HASH_CALLS:
+            return HASH
+    return None
+
+
+def annotation_kind(annotation):
+    if isinstance(annotation, ast.Subscript):
+        annotation = annotation.value
+    name = annotation.attr if isinstance(annotation, ast.Attribute) else getattr(annotation, "id", None)
+    if name in LIST_ANNOTATIONS:
+        return LIST
+    if name in HASH_ANNOTATIONS:
+        return HASH
+    return None
+
+
+def _call_name(node):
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _text(node):
+    text = ast.unparse(node)
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        return text[:MAX_EXPRESSION_LENGTH - 3] + "..."
+    return text
+
+
+def _constant(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float))
+
+
+def _position(node):
+    return (node.lineno, node.col_offset)
+
+
+def _span(node):
+    return (_position(node), (node.end_lineno, node.end_col_offset))
+
+
+# ============================================================
+# Cost model plugin
+# ============================================================
+
+class Frame:
+    # One function body (or the module) or one loop inside it
+    __slots__ = ("function", "bound", "once", "cost", "calls", "bounds", "kinds")
+
+    def __init__(self, function=None, bound=None, once=()):
+        self.function = function        # FunctionInfo for function frames
+        self.bound = bound              # iterations, for loop frames
+        self.once = once                # spans evaluated once, not per iteration
+        self.cost = ONE
+        self.calls = []                 # (call node, multiplier, argument names)
+        self.bounds = {}                # name -> Cost of the values it takes
+        self.kinds = {}                 # name -> LIST / HASH
+
+
+class FunctionCost:
+    __slots__ = ("cost", "calls")
+
+    def __init__(self, cost, calls):
+        self.cost = cost                # cost of the body, user calls excluded
+        self.calls = calls              # (callee, multiplier, argument names)
+
+
+class SymbolicCostModel(AnalyzerPlugin):
+    # Cost of every function body from its loop bounds and built-in
+    # calls: range(...) / len(x) / iteration over x, halving and doubling
+    # while-loops, sorted, `in` on a list vs. a set, list.insert(0, ...).
+    # Calls to user functions are kept symbolic and substituted once
+    # every function has a cost (see resolve_costs).
+    #
+    # Runs after the RecursionDetector in the same traversal and reads
+    # its scopes and call resolution.
+    #
+    # Module-level names (kinds and bounds) are carried from statement to
+    # statement; `module_scope` starts from those of the statements before
+    # (see module_scope()).
+
+    def __init__(self, recursion_detector, module_scope=None):
+        self.detector = recursion_detector
+        self.frames = [Frame()]
+        self.costs = {}
+
+        if module_scope is not None:
+            kinds, bounds = module_scope
+            self.frames[0].kinds.update(kinds)
+            self.frames[0].bounds.update(bounds)
+
+    def module_scope(self):
+        # (kinds, bounds) of module-level names after this traversal
+        return dict(self.frames[0].kinds), dict(self.frames[0].bounds)
+
+    # ---- Frames ----
+
+    def function_frame(self):
+        for frame in reversed(self.frames):
+            if frame.function is not None or frame is self.frames[0]:
+                return frame
+        return self.frames[0]
+
+    def frame_for(self, node):
+        # Innermost frame that evaluates `node` once per iteration
+        position = _position(node)
+        index = len(self.frames) - 1
+        while index > 0:
+            frame = self.frames[index]
+            if frame.function is not None or not any(start <= position < end for start, end in frame.once):
+                break
+            index -= 1
+        return index
+
+    def add_cost(self, cost, node):
+        frame = self.frames[self.frame_for(node)]
+        frame.cost = frame.cost + cost
+
+    def multiplier(self, index):
+        # Product of the loop bounds around frames[index] in its function
+        cost = ONE
+        while index > 0 and self.frames[index].function is None:
+            cost = cost * self.frames[index].bound
+            index -= 1
+        return cost
+
+    def lookup(self, table, name):
+        frame = self.function_frame()
+        value = getattr(frame, table).get(name)
+        if value is None and frame is not self.frames[0]:
+            value = getattr(self.frames[0], table).get(name)
+        return value
+
+    # ---- Bounds ----
+
+    def size_of(self, node):
+        # Number of elements iterating over `node` yields
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set, ast.Dict)) or isinstance(node, ast.Constant):
+            return ONE
+
+        if isinstance(node, ast.Call):
+            name = _call_name(node)
+            if isinstance(node.func, ast.Name) and name == "range":
+                return self.iterations(node)
+            if isinstance(node.func, ast.Name) and name in ("sorted", "list", "set", "enumerate", "reversed", "tuple", "iter"):
+                return self.size_of(node.args[0]) if node.args else ONE
+            if isinstance(node.func, ast.Name) and name == "zip":
+                cost = ONE
+                for argument in node.args:
+                    cost = cost + self.size_of(argument)
+                return cost
+            if isinstance(node.func, ast.Attribute) and name in ("items", "keys", "values"):
+                return self.size_of(node.func.value)
+
+        if isinstance(node, ast.Name):
+            return Cost.variable(("size", node.id))
+
+        # arr[i:], arr[:mid]: at most the whole of arr
+        if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Slice):
+            return self.size_of(node.value)
+
+        if isinstance(node, (ast.Attribute, ast.Subscript)):
+            return Cost.variable(("size", _text(node)))
+
+        return Cost.variable(("expr", _text(node)))
+
+    def bound_of(self, node):
+        # Cost of the largest value a numeric expression takes
+        if _constant(node):
+            return ONE
+
+        if isinstance(node, ast.Name):
+            bound = self.lookup("bounds", node.id)
+            return bound if bound is not None else Cost.variable(("value", node.id))
+
+        if isinstance(node, ast.UnaryOp):
+            return self.bound_of(node.operand)
+
+        if isinstance(node, ast.BinOp):
+            left = self.bound_of(node.left)
+            right = self.bound_of(node.right)
+
+            if isinstance(node.op, (ast.Add, ast.Sub)):
+                return left + right
+            if isinstance(node.op, ast.Mult):
+                return left * right
+            if isinstance(node.op, (ast.FloorDiv, ast.Div, ast.RShift, ast.Mod)):
+                return left
+            if isinstance(node.op, ast.Pow) and _constant(node.right):
+                return left.power(node.right.value)
+
+        if isinstance(node, ast.Call) and node.args:
+            name = _call_name(node)
+            if name == "len":
+                return self.size_of(node.args[0])
+            if name in ("int", "abs", "round", "ceil", "floor"):
+                return self.bound_of(node.args[0])
+            if name in ("min", "max"):
+                cost = ONE
+                for argument in node.args:
+                    cost = cost + self.bound_of(argument)
+                return cost
+            if name in ("sqrt", "isqrt"):
+                return self.bound_of(node.args[0]).power(0.5)
+            if name in ("log", "log2", "log10"):
+                return self.bound_of(node.args[0]).log()
+
+        return Cost.variable(("expr", _text(node)))
+
+    def iterations(self, node):
+        # range(stop), range(start, stop[, step])
+        if not node.args:
+            return ONE
+        stop = node.args[0] if len(node.args) == 1 else node.args[1]
+        return self.bound_of(stop)
+
+    def loop_iterations(self, node):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "range":
+            return self.iterations(node)
+        return self.size_of(node)
+
+    def bind_targets(self, target, iterable, bound):
+        # The loop variable of range(...) / enumerate(...) ranges up to the bound
+        if isinstance(target, ast.Name):
+            if isinstance(iterable, ast.Call) and _call_name(iterable) == "range":
+                self.function_frame().bounds[target.id] = bound
+        elif isinstance(target, ast.Tuple) and target.elts and isinstance(target.elts[0], ast.Name):
+            if isinstance(iterable, ast.Call) and _call_name(iterable) == "enumerate":
+                self.function_frame().bounds[target.elts[0].id] = bound
+
+    def while_iterations(self, node):
+        test = node.test
+
+        # while queue: / while len(stack) > 0:
+        if isinstance(test, ast.Name):
+            return self.size_of(test)
+        if isinstance(test, ast.Compare) and isinstance(test.left, ast.Call) and _call_name(test.left) == "len" and test.left.args:
+            return self.size_of(test.left.args[0])
+
+        compare = test
+        if isinstance(test, ast.BoolOp):
+            compare = next((value for value in test.values if isinstance(value, ast.Compare)), None)
+        if not isinstance(compare, ast.Compare) or len(compare.comparators) != 1:
+            return Cost.variable(("expr", _text(test)))
+
+        sides = (compare.left, compare.comparators[0])
+        names = {side.id for side in sides if isinstance(side, ast.Name)}
+        step = _update_step(node.body, names)
+
+        if step is None:
+            return Cost.variable(("expr", _text(test)))
+
+        # The side that is not updated is the limit; against a constant,
+        # the updated variable's own starting value is
+        updated, limit = sides
+        if not (isinstance(updated, ast.Name) and updated.id in step[1]):
+            updated, limit = limit, updated
+        bound = self.bound_of(updated if _constant(limit) else limit)
+
+        return bound.log() if step[0] == "log" else bound
+
+    # ---- Scopes ----
+
+    def enter_FunctionDef(self, node):
+        frame = Frame(function=self.detector.scopes[-1])
+        for argument in node.args.args + node.args.kwonlyargs:
+            if argument.annotation is not None:
+                kind = annotation_kind(argument.annotation)
+                if kind is not None:
+                    frame.kinds[argument.arg] = kind
+        self.frames.append(frame)
+
+    def leave_FunctionDef(self, node):
+        frame = self.frames.pop()
+        self.costs[frame.function.name] = frame
+
+    enter_AsyncFunctionDef = enter_FunctionDef
+    leave_AsyncFunctionDef = leave_FunctionDef
+
+    # ---- Loops ----
+
+    def push_loop(self, bound, once):
+        self.frames.append(Frame(bound=bound, once=once))
+
+    def pop_loop(self, node):
+        frame = self.frames.pop()
+        parent = self.frames[self.frame_for(node)] if len(self.frames) > 1 else self.frames[0]
+        parent.cost = parent.cost + frame.bound * frame.cost
+        parent.calls.extend(frame.calls)
+
+    def enter_For(self, node):
+        bound = self.loop_iterations(node.iter)
+        self.bind_targets(node.target, node.iter, bound)
+        self.push_loop(bound, (_span(node.iter),))
+
+    leave_For = pop_loop
+    enter_AsyncFor = enter_For
+    leave_AsyncFor = pop_loop
+
+    def enter_While(self, node):
+        self.push_loop(self.while_iterations(node), ())
+
+    leave_While = pop_loop
+
+    def enter_comprehension_node(self, node):
+        bound = ONE
+        for generator in node.generators:
+            generator_bound = self.loop_iterations(generator.iter)
+            self.bind_targets(generator.target, generator.iter, generator_bound)
+            bound = bound * generator_bound
+        self.push_loop(bound, (_span(node.generators[0].iter),))
+
+    enter_ListComp = enter_SetComp = enter_DictComp = enter_GeneratorExp = enter_comprehension_node
+    leave_ListComp = leave_SetComp = leave_DictComp = leave_GeneratorExp = pop_loop
+
+    # ---- Types and bounds of local names ----
+
+    def enter_Assign(self, node):
+        frame = self.function_frame()
+
+        for target in node.targets:
+            # lo, hi = 0, len(arr) - 1
+            if isinstance(target, ast.Tuple) and isinstance(node.value, ast.Tuple):
+                pairs = zip(target.elts, node.value.elts)
+            else:
+                pairs = [(target, node.value)]
+
+            for name, value in pairs:
+                if not isinstance(name, ast.Name):
+                    continue
+
+                kind = value_kind(value)
+                if kind is not None:
+                    frame.kinds[name.id] = kind
+                else:
+                    frame.kinds.pop(name.id, None)
+
+                # n = len(arr) - 1: the name is bounded by the collection size
+                if isinstance(value, (ast.Call, ast.BinOp)) and any(
+                    isinstance(child, ast.Call) and _call_name(child) == "len" for child in ast.walk(value)
+                ):
+                    frame.bounds[name.id] = self.bound_of(value)
+
+    # ---- Costs ----
+
+    def kind_of(self, node):
+        if isinstance(node, ast.Name):
+            return self.lookup("kinds", node.id)
+        return value_kind(node)
+
+    def enter_Call(self, node):
+        func = node.func
+        name = _call_name(node)
+        args = node.args
+        cost = None
+
+        if isinstance(func, ast.Name):
+            if name == "sorted" and args:
+                size = self.size_of(args[0])
+                cost = size * size.log()
+            elif name in LINEAR_BUILTINS and args:
+                cost = self.size_of(args[0])
+            elif name in HEAP_LOG or name in BISECT_LOG:
+                cost = self.size_of(args[0]).log() if args else None
+            elif name == "heapify" and args:
+                cost = self.size_of(args[0])
+            elif name not in BUILTIN_NAMES:
+                self.record_call(node)
+
+        elif isinstance(func, ast.Attribute):
+            receiver = func.value
+
+            if name == "sort":
+                size = self.size_of(receiver)
+                cost = size * size.log()
+            elif name in ("insert", "pop") and args and _constant(args[0]) and args[0].value == 0:
+                if self.kind_of(receiver) != HASH:
+                    cost = self.size_of(receiver)
+            elif name in LINEAR_METHODS and self.kind_of(receiver) != HASH:
+                cost = self.size_of(receiver)
+            elif name == "join" and args:
+                cost = self.size_of(args[0])
+            elif name == "extend" and args:
+                cost = self.size_of(args[0])
+            elif name in HEAP_LOG or name in BISECT_LOG:
+                cost = self.size_of(args[0]).log() if args else None
+            elif isinstance(receiver, ast.Name) and self.is_method_call(name, receiver):
+                self.record_call(node)
+
+        if cost is not None:
+            self.add_cost(cost, node)
+
+    def is_method_call(self, name, receiver):
+        # self.m() / cls.m(): the only attribute calls resolved to user code
+        caller = self.detector.enclosing_function()
+        return caller is not None and self.detector.resolve(caller, name, receiver.id) is not None
+
+    def record_call(self, node):
+        index = self.frame_for(node)
+        arguments = tuple(argument.id if isinstance(argument, ast.Name) else None for argument in node.args)
+        self.frames[index].calls.append((node, self.multiplier(index), arguments))
+
+    def enter_Compare(self, node):
+        for op, comparator in zip(node.ops, node.comparators):
+            if not isinstance(op, (ast.In, ast.NotIn)):
+                continue
+            if isinstance(comparator, (ast.Constant, ast.Set, ast.Dict)):
+                continue
+            if isinstance(comparator, ast.Call) and _call_name(comparator) in ("range", "keys"):
+                continue
+
+            # An unknown container is costed as a list
+            if self.kind_of(comparator) != HASH:
+                self.add_cost(self.size_of(comparator), node)
+
+    def enter_Subscript(self, node):
+        if isinstance(node.slice, ast.Slice):
+            self.add_cost(self.size_of(node.value), node)
+
+    # ---- Results ----
+
+    def function_costs(self, call_sites):
+        # name -> FunctionCost with calls resolved to qualified callees;
+        # the module body is "<module>"
+        resolved = {}
+        for name, sites in call_sites.items():
+            for callee, node, _ in sites:
+                resolved[id(node)] = callee
+
+        def convert(frame):
+            calls = []
+            for node, multiplier, arguments in frame.calls:
+                callee = resolved.get(id(node))
+                if callee is None and isinstance(node.func, ast.Name):
+                    callee = node.func.id
+                if callee is not None:
+                    calls.append((callee, multiplier, arguments))
+            return FunctionCost(frame.cost, calls)
+
+        costs = {name: convert(frame) for name, frame in self.costs.items()}
+        costs["<module>"] = convert(self.frames[0])
+        return costs
+
+
+def _update_step(body, names):
+    # How a while-loop moves the variables of its test:
+    # ("log", names) for i //= 2, i *= 2, hi = mid - 1 with mid = (lo + hi) // 2;
+    # ("linear", names) for i += 1; None if they are never updated.
+    halving_names = set()
+    updates = []
+
+    stack = list(body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+
+        if isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            updates.append((node.target.id, node.op, node.value))
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    updates.append((target.id, None, node.value))
+
+    for name, op, value in updates:
+        if op is None and isinstance(value, ast.BinOp) and _halving_op(value.op, value.right):
+            halving_names.add(name)
+
+    kind = None
+    updated = set()
+
+    for name, op, value in updates:
+        if name not in names:
+            continue
+        updated.add(name)
+
+        if op is not None:
+            step = "log" if _halving_op(op, value) or _doubling_op(op, value) else "linear"
+        elif isinstance(value, ast.BinOp) and (_halving_op(value.op, value.right) or _doubling_op(value.op, value.right)):
+            step = "log"
+        elif any(isinstance(child, ast.Name) and child.id in halving_names for child in ast.walk(value)):
+            step = "log"
+        else:
+            step = "linear"
+
+        if kind != "linear":
+            kind = step
+
+    return (kind, updated) if kind is not None else None
+
+
+def _halving_op(op, operand):
+    if isinstance(op, ast.RShift):
+        return True
+    if isinstance(op, (ast.FloorDiv, ast.Div)):
+        return _constant(operand) and operand.value >= 2
+    return False
+
+
+def _doubling_op(op, operand):
+    if isinstance(op, ast.LShift):
+        return True
+    if isinstance(op, ast.Mult):
+        return _constant(operand) and operand.value >= 2
+    return False
+
+
+# ============================================================
+# Interprocedural resolution
+# ============================================================
+
+def resolve_costs(functions, costs):
+    # Substitute callee costs into their callers, callees first. A call
+    # into a cycle still being resolved (recursion) counts as O(1) here;
+    # recursion is bounded separately by its recurrence.
+    resolved = {}
+    in_progress = set()
+
+    def parameters(name):
+        info = functions[name]
+        names = [argument.arg for argument in info.node.args.args]
+        return names[1:] if info.receiver is not None else names
+
+    def cost_of(root):
+        stack = [(root, 0, ONE)]
+        in_progress.add(root)
+
+        while stack:
+            name, index, total = stack.pop()
+            entry = costs[name]
+            if index == 0:
+                total = entry.cost
+
+            while index < len(entry.calls):
+                callee, multiplier, arguments = entry.calls[index]
+                index += 1
+
+                if callee not in costs or callee not in functions or callee in in_progress:
+                    continue
+                if callee not in resolved:
+                    stack.append((name, index - 1, total))
+                    stack.append((callee, 0, ONE))
+                    in_progress.add(callee)
+                    break
+
+                mapping = {}
+                for parameter, argument in zip(parameters(callee), arguments):
+                    if argument is not None and argument != parameter:
+                        mapping[("value", parameter)] = ("value", argument)
+                        mapping[("size", parameter)] = ("size", argument)
+
+                total = total + multiplier * resolved[callee].rename(mapping)
+            else:
+                resolved[name] = total
+                in_progress.discard(name)
+
+        return resolved[root]
+
+    for name in costs:
+        if name not in resolved:
+            cost_of(name)
+
+    return resolved
+
+
+class CostSummary:
+    __slots__ = ("functions", "overall", "names")
+
+    def __init__(self, functions, overall, names):
+        self.functions = functions      # name -> Cost
+        self.overall = overall
+        self.names = names
+
+    def growth(self):
+        return self.overall.growth()
+
+    def text(self):
+        return self.overall.format(self.names)
+
+    def to_dict(self):
+        names = self.names
+        return {
+            "overall": self.overall.format(names),
+            "functions": {name: cost.format(names) for name, cost in self.functions.items()},
+            "variables": {names[var]: describe(var) for var in sorted(self.overall.variables() | {
+                var for cost in self.functions.values() for var in cost.variables()
+            }, key=lambda var: (names[var], var))}
+        }
+
+
+def summarize_costs(functions, costs):
+    resolved = resolve_costs(functions, costs)
+
+    overall = ONE
+    for cost in resolved.values():
+        overall = overall + cost
+
+    module = resolved.pop("<module>", ONE)
+    if not module.is_constant():
+        resolved["<module>"] = module
+
+    return CostSummary(resolved, overall, display_names([overall] + list(resolved.values())))
@@ -0,0 +1,120 @@
+# Compare the array-backed ControlFlowGraph with the previous networkx
+# DiGraph for building and serializing the Python CFG (graph work only,
+# the AST walk is recorded once up front).
+#
+#   cd backend && python benchmarks/bench_cfg_graph.py [lines] [repeats]
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from analyzer.cfg_generator import CFGGenerator
+from analyzer.cfg_graph import ControlFlowGraph
+from bench_fused_analysis import generate_source
+
+
+def record_events(code):
+    # Build the CFG once and record its nodes and edges, so both graph
+    # implementations are timed without the AST walk.
+    graph = CFGGenerator(code).generate()
+
+    nodes = [(node.label, node.lineno, node.end_lineno) for node in graph.nodes]
+    edges = list(graph.edges())
+
+    return nodes, edges
+
+
+def networkx_cfg(events):
+    # The pre-array implementation: one nx.DiGraph per request.
+    import networkx as nx
+
+    nodes, edges = events
+    graph = nx.DiGraph()
+
+    for count, (label, lineno, end_lineno) in enumerate(nodes):
+        graph.add_node(f"node_{count}", label=label, lineno=lineno, end_lineno=end_lineno)
+
+    for source, target in edges:
+        graph.add_edge(f"node_{source}", f"node_{target}")
+
+    return {
+        "nodes": [
+            {
+                "id": node,
+                "label": data["label"],
+                "lineno": data.get("lineno"),
+                "end_lineno": data.get("end_lineno")
+            }
+            for node, data in graph.nodes(data=True)
+        ],
+        "edges": [
+            {"source": source, "target": target}
+            for source, target in graph.edges()
+        ]
+    }
+
+
+def array_cfg(events):
+    nodes, edges = events
+    graph = ControlFlowGraph()
+
+    for label, lineno, end_lineno in nodes:
+        graph.add_node(label, lineno, end_lineno)
+
+    for source, target in edges:
+        graph.add_edge(source, target)
+
+    return graph.to_dict()
+
+
+def measure(func, events, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(events)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(events)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def import_time(module):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    code = generate_source(lines)
+
+    events = record_events(code)
+
+    # networkx orders edges by source node, the arrays by insertion
+    nx_result = networkx_cfg(events)
+    array_result = array_cfg(events)
+    assert nx_result["nodes"] == array_result["nodes"]
+    assert len(nx_result["edges"]) == len(array_result["edges"])
+
+    nx_time, nx_peak = measure(networkx_cfg, events, repeats)
+    arr_time, arr_peak = measure(array_cfg, events, repeats)
+
+    print(f"lines:            {code.count(chr(10))} ({len(events[0])} CFG nodes)")
+    print(f"networkx:         {nx_time * 1000:.1f} ms, peak {nx_peak / 1024:.0f} KiB")
+    print(f"array-backed:     {arr_time * 1000:.1f} ms, peak {arr_peak / 1024:.0f} KiB")
+    print(f"interpreter only: {import_time('sys') * 1000:.0f} ms")
+    print(f"import networkx:  {import_time('networkx') * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Response size and encode time of /analyze's CFG for generated Python
+# and C sources: the full dict-per-node form, the compact form, each
+# gzip-compressed, and the function overview plus one expanded function.
+#
+#   cd backend && python benchmarks/bench_cfg_payload.py [functions]
+
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from analyzer.c_analyzer import analyze_c
+from analyzer.cfg_wire import cfg_overview, compact_cfg, function_subgraph
+from analyzer.python_analyzer import analyze_python
+from bench_clike_scanner import FUNCTION_TEMPLATE
+
+
+PYTHON_FUNCTION = '''
+def handler_{i}(items, limit):
+    total = 0
+    for item in items:
+        if item.weight > limit and item.active:
+            total += handler_{prev}(item.children, limit - 1)
+        elif item.weight < 0:
+            continue
+        else:
+            total += item.weight
+    while total > limit:
+        total //= 2
+    return total
+'''
+
+
+def python_source(functions):
+    return "".join(PYTHON_FUNCTION.format(i=i, prev=max(i - 1, 0)) for i in range(functions))
+
+
+def c_source(functions):
+    return "#include <stdio.h>\n" + "".join(FUNCTION_TEMPLATE.format(i=i, prev=max(i - 1, 0)) for i in range(functions))
+
+
+def encoded(payload):
+    # -> (JSON bytes, gzip bytes, seconds to build both)
+    start = time.perf_counter()
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    compressed = gzip.compress(body, 6)
+    return len(body), len(compressed), time.perf_counter() - start
+
+
+def report(name, result):
+    cfg = result["cfg"]
+    rest = {key: value for key, value in result.items() if key != "cfg"}
+
+    start = time.perf_counter()
+    compact = compact_cfg(cfg)
+    compact_seconds = time.perf_counter() - start
+
+    overview = {**rest, "cfg_overview": cfg_overview(cfg, result.get("call_graph"))}
+    expanded = function_subgraph(cfg, 1, compact=True)
+
+    print(f"{name}: {len(cfg['nodes'])} nodes, {len(cfg['edges'])} edges")
+    for label, payload, extra in (
+        ("full", result, 0.0),
+        ("compact", {**rest, "cfg": compact}, compact_seconds),
+        ("overview", overview, 0.0),
+        ("1 function", expanded, 0.0)
+    ):
+        size, compressed, seconds = encoded(payload)
+        print(f"  {label:<11} {size / 1024:>9.1f} KB json  {compressed / 1024:>8.1f} KB gzip  {(seconds + extra) * 1000:>7.1f} ms")
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    report(f"python, {functions} functions", analyze_python(python_source(functions)))
+    report(f"c, {functions} functions", analyze_c(c_source(functions)))
+
+
+if __name__ == "__main__":
+    main()
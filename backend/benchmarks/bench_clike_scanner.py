@@ -0,0 +1,99 @@
+# Compare the single-pass C/Java scanner with the previous per-line regex
+# and per-function code.split() approach on a generated C file.
+#
+#   cd backend && python benchmarks/bench_clike_scanner.py [lines]
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from analyzer.clike_scanner import scan
+
+
+FUNCTION_TEMPLATE = '''
+/* helper {i}: while (x) {{ for (;;) }} */
+int func_{i}(int *data, int n) {{
+    int total = 0;
+    for (int i = 0; i < n; i++) {{
+        if (data[i] % 2 == 0 && i > 0) {{
+            total += data[i];
+        }} else {{
+            while (total > 100) {{
+                total -= 7;
+            }}
+        }}
+    }}
+    switch (n) {{
+        case 0: return total;
+        case 1: return func_{prev}(data, n - 1);
+    }}
+    printf("func_{i}(%d)\\n", n);
+    return func_{i}(data, n - 1) || total;
+}}
+'''
+
+
+def generate_source(min_lines):
+    chunks = ["#include <stdio.h>\n"]
+    lines = 1
+    i = 0
+    while lines < min_lines:
+        chunk = FUNCTION_TEMPLATE.format(i=i, prev=max(i - 1, 0))
+        chunks.append(chunk)
+        lines += chunk.count("\n")
+        i += 1
+    return "".join(chunks)
+
+
+def legacy(code):
+    # The regex analysis this scanner replaced
+    lines = code.splitlines()
+    brace_stack = 0
+    max_depth = 0
+
+    for line in lines:
+        stripped = line.strip()
+        if re.search(r'\b(for|while)\b', stripped):
+            brace_stack += 1
+            max_depth = max(max_depth, brace_stack)
+        if "}" in stripped and brace_stack > 0:
+            brace_stack -= 1
+
+    recursive = []
+    for _, fname in re.findall(r'\b(int|void|float|double|char)\s+(\w+)\s*\(', code):
+        body = code.split(fname, 1)[-1]
+        if re.search(r'\b' + fname + r'\s*\(', body):
+            recursive.append(fname)
+
+    complexity = 1
+    for pattern in (r'\bif\b', r'\bfor\b', r'\bwhile\b', r'\bcase\b', r'&&|\|\|'):
+        complexity += len(re.findall(pattern, code))
+
+    return max_depth, recursive, complexity
+
+
+def timed(func, code):
+    start = time.perf_counter()
+    func(code)
+    return time.perf_counter() - start
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    code = generate_source(lines)
+
+    scanner_time = timed(scan, code)
+    legacy_time = timed(legacy, code)
+
+    print(f"lines:   {code.count(chr(10))}")
+    print(f"regex:   {legacy_time * 1000:.0f} ms")
+    print(f"scanner: {scanner_time * 1000:.0f} ms")
+    print(f"speedup: {legacy_time / scanner_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Compare the fused single-pass Python analysis against the previous
+# multi-pass pipeline (one parse + one walk per analyzer, CFG re-parses).
+#
+#   cd backend && python benchmarks/bench_fused_analysis.py [lines] [repeats]
+
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from analyzer.python_analyzer import analyze_python
+from analyzer.loop_analyzer import LoopAnalyzer
+from analyzer.recursion_detector import RecursionDetector
+from analyzer.cfg_generator import CFGGenerator
+from analyzer.cyclomatic import CyclomaticComplexity
+from analyzer.pattern_detector import PatternDetector
+
+
+FUNCTION_TEMPLATE = '''
+def func_{i}(data, n):
+    total = 0
+    for i in range(n):
+        if data[i] % 2 == 0 and i > 0:
+            total += data[i]
+        else:
+            while total > 100:
+                total -= 7
+    try:
+        value = data[n // 2]
+    except IndexError:
+        value = 0
+    print(total, value)
+    if n <= 1:
+        return total
+    return func_{i}(data, n - 1)
+'''
+
+
+def generate_source(min_lines):
+    chunks = []
+    lines = 0
+    i = 0
+    while lines < min_lines:
+        chunk = FUNCTION_TEMPLATE.format(i=i)
+        chunks.append(chunk)
+        lines += chunk.count("\n")
+        i += 1
+    return "".join(chunks)
+
+
+def multi_pass(code):
+    tree = ast.parse(code)
+
+    LoopAnalyzer().visit(tree)
+    RecursionDetector().visit(tree)
+    CFGGenerator(code).generate()
+    CyclomaticComplexity().calculate(tree)
+    PatternDetector().detect(tree)
+
+
+def best_of(func, code, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(code)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    code = generate_source(lines)
+
+    legacy = best_of(multi_pass, code, repeats)
+    fused = best_of(analyze_python, code, repeats)
+
+    print(f"lines:      {code.count(chr(10))}")
+    print(f"multi-pass: {legacy * 1000:.1f} ms")
+    print(f"fused:      {fused * 1000:.1f} ms")
+    print(f"speedup:    {legacy / fused:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Time one-line edits through an incremental session against a full
+# analysis of the same buffer, and check that both give the same result.
+# The edits include rebinding a module-level set as a list, which
+# changes the costs of every function after it.
+#
+#   cd backend && python benchmarks/bench_incremental.py [lines] [edits]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from analyzer.incremental import PythonSession
+from analyzer.python_analyzer import analyze_python
+from bench_fused_analysis import generate_source
+
+
+HEADER = "SEEN = {0, 1}\n"
+
+USE_TEMPLATE = '''
+def uses_seen_{i}(data):
+    return [x for x in data if x in SEEN]
+'''
+
+
+def edit(session, rng, step):
+    # -> what was done; every edit leaves the buffer parseable
+    line = rng.randint(2, len(session.lines) - 1)
+    kind = rng.choice(("comment", "insert", "delete", "rebind"))
+
+    if kind == "comment":
+        session.apply_edit(line, line, session.lines[line - 1] + "  # edited")
+    elif kind == "insert":
+        # A new top-level statement before the def starting at or after `line`
+        while line < len(session.lines) and not session.lines[line - 1].startswith("def "):
+            line += 1
+        session.apply_edit(line, line - 1, f"inserted_{step} = len([{step}])")
+    elif kind == "delete":
+        while line < len(session.lines) and session.lines[line - 1].strip():
+            line += 1
+        session.apply_edit(line, line, "")
+    else:
+        session.apply_edit(1, 1, rng.choice(("SEEN = {0, 1}", "SEEN = [0, 1]")))
+
+    return kind
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    code = HEADER + generate_source(lines) + "".join(USE_TEMPLATE.format(i=i) for i in range(20))
+    session = PythonSession(code)
+    session.analyze()
+
+    rng = random.Random(0)
+    incremental = {}
+    full = {}
+
+    for step in range(edits):
+        kind = edit(session, rng, step)
+
+        start = time.perf_counter()
+        result, _ = session.analyze()
+        incremental.setdefault(kind, []).append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        expected = analyze_python(session.code)
+        full.setdefault(kind, []).append(time.perf_counter() - start)
+
+        assert result == expected, f"edit {step} ({kind}) differs from a full analysis"
+
+    print(f"lines:  {len(session.lines)}")
+    for kind in sorted(incremental):
+        timings = sorted(incremental[kind])
+        print(
+            f"{kind:8} x{len(timings):<3} incremental {timings[len(timings) // 2] * 1000:7.1f} ms"
+            f"   full {min(full[kind]) * 1000:7.1f} ms"
+        )
+    print("results identical to a full analysis")
+
+
+if __name__ == "__main__":
+    main()
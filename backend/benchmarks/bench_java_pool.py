@@ -0,0 +1,93 @@
+# Compare Java /run jobs on warm JVM workers with cold javac + `java Main`
+# runs, for a trivial program where JVM startup and compilation dominate.
+# Cold runs go through the compile cache, as /run does, so after the
+# first job they pay for `java` startup only. Needs a JDK (16+).
+#
+#   cd backend && python benchmarks/bench_java_pool.py [runs]
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from runner.compile_cache import CompileCache
+from runner.executor import execute
+from runner.java_pool import JavaWorkerPool
+
+
+PROGRAM = """import java.util.Scanner;
+
+public class Main {
+    public static void main(String[] args) {
+        int n = new Scanner(System.in).nextInt();
+        long total = 0;
+        for (int i = 0; i < n; i++) {
+            total += i;
+        }
+        System.out.println(total);
+    }
+}
+"""
+
+C_PROGRAM = """#include <stdio.h>
+
+int main(void) {
+    int n;
+    long total = 0;
+    scanf("%d", &n);
+    for (int i = 0; i < n; i++) {
+        total += i;
+    }
+    printf("%ld\\n", total);
+    return 0;
+}
+"""
+
+
+def measure(runs, language, code, cache, pool=None):
+    totals = []
+    reported = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = execute(language, code, "1000", cache=cache, java_pool=pool)
+        totals.append(time.perf_counter() - start)
+        reported.append(result["execution_time"])
+
+        assert result["stdout"] == "499500\n", result
+
+    return statistics.median(totals), statistics.median(reported)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    pool = JavaWorkerPool(1)
+    pool.start()
+    deadline = time.monotonic() + 60
+    while not pool.stats()["idle"]:
+        if time.monotonic() > deadline:
+            sys.exit("no warm JVM worker started (is a JDK on PATH?)")
+        time.sleep(0.05)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = CompileCache(cache_dir, 64 * 1024 * 1024)
+        c_total, c_reported = measure(runs, "c", C_PROGRAM, cache)
+        cold_total, cold_reported = measure(runs, "java", PROGRAM, cache)
+        warm_total, warm_reported = measure(runs, "java", PROGRAM, cache, pool)
+
+    stats = pool.stats()
+    pool.close()
+
+    print(f"runs:  {runs}")
+    print(f"c:     {c_total * 1000:.1f} ms per job, reported execution_time {c_reported * 1000:.1f} ms")
+    print(f"cold:  {cold_total * 1000:.1f} ms per job, reported execution_time {cold_reported * 1000:.1f} ms")
+    print(f"warm:  {warm_total * 1000:.1f} ms per job, reported execution_time {warm_reported * 1000:.1f} ms")
+    print(f"pool:  {stats['hits']} hits, {stats['cold_starts']} cold starts, {stats['recycled']} recycled")
+
+
+if __name__ == "__main__":
+    main()
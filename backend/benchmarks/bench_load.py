@@ -0,0 +1,499 @@
+# Load and latency benchmark for /analyze and /run: a fixed corpus of
+# programs (benchmarks/corpus, one per algorithm and language) at several
+# sizes, sent at a given concurrency. Each scenario reports p50/p95/p99
+# latency, throughput, failed requests and the server's RSS (start, peak
+# sampled every SAMPLE_INTERVAL, end).
+#
+# The server is the app imported in-process (TestClient; RSS is then this
+# process, client included), one started here with uvicorn (--serve), or
+# one already running (--url; RSS only with --server-pid).
+#
+# Sizes: "small" is the program as written; larger sizes splice in
+# generated helper functions at its "@helpers" line, which /analyze has
+# to walk and /run has to compile. Every request gets a trailing comment
+# unique to it and to this run, so the analysis and compile caches (the
+# latter kept on disk between runs) miss, unless --warm-cache.
+#
+#   cd backend && python benchmarks/bench_load.py run [--serve | --url URL] [--concurrency 1,8]
+#       [--requests N] [--endpoints analyze,run] [--languages python,c] [--programs sort]
+#       [--sizes small,large] [--warm-cache] [--output results.json]
+#   cd backend && python benchmarks/bench_load.py compare baseline.json results.json [--threshold 10]
+#
+# compare exits 1 when a scenario regressed past the threshold. p99 is
+# only meaningful with --requests 100 or more.
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_cfg_payload import PYTHON_FUNCTION
+from bench_clike_scanner import FUNCTION_TEMPLATE
+
+
+# ============================================================
+# Corpus
+# ============================================================
+
+EXTENSIONS = {"python": ".py", "c": ".c", "cpp": ".cpp", "java": ".java"}
+
+PROGRAMS = ("sort", "lcs", "queens")
+
+# Generated helper functions per size
+SIZES = {"small": 0, "medium": 40, "large": 400}
+
+ENDPOINTS = ("analyze", "run")
+
+# What /run needs on the server's PATH, per language
+TOOLCHAINS = {"python": "python", "c": "gcc", "cpp": "g++", "java": "javac"}
+
+JAVA_FUNCTION = '''
+static int func_{i}(int[] data, int n) {{
+    int total = 0;
+    for (int i = 0; i < n; i++) {{
+        if (data[i] % 2 == 0 && i > 0) {{
+            total += data[i];
+        }} else {{
+            while (total > 100) {{
+                total -= 7;
+            }}
+        }}
+    }}
+    switch (n) {{
+        case 0: return total;
+        case 1: return func_{prev}(data, n - 1);
+    }}
+    return func_{i}(data, n - 1) + total;
+}}
+'''
+
+TEMPLATES = {"python": PYTHON_FUNCTION, "c": FUNCTION_TEMPLATE, "cpp": FUNCTION_TEMPLATE, "java": JAVA_FUNCTION}
+
+
+def helpers(language, count, indent):
+    text = "".join(TEMPLATES[language].format(i=i, prev=max(i - 1, 0)) for i in range(count))
+    return "".join(indent + line if line.strip() else line for line in text.splitlines(True))
+
+
+def load_program(language, program, size):
+    # -> (code, stdin)
+    with open(os.path.join(CORPUS_DIR, program + EXTENSIONS[language])) as f:
+        lines = f.read().splitlines(True)
+    with open(os.path.join(CORPUS_DIR, program + ".in")) as f:
+        stdin = f.read()
+
+    for index, line in enumerate(lines):
+        if line.strip().endswith("@helpers"):
+            indent = line[:len(line) - len(line.lstrip())]
+            lines[index] = helpers(language, SIZES[size], indent)
+            break
+
+    return "".join(lines), stdin
+
+
+class Scenario:
+    __slots__ = ("endpoint", "language", "program", "size", "code", "stdin")
+
+    def __init__(self, endpoint, language, program, size):
+        self.endpoint = endpoint
+        self.language = language
+        self.program = program
+        self.size = size
+        self.code, self.stdin = load_program(language, program, size)
+
+    @property
+    def name(self):
+        return f"{self.endpoint}/{self.language}/{self.program}/{self.size}"
+
+    def payload(self, tag=None):
+        code = self.code
+        if tag is not None:
+            comment = "#" if self.language == "python" else "//"
+            code += f"\n{comment} request {tag}\n"
+        return {"code": code, "language": self.language, "user_input": self.stdin}
+
+    def succeeded(self, response):
+        if response.status_code != 200:
+            return False
+        body = response.json()
+        if self.endpoint == "analyze":
+            return "error" not in body
+        return body.get("exit_code") == 0 and not body.get("timed_out")
+
+
+# ============================================================
+# Measurement
+# ============================================================
+
+SAMPLE_INTERVAL = 0.05
+
+RUN_ID = f"{os.getpid()}-{int(time.time())}"
+
+REQUEST_NUMBERS = itertools.count()
+
+
+def rss_bytes(pid):
+    # Resident set size from /proc (Linux); None where unavailable
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class RssSampler:
+    # Polls a process's RSS on a thread, so a server busy on this
+    # process's event loop is still sampled
+    __slots__ = ("pid", "start", "peak", "end", "_stop", "_thread")
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.start = self.peak = self.end = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.pid is not None:
+            self.start = self.peak = rss_bytes(self.pid)
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.end = rss_bytes(self.pid)
+            self._record(self.end)
+
+    def _record(self, rss):
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self._record(rss_bytes(self.pid))
+
+
+def percentile(ordered, p):
+    # Nearest rank
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def megabytes(value):
+    return None if value is None else round(value / (1024 * 1024), 1)
+
+
+def run_scenario(client, scenario, requests, concurrency, warmup, warm_cache, pid):
+    path = "/" + scenario.endpoint
+
+    def send(_):
+        payload = scenario.payload(None if warm_cache else f"{RUN_ID}-{next(REQUEST_NUMBERS)}")
+        start = time.perf_counter()
+        try:
+            ok = scenario.succeeded(client.post(path, json=payload))
+        except Exception:
+            # Connection errors, timeouts, unparseable bodies
+            ok = False
+        return time.perf_counter() - start, ok
+
+    # Warm-up requests (pools, imports, caches with --warm-cache) are not counted
+    for _ in range(warmup):
+        send(None)
+
+    with RssSampler(pid) as rss, ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        outcomes = list(pool.map(send, range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in outcomes)
+    return {
+        "endpoint": scenario.endpoint,
+        "language": scenario.language,
+        "program": scenario.program,
+        "size": scenario.size,
+        "source_lines": scenario.code.count("\n"),
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(not ok for _, ok in outcomes),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "max_ms": round(latencies[-1], 2),
+        "throughput_rps": round(requests / elapsed, 2),
+        "rss_start_mb": megabytes(rss.start),
+        "rss_peak_mb": megabytes(rss.peak),
+        "rss_end_mb": megabytes(rss.end)
+    }
+
+
+# ============================================================
+# Servers
+# ============================================================
+
+SERVER_START_TIMEOUT = 60.0
+
+REQUEST_TIMEOUT = 120.0
+
+
+@contextlib.contextmanager
+def in_process():
+    from fastapi.testclient import TestClient
+    import main
+
+    # The context runs the startup handlers (worker pools)
+    with TestClient(main.app) as client:
+        yield client, os.getpid(), "in-process"
+
+
+@contextlib.contextmanager
+def remote(url, pid):
+    import httpx
+
+    with httpx.Client(base_url=url, timeout=REQUEST_TIMEOUT) as client:
+        yield client, pid, url
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def served():
+    import httpx
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR
+    )
+
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if server.poll() is not None:
+                raise SystemExit(f"uvicorn exited with status {server.returncode}")
+            try:
+                httpx.get(url + "/", timeout=1.0)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"server did not answer on {url} within {SERVER_START_TIMEOUT:.0f}s")
+                time.sleep(0.1)
+
+        with remote(url, server.pid) as connection:
+            yield connection
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# ============================================================
+# Commands
+# ============================================================
+
+def listed(value, choices):
+    items = [item for item in value.split(",") if item]
+    unknown = [item for item in items if item not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(choices)})")
+    return items
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit
+    }
+
+
+def run(args):
+    if args.url:
+        server = remote(args.url, args.server_pid)
+    elif args.serve:
+        server = served()
+    else:
+        server = in_process()
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "settings": {
+            "server": "url" if args.url else "serve" if args.serve else "in-process",
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "warm_cache": args.warm_cache
+        },
+        "scenarios": {}
+    }
+
+    scenarios = [
+        Scenario(endpoint, language, program, size)
+        for endpoint in args.endpoints
+        for language in args.languages
+        for program in args.programs
+        for size in args.sizes
+    ]
+
+    print(f"{'scenario':<30} {'conc':>4} {'lines':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'req/s':>8} {'errors':>6} {'rss peak MB':>11}")
+
+    with server as (client, pid, target):
+        results["settings"]["target"] = target
+        skipped = set()
+
+        for scenario in scenarios:
+            toolchain = TOOLCHAINS[scenario.language]
+            # A server elsewhere may have toolchains this machine lacks
+            if scenario.endpoint == "run" and not args.url and shutil.which(toolchain) is None:
+                if scenario.language not in skipped:
+                    print(f"skipping run/{scenario.language}: {toolchain} not found")
+                    skipped.add(scenario.language)
+                continue
+
+            for concurrency in args.concurrency:
+                summary = run_scenario(
+                    client, scenario, args.requests, concurrency, args.warmup, args.warm_cache, pid
+                )
+                results["scenarios"][f"{scenario.name}/c{concurrency}"] = summary
+
+                rss = "-" if summary["rss_peak_mb"] is None else f"{summary['rss_peak_mb']:.1f}"
+                print(f"{scenario.name:<30} {concurrency:>4} {summary['source_lines']:>6} "
+                      f"{summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} "
+                      f"{summary['throughput_rps']:>8.1f} {summary['errors']:>6} {rss:>11}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"wrote {args.output}")
+
+
+# Metric -> (higher is worse, absolute change below which it is noise)
+COMPARED = {
+    "p50_ms": (True, 1.0),
+    "p95_ms": (True, 1.0),
+    "p99_ms": (True, 1.0),
+    "throughput_rps": (False, 0.0),
+    "rss_peak_mb": (True, 4.0)
+}
+
+
+def regressions(before, after, threshold):
+    # -> ["metric before -> after (+x%)", ...] past threshold (a fraction)
+    found = []
+
+    for metric, (higher_is_worse, noise) in COMPARED.items():
+        old, new = before.get(metric), after.get(metric)
+        if old is None or new is None or abs(new - old) <= noise:
+            continue
+        change = (new - old) / old if old else math.inf
+        if (change > threshold) if higher_is_worse else (change < -threshold):
+            found.append(f"{metric} {old:g} -> {new:g} ({change:+.0%})")
+
+    if after["errors"] > before["errors"]:
+        found.append(f"errors {before['errors']} -> {after['errors']}")
+
+    return found
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        current = json.load(f)
+
+    for key in ("python", "cpus", "platform"):
+        if baseline["environment"].get(key) != current["environment"].get(key):
+            print(f"warning: {key} differs: {baseline['environment'].get(key)} -> {current['environment'].get(key)}")
+    if baseline["settings"] != current["settings"]:
+        print("warning: settings differ:", baseline["settings"], "->", current["settings"])
+
+    threshold = args.threshold / 100
+    regressed = 0
+
+    print(f"{'scenario':<34} {'p95 ms':>19} {'req/s':>17}")
+    for name, after in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<34} (not in baseline)")
+            continue
+
+        found = regressions(before, after, threshold)
+        regressed += bool(found)
+        line = (f"{name:<34} {before['p95_ms']:>8.1f} -> {after['p95_ms']:<8.1f} "
+                f"{before['throughput_rps']:>7.1f} -> {after['throughput_rps']:<7.1f}")
+        print(line + "  REGRESSED: " + "; ".join(found) if found else line.rstrip())
+
+    for name in baseline["scenarios"].keys() - current["scenarios"].keys():
+        print(f"{name:<34} (missing from results)")
+
+    print(f"{regressed} regressed scenario(s), threshold {args.threshold:g}%")
+    return 1 if regressed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and latency benchmark for /analyze and /run")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the scenarios and report (and save) the results")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="benchmark a server already running at this URL")
+    target.add_argument("--serve", action="store_true", help="start the app with uvicorn and benchmark it over HTTP")
+    run_parser.add_argument("--server-pid", type=int, help="with --url: the server process to sample RSS from")
+    run_parser.add_argument("--concurrency", type=lambda value: [int(item) for item in value.split(",")],
+                            default=[1, 4], help="comma-separated concurrency levels (default 1,4)")
+    run_parser.add_argument("--requests", type=int, default=20, help="measured requests per scenario (default 20)")
+    run_parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests first (default 2)")
+    run_parser.add_argument("--endpoints", type=lambda value: listed(value, ENDPOINTS), default=list(ENDPOINTS))
+    run_parser.add_argument("--languages", type=lambda value: listed(value, tuple(EXTENSIONS)), default=list(EXTENSIONS))
+    run_parser.add_argument("--programs", type=lambda value: listed(value, PROGRAMS), default=list(PROGRAMS))
+    run_parser.add_argument("--sizes", type=lambda value: listed(value, tuple(SIZES)), default=list(SIZES))
+    run_parser.add_argument("--warm-cache", action="store_true",
+                            help="send each scenario's source unchanged, so cached results are served")
+    run_parser.add_argument("--output", help="write the results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions of results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="percent change that counts as a regression (default 10)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
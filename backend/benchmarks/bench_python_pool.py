@@ -0,0 +1,55 @@
+# Compare Python /run jobs on warm pool workers with cold `python main.py`
+# starts, for a trivial program where interpreter startup dominates.
+#
+#   cd backend && python benchmarks/bench_python_pool.py [runs]
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from runner.executor import execute
+from runner.python_pool import PythonWorkerPool
+
+
+PROGRAM = "n = int(input())\nprint(sum(range(n)))\n"
+
+
+def measure(runs, pool=None):
+    totals = []
+    reported = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = execute("python", PROGRAM, "1000", python_pool=pool)
+        totals.append(time.perf_counter() - start)
+        reported.append(result["execution_time"])
+
+        assert result["stdout"] == "499500\n", result
+
+    return statistics.median(totals), statistics.median(reported)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    pool = PythonWorkerPool(1)
+    pool.start()
+    while not pool.stats()["idle"]:
+        time.sleep(0.01)
+
+    cold_total, cold_reported = measure(runs)
+    warm_total, warm_reported = measure(runs, pool)
+    stats = pool.stats()
+    pool.close()
+
+    print(f"runs:  {runs}")
+    print(f"cold:  {cold_total * 1000:.1f} ms per job, reported execution_time {cold_reported * 1000:.1f} ms")
+    print(f"warm:  {warm_total * 1000:.1f} ms per job, reported execution_time {warm_reported * 1000:.1f} ms")
+    print(f"pool:  {stats['hits']} hits, {stats['cold_starts']} cold starts, {stats['recycled']} recycled")
+
+
+if __name__ == "__main__":
+    main()
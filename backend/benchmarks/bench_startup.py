@@ -0,0 +1,117 @@
+# Measure server import time with `python -X importtime -c "import main"`
+# and check it against a budget. The budget applies to the app's own
+# share: main's import tree minus the web framework (fastapi, starlette,
+# pydantic, ...), which costs the same whatever the app does. Exits 1
+# when the median run is over budget.
+#
+#   cd backend && python benchmarks/bench_startup.py [runs] [budget_ms]
+#
+# The budget can also be set with ALGOLENS_STARTUP_BUDGET_MS.
+
+import os
+import statistics
+import subprocess
+import sys
+
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+FRAMEWORK = {"fastapi", "starlette", "pydantic", "pydantic_core", "anyio", "typing_extensions",
+             "annotated_types", "typing_inspection", "multipart", "python_multipart"}
+
+DEFAULT_BUDGET_MS = 60
+
+
+class Node:
+    __slots__ = ("name", "self_us", "cumulative_us", "children")
+
+    def __init__(self, name, self_us, cumulative_us, children):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.children = children
+
+
+def parse(stderr):
+    # importtime prints each module after its imports, indented two
+    # spaces per level: a line's children are the deeper lines before it
+    pending = {}
+    roots = []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        stripped = name.lstrip(" ")
+        level = (len(name) - len(stripped) - 1) // 2
+
+        node = Node(stripped, int(self_us), int(cumulative_us), pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(node)
+        if level == 0:
+            roots.append(node)
+
+    return roots
+
+
+def framework_us(node):
+    # Cost of framework subtrees under `node`, not counting their children twice
+    if node.name.split(".")[0] in FRAMEWORK:
+        return node.cumulative_us
+    return sum(framework_us(child) for child in node.children)
+
+
+def app_modules(node, totals):
+    # Self time per module outside the framework
+    if node.name.split(".")[0] in FRAMEWORK:
+        return
+    totals[node.name] = totals.get(node.name, 0) + node.self_us
+    for child in node.children:
+        app_modules(child, totals)
+
+
+def measure():
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    main_node = next(node for node in parse(process.stderr) if node.name == "main")
+    totals = {}
+    app_modules(main_node, totals)
+
+    return main_node.cumulative_us, main_node.cumulative_us - framework_us(main_node), totals
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    budget = float(sys.argv[2] if len(sys.argv) > 2 else os.environ.get("ALGOLENS_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+    measure()  # warm the bytecode and page caches
+
+    results = [measure() for _ in range(runs)]
+    total = statistics.median(result[0] for result in results) / 1000
+    app = statistics.median(result[1] for result in results) / 1000
+
+    # Heaviest app-side modules from the median run
+    _, _, totals = sorted(results, key=lambda result: result[1])[len(results) // 2]
+    heaviest = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    print(f"runs:      {runs}")
+    print(f"total:     {total:.1f} ms   (import main, median)")
+    print(f"framework: {total - app:.1f} ms")
+    print(f"app:       {app:.1f} ms   budget {budget:.0f} ms")
+    print("heaviest app-side modules (self time):")
+    for name, self_us in heaviest:
+        print(f"  {self_us / 1000:7.2f} ms  {name}")
+
+    if app > budget:
+        print(f"OVER BUDGET by {app - budget:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
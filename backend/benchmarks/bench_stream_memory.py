@@ -0,0 +1,112 @@
+# Peak RSS against input size for C analysis of one large generated file:
+# per-line CFG (the /analyze shape for small sources), the whole file in
+# memory with the function-level CFG, and the mmap streaming analysis
+# behind /analyze/file. Each measurement runs in a fresh interpreter and
+# is taken above that interpreter's baseline, before the result is
+# serialized.
+#
+# Two inputs per size: many small functions (the summaries grow with the
+# file) and a fixed 100 functions padded with comments and long bodies,
+# where only the streaming analysis stays flat.
+#
+#   cd backend && python benchmarks/bench_stream_memory.py [lines ...]
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_clike_scanner import FUNCTION_TEMPLATE
+
+
+MODES = ("line_cfg", "in_memory", "stream")
+
+FIXED_FUNCTIONS = 100
+
+PADDING = """    /* generated table row: { 1, 2, 3 } for (;;) */
+    total += data[n % 7] * 31 + (n >> 2);
+"""
+
+
+def write_source(path, min_lines, functions=None):
+    # functions=None: one function per template (about 20 lines each)
+    lines = 0
+    i = 0
+    with open(path, "w") as f:
+        f.write("#include <stdio.h>\n")
+        while lines < min_lines:
+            chunk = FUNCTION_TEMPLATE.format(i=i, prev=max(i - 1, 0))
+            if functions is not None:
+                # Long bodies: pad the function before its last line
+                padding = PADDING * max((min_lines // functions - chunk.count("\n")) // 2, 0)
+                head, _, tail = chunk.rpartition("    return")
+                chunk = head + padding + "    return" + tail
+            f.write(chunk)
+            lines += chunk.count("\n")
+            i += 1
+
+
+def child(mode, path):
+    import analyzer.c_analyzer as c_analyzer
+    from analyzer.clike_stream import analyze_path
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    if mode == "stream":
+        result = analyze_path("c", path)
+    else:
+        if mode == "line_cfg":
+            c_analyzer.MAX_LINE_CFG_LINES = float("inf")
+        with open(path) as f:
+            result = c_analyzer.analyze_c(f.read())
+
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    response = len(json.dumps(result))
+
+    print(json.dumps({"peak_kb": peak - baseline, "seconds": elapsed, "response_bytes": response}))
+
+
+def measure(mode, path):
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode, path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+        return
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50000, 200000, 800000]
+
+    print(f"{'functions':>9}  {'lines':>8}  {'MB':>6}  "
+          + "  ".join(f"{mode + ' peak MB':>18}" for mode in MODES)
+          + "  stream s  response KB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for functions in (None, FIXED_FUNCTIONS):
+            for lines in sizes:
+                path = os.path.join(directory, f"source_{lines}.c")
+                write_source(path, lines, functions)
+                megabytes = os.path.getsize(path) / 1e6
+
+                results = {mode: measure(mode, path) for mode in MODES}
+                peaks = "  ".join(f"{results[mode]['peak_kb'] / 1024:>18.1f}" for mode in MODES)
+                stream = results["stream"]
+                print(f"{functions or 'many':>9}  {lines:>8}  {megabytes:>6.1f}  {peaks}  "
+                      f"{stream['seconds']:>8.2f}  {stream['response_bytes'] / 1024:>11.0f}")
+
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#include <stdio.h>
+#include <stdlib.h>
+
+// @helpers
+
+static char *sequence(int n, unsigned long long seed) {
+    char *letters = malloc(n + 1);
+    for (int i = 0; i < n; i++) {
+        seed = (seed * 1103515245ULL + 12345) % 2147483648ULL;
+        letters[i] = "ACGT"[(seed >> 16) % 4];
+    }
+    letters[n] = '\0';
+    return letters;
+}
+
+static int lcs(const char *a, const char *b, int n) {
+    int *previous = calloc(n + 1, sizeof(int));
+    int *current = calloc(n + 1, sizeof(int));
+    for (int i = 1; i <= n; i++) {
+        for (int j = 1; j <= n; j++) {
+            if (a[i - 1] == b[j - 1]) {
+                current[j] = previous[j - 1] + 1;
+            } else if (previous[j] >= current[j - 1]) {
+                current[j] = previous[j];
+            } else {
+                current[j] = current[j - 1];
+            }
+        }
+        int *swap = previous;
+        previous = current;
+        current = swap;
+    }
+    int length = previous[n];
+    free(previous);
+    free(current);
+    return length;
+}
+
+int main(void) {
+    int n;
+    if (scanf("%d", &n) != 1 || n <= 0) {
+        return 1;
+    }
+    char *a = sequence(n, 7);
+    char *b = sequence(n, 11);
+    printf("%d\n", lcs(a, b, n));
+    free(a);
+    free(b);
+    return 0;
+}
@@ -0,0 +1,44 @@
+#include <cstdio>
+#include <iostream>
+#include <string>
+#include <vector>
+
+using namespace std;
+
+// @helpers
+
+string sequence(int n, unsigned long long seed) {
+    string letters;
+    for (int i = 0; i < n; i++) {
+        seed = (seed * 1103515245ULL + 12345) % 2147483648ULL;
+        letters += "ACGT"[(seed >> 16) % 4];
+    }
+    return letters;
+}
+
+int lcs(const string &a, const string &b) {
+    vector<int> previous(b.size() + 1, 0);
+    for (size_t i = 1; i <= a.size(); i++) {
+        vector<int> current(b.size() + 1, 0);
+        for (size_t j = 1; j <= b.size(); j++) {
+            if (a[i - 1] == b[j - 1]) {
+                current[j] = previous[j - 1] + 1;
+            } else if (previous[j] >= current[j - 1]) {
+                current[j] = previous[j];
+            } else {
+                current[j] = current[j - 1];
+            }
+        }
+        previous = current;
+    }
+    return previous[b.size()];
+}
+
+int main() {
+    int n;
+    if (!(cin >> n) || n <= 0) {
+        return 1;
+    }
+    cout << lcs(sequence(n, 7), sequence(n, 11)) << endl;
+    return 0;
+}
@@ -0,0 +1,37 @@
+import java.util.Scanner;
+
+public class Main {
+    // @helpers
+
+    static String sequence(int n, long seed) {
+        StringBuilder letters = new StringBuilder();
+        for (int i = 0; i < n; i++) {
+            seed = (seed * 1103515245L + 12345) % 2147483648L;
+            letters.append("ACGT".charAt((int) ((seed >> 16) % 4)));
+        }
+        return letters.toString();
+    }
+
+    static int lcs(String a, String b) {
+        int[] previous = new int[b.length() + 1];
+        for (int i = 1; i <= a.length(); i++) {
+            int[] current = new int[b.length() + 1];
+            for (int j = 1; j <= b.length(); j++) {
+                if (a.charAt(i - 1) == b.charAt(j - 1)) {
+                    current[j] = previous[j - 1] + 1;
+                } else if (previous[j] >= current[j - 1]) {
+                    current[j] = previous[j];
+                } else {
+                    current[j] = current[j - 1];
+                }
+            }
+            previous = current;
+        }
+        return previous[b.length()];
+    }
+
+    public static void main(String[] args) {
+        int n = new Scanner(System.in).nextInt();
+        System.out.println(lcs(sequence(n, 7), sequence(n, 11)));
+    }
+}
@@ -0,0 +1,34 @@
+import sys
+
+# @helpers
+
+
+def sequence(n, seed):
+    letters = []
+    for _ in range(n):
+        seed = (seed * 1103515245 + 12345) % 2147483648
+        letters.append("ACGT"[(seed >> 16) % 4])
+    return "".join(letters)
+
+
+def lcs(a, b):
+    previous = [0] * (len(b) + 1)
+    for i in range(1, len(a) + 1):
+        current = [0] * (len(b) + 1)
+        for j in range(1, len(b) + 1):
+            if a[i - 1] == b[j - 1]:
+                current[j] = previous[j - 1] + 1
+            elif previous[j] >= current[j - 1]:
+                current[j] = previous[j]
+            else:
+                current[j] = current[j - 1]
+        previous = current
+    return previous[len(b)]
+
+
+def main():
+    n = int(sys.stdin.readline())
+    print(lcs(sequence(n, 7), sequence(n, 11)))
+
+
+main()
@@ -0,0 +1,29 @@
+#include <stdio.h>
+
+// @helpers
+
+static int place(int row, int n, int *columns, int *diagonals, int *anti_diagonals) {
+    if (row == n) {
+        return 1;
+    }
+    int count = 0;
+    for (int column = 0; column < n; column++) {
+        if (columns[column] || diagonals[row - column + n] || anti_diagonals[row + column]) {
+            continue;
+        }
+        columns[column] = diagonals[row - column + n] = anti_diagonals[row + column] = 1;
+        count += place(row + 1, n, columns, diagonals, anti_diagonals);
+        columns[column] = diagonals[row - column + n] = anti_diagonals[row + column] = 0;
+    }
+    return count;
+}
+
+int main(void) {
+    int n;
+    if (scanf("%d", &n) != 1 || n <= 0 || n > 16) {
+        return 1;
+    }
+    int columns[16] = {0}, diagonals[33] = {0}, anti_diagonals[33] = {0};
+    printf("%d\n", place(0, n, columns, diagonals, anti_diagonals));
+    return 0;
+}
@@ -0,0 +1,42 @@
+#include <cstdio>
+#include <iostream>
+#include <vector>
+
+using namespace std;
+
+// @helpers
+
+class Board {
+public:
+    explicit Board(int n) : n(n), columns(n, false), diagonals(2 * n, false), anti_diagonals(2 * n, false) {}
+
+    int solve(int row) {
+        if (row == n) {
+            return 1;
+        }
+        int count = 0;
+        for (int column = 0; column < n; column++) {
+            if (columns[column] || diagonals[row - column + n] || anti_diagonals[row + column]) {
+                continue;
+            }
+            columns[column] = diagonals[row - column + n] = anti_diagonals[row + column] = true;
+            count += solve(row + 1);
+            columns[column] = diagonals[row - column + n] = anti_diagonals[row + column] = false;
+        }
+        return count;
+    }
+
+private:
+    int n;
+    vector<bool> columns, diagonals, anti_diagonals;
+};
+
+int main() {
+    int n;
+    if (!(cin >> n) || n <= 0) {
+        return 1;
+    }
+    Board board(n);
+    cout << board.solve(0) << endl;
+    return 0;
+}
@@ -0,0 +1,26 @@
+import java.util.Scanner;
+
+public class Main {
+    // @helpers
+
+    static int place(int row, int n, boolean[] columns, boolean[] diagonals, boolean[] antiDiagonals) {
+        if (row == n) {
+            return 1;
+        }
+        int count = 0;
+        for (int column = 0; column < n; column++) {
+            if (columns[column] || diagonals[row - column + n] || antiDiagonals[row + column]) {
+                continue;
+            }
+            columns[column] = diagonals[row - column + n] = antiDiagonals[row + column] = true;
+            count += place(row + 1, n, columns, diagonals, antiDiagonals);
+            columns[column] = diagonals[row - column + n] = antiDiagonals[row + column] = false;
+        }
+        return count;
+    }
+
+    public static void main(String[] args) {
+        int n = new Scanner(System.in).nextInt();
+        System.out.println(place(0, n, new boolean[n], new boolean[2 * n], new boolean[2 * n]));
+    }
+}
@@ -0,0 +1,28 @@
+import sys
+
+# @helpers
+
+
+def place(row, n, columns, diagonals, anti_diagonals):
+    if row == n:
+        return 1
+    count = 0
+    for column in range(n):
+        if column in columns or row - column in diagonals or row + column in anti_diagonals:
+            continue
+        columns.add(column)
+        diagonals.add(row - column)
+        anti_diagonals.add(row + column)
+        count += place(row + 1, n, columns, diagonals, anti_diagonals)
+        columns.remove(column)
+        diagonals.remove(row - column)
+        anti_diagonals.remove(row + column)
+    return count
+
+
+def main():
+    n = int(sys.stdin.readline())
+    print(place(0, n, set(), set(), set()))
+
+
+main()
@@ -0,0 +1,57 @@
+#include <stdio.h>
+#include <stdlib.h>
+
+// @helpers
+
+static void merge_sort(int *values, int *scratch, int left, int right) {
+    if (right - left <= 1) {
+        return;
+    }
+    int middle = (left + right) / 2;
+    merge_sort(values, scratch, left, middle);
+    merge_sort(values, scratch, middle, right);
+
+    int i = left, j = middle, k = left;
+    while (i < middle && j < right) {
+        if (values[i] <= values[j]) {
+            scratch[k++] = values[i++];
+        } else {
+            scratch[k++] = values[j++];
+        }
+    }
+    while (i < middle) {
+        scratch[k++] = values[i++];
+    }
+    while (j < right) {
+        scratch[k++] = values[j++];
+    }
+    for (k = left; k < right; k++) {
+        values[k] = scratch[k];
+    }
+}
+
+int main(void) {
+    int n;
+    if (scanf("%d", &n) != 1 || n <= 0) {
+        return 1;
+    }
+
+    int *values = malloc(n * sizeof(int));
+    int *scratch = malloc(n * sizeof(int));
+    unsigned long long seed = 12345;
+    for (int i = 0; i < n; i++) {
+        seed = (seed * 1103515245ULL + 12345) % 2147483648ULL;
+        values[i] = (int)((seed >> 8) % 100000);
+    }
+
+    merge_sort(values, scratch, 0, n);
+    long long checksum = 0;
+    for (int i = 0; i < n; i++) {
+        checksum = (checksum * 31 + (long long)values[i] * (i + 1)) % 1000000007LL;
+    }
+    printf("%d %d %lld\n", values[0], values[n - 1], checksum);
+
+    free(values);
+    free(scratch);
+    return 0;
+}
@@ -0,0 +1,52 @@
+#include <cstdio>
+#include <iostream>
+#include <vector>
+
+using namespace std;
+
+// @helpers
+
+vector<int> merge_sort(const vector<int> &values) {
+    if (values.size() <= 1) {
+        return values;
+    }
+    size_t middle = values.size() / 2;
+    vector<int> left = merge_sort(vector<int>(values.begin(), values.begin() + middle));
+    vector<int> right = merge_sort(vector<int>(values.begin() + middle, values.end()));
+
+    vector<int> merged;
+    merged.reserve(values.size());
+    size_t i = 0, j = 0;
+    while (i < left.size() && j < right.size()) {
+        if (left[i] <= right[j]) {
+            merged.push_back(left[i++]);
+        } else {
+            merged.push_back(right[j++]);
+        }
+    }
+    merged.insert(merged.end(), left.begin() + i, left.end());
+    merged.insert(merged.end(), right.begin() + j, right.end());
+    return merged;
+}
+
+int main() {
+    int n;
+    if (!(cin >> n) || n <= 0) {
+        return 1;
+    }
+
+    vector<int> values;
+    unsigned long long seed = 12345;
+    for (int i = 0; i < n; i++) {
+        seed = (seed * 1103515245ULL + 12345) % 2147483648ULL;
+        values.push_back((int)((seed >> 8) % 100000));
+    }
+
+    vector<int> ordered = merge_sort(values);
+    long long checksum = 0;
+    for (int i = 0; i < n; i++) {
+        checksum = (checksum * 31 + (long long)ordered[i] * (i + 1)) % 1000000007LL;
+    }
+    cout << ordered.front() << " " << ordered.back() << " " << checksum << endl;
+    return 0;
+}
@@ -0,0 +1,49 @@
+import java.util.Arrays;
+import java.util.Scanner;
+
+public class Main {
+    // @helpers
+
+    static int[] mergeSort(int[] values) {
+        if (values.length <= 1) {
+            return values;
+        }
+        int middle = values.length / 2;
+        int[] left = mergeSort(Arrays.copyOfRange(values, 0, middle));
+        int[] right = mergeSort(Arrays.copyOfRange(values, middle, values.length));
+
+        int[] merged = new int[values.length];
+        int i = 0, j = 0, k = 0;
+        while (i < left.length && j < right.length) {
+            if (left[i] <= right[j]) {
+                merged[k++] = left[i++];
+            } else {
+                merged[k++] = right[j++];
+            }
+        }
+        while (i < left.length) {
+            merged[k++] = left[i++];
+        }
+        while (j < right.length) {
+            merged[k++] = right[j++];
+        }
+        return merged;
+    }
+
+    public static void main(String[] args) {
+        int n = new Scanner(System.in).nextInt();
+        long seed = 12345;
+        int[] values = new int[n];
+        for (int i = 0; i < n; i++) {
+            seed = (seed * 1103515245L + 12345) % 2147483648L;
+            values[i] = (int) ((seed >> 8) % 100000);
+        }
+
+        int[] ordered = mergeSort(values);
+        long checksum = 0;
+        for (int i = 0; i < n; i++) {
+            checksum = (checksum * 31 + (long) ordered[i] * (i + 1)) % 1000000007L;
+        }
+        System.out.println(ordered[0] + " " + ordered[n - 1] + " " + checksum);
+    }
+}
@@ -0,0 +1,42 @@
+import sys
+
+# @helpers
+
+
+def merge_sort(values):
+    if len(values) <= 1:
+        return values
+    middle = len(values) // 2
+    left = merge_sort(values[:middle])
+    right = merge_sort(values[middle:])
+
+    merged = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged
+
+
+def main():
+    n = int(sys.stdin.readline())
+    seed = 12345
+    values = []
+    for _ in range(n):
+        seed = (seed * 1103515245 + 12345) % 2147483648
+        values.append((seed >> 8) % 100000)
+
+    ordered = merge_sort(values)
+    checksum = 0
+    for index, value in enumerate(ordered):
+        checksum = (checksum * 31 + value * (index + 1)) % 1000000007
+    print(ordered[0], ordered[-1], checksum)
+
+
+main()
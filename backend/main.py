@@ -1,28 +1,38 @@
+import asyncio
+import functools
+import gzip
+import json
 import os
 import subprocess
 import tempfile
 import time
-import psutil
+from contextlib import ExitStack
+from typing import List, Optional
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
-# Python analyzers
-from analyzer.ast_parser import ASTParser
-from analyzer.loop_analyzer import LoopAnalyzer
-from analyzer.recursion_detector import RecursionDetector
-from analyzer.complexity_engine import ComplexityEngine
-from analyzer.optimizer import Optimizer
-from analyzer.cfg_generator import CFGGenerator
-from analyzer.cyclomatic import CyclomaticComplexity
-from analyzer.pattern_detector import PatternDetector
-from analyzer.quality_score import QualityScorer
-
-# Other language analyzers
-from analyzer.c_analyzer import analyze_c
-from analyzer.cpp_analyzer import analyze_cpp
-from analyzer.java_analyzer import analyze_java
+# Language analyzers (imported on first use through the registry)
+from analyzer.engine import StageTimer
+from analyzer.registry import ANALYZERS, get_analyzer
+from analyzer.cfg_wire import cfg_overview, compact_cfg, function_subgraph
+from analyzer.result_cache import AnalysisCache, cache_key
+from analyzer.batch import BatchLimitError, analyze_file, collect_sources, language_for, summarize
+from analyzer.empirical import DEFAULT_SIZES, INPUT_KINDS, generate_input, fit_complexity
+
+# Code execution
+from runner.benchmark import run_benchmark
+from runner.compile_cache import CompileCache
+from runner.executor import execute, prepare
+from runner.metrics import MetricsRegistry
+from runner.java_pool import JavaWorkerPool
+from runner.launcher import launcher
+from runner.python_pool import PythonWorkerPool
+from runner.sandbox import MB, Limits
+from runner.scheduler import JobScheduler, QueueFullError
+from runner.streaming import StreamingRun
 
 
 # ============================================================
@@ -40,10 +50,279 @@ app.add_middleware(
 )
 
 
+# ============================================================
+# Analysis Settings
+# ============================================================
+
+analysis_cache = AnalysisCache(
+    max_entries=int(os.environ.get("ALGOLENS_ANALYSIS_CACHE_SIZE", 512)),
+    ttl=float(os.environ.get("ALGOLENS_ANALYSIS_CACHE_TTL", 3600)),
+    db_path=os.environ.get("ALGOLENS_ANALYSIS_CACHE_DB")
+)
+
+INCREMENTAL_SESSIONS = int(os.environ.get("ALGOLENS_INCREMENTAL_SESSIONS", 64))
+INCREMENTAL_TTL = float(os.environ.get("ALGOLENS_INCREMENTAL_TTL", 900))
+
+incremental_sessions = None
+
+
+def get_incremental_sessions():
+    # Created on first use: the session store pulls in the Python analyzer
+    global incremental_sessions
+    if incremental_sessions is None:
+        from analyzer.incremental import SessionStore
+        incremental_sessions = SessionStore(max_sessions=INCREMENTAL_SESSIONS, ttl=INCREMENTAL_TTL)
+    return incremental_sessions
+
+
+BATCH_WORKERS = int(os.environ.get("ALGOLENS_BATCH_WORKERS", os.cpu_count() or 1))
+MAX_BATCH_FILES = int(os.environ.get("ALGOLENS_BATCH_MAX_FILES", 2000))
+MAX_BATCH_FILE_BYTES = int(os.environ.get("ALGOLENS_BATCH_MAX_FILE_BYTES", 2 * 1024 * 1024))
+# Decompressed size of a whole batch, archives included
+MAX_BATCH_TOTAL_BYTES = int(os.environ.get("ALGOLENS_BATCH_MAX_TOTAL_MB", 64)) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Largest upload /analyze/file accepts; it never holds the file in memory
+MAX_STREAM_FILE_BYTES = int(os.environ.get("ALGOLENS_STREAM_MAX_FILE_MB", 512)) * 1024 * 1024
+
+batch_pool = None
+
+
+def get_batch_pool():
+    # Started on first use so plain /analyze traffic never forks workers
+    global batch_pool
+    if batch_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+    return batch_pool
+
+
+# ============================================================
+# Execution Settings
+# ============================================================
+
+RUN_TIMEOUT = float(os.environ.get("ALGOLENS_RUN_TIMEOUT", "5"))
+COMPILE_TIMEOUT = float(os.environ.get("ALGOLENS_COMPILE_TIMEOUT", "10"))
+
+RUN_CONCURRENCY = int(os.environ.get("ALGOLENS_RUN_CONCURRENCY", os.cpu_count() or 1))
+RUN_QUEUE_SIZE = int(os.environ.get("ALGOLENS_RUN_QUEUE", RUN_CONCURRENCY * 4))
+
+scheduler = JobScheduler(RUN_CONCURRENCY, RUN_QUEUE_SIZE)
+
+# Seconds a client rejected with 429 is told to wait
+RUN_RETRY_AFTER = int(os.environ.get("ALGOLENS_RUN_RETRY_AFTER", 1))
+
+
+def queue_full(error):
+    return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": str(RUN_RETRY_AFTER)})
+
+compile_cache = CompileCache(
+    os.environ.get(
+        "ALGOLENS_COMPILE_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "algolens-compile-cache")
+    ),
+    int(os.environ.get("ALGOLENS_COMPILE_CACHE_BYTES", 256 * 1024 * 1024))
+)
+
+
+# rlimits for executed programs; the CPU limit follows RUN_TIMEOUT
+sandbox_limits = Limits(
+    address_space=int(os.environ.get("ALGOLENS_SANDBOX_MEMORY_MB", 512)) * MB,
+    processes=int(os.environ.get("ALGOLENS_SANDBOX_NPROC", 256)),
+    file_size=int(os.environ.get("ALGOLENS_SANDBOX_FILE_MB", 16)) * MB,
+    output=int(os.environ.get("ALGOLENS_SANDBOX_OUTPUT_KB", 1024)) * 1024
+)
+
+# Warm interpreters for Python runs; 0 disables the pool
+python_pool = PythonWorkerPool(
+    int(os.environ.get("ALGOLENS_PYTHON_POOL_SIZE", RUN_CONCURRENCY)),
+    max_jobs=int(os.environ.get("ALGOLENS_PYTHON_POOL_MAX_JOBS", 100))
+)
+
+# Warm JVMs for Java runs, each holding a JIT-warmed compiler; 0 disables
+# the pool. Without a JDK on the server every Java job runs cold.
+java_pool = JavaWorkerPool(
+    int(os.environ.get("ALGOLENS_JAVA_POOL_SIZE", min(RUN_CONCURRENCY, 2))),
+    max_jobs=int(os.environ.get("ALGOLENS_JAVA_POOL_MAX_JOBS", 50)),
+    limits=sandbox_limits,
+    job_time=COMPILE_TIMEOUT + RUN_TIMEOUT
+)
+
+
+# ============================================================
+# Metrics
+# ============================================================
+# Exported at /metrics in the Prometheus text format. Handlers record
+# their own counts and stage timings; queue, pool and cache figures are
+# read from the owning objects when scraped.
+
+metrics = MetricsRegistry()
+
+REQUESTS = metrics.counter(
+    "requests_total", "Requests by endpoint, language and outcome.", ("endpoint", "language", "status")
+)
+REQUEST_SECONDS = metrics.histogram(
+    "request_duration_seconds", "Request latency by endpoint and language.", ("endpoint", "language")
+)
+STAGE_SECONDS = metrics.histogram(
+    "stage_duration_seconds", "Time spent per analysis or execution stage.", ("endpoint", "language", "stage")
+)
+TIMEOUTS = metrics.counter(
+    "timeouts_total", "Compile and run timeouts.", ("endpoint", "language", "stage")
+)
+
+metrics.collected("run_queue_depth", "Jobs waiting for an execution slot.", lambda: scheduler.queued)
+metrics.collected("run_active_jobs", "Jobs holding an execution slot.", lambda: scheduler.running)
+metrics.collected("run_rejected_total", "Jobs rejected with a full queue.", lambda: scheduler.rejected, "counter")
+metrics.collected(
+    "python_pool_workers", "Warm Python workers by state.",
+    lambda: {(state,): python_pool.stats()[state] for state in ("idle", "busy", "starting")},
+    label_names=("state",)
+)
+metrics.collected(
+    "python_pool_jobs_total", "Python jobs by interpreter start.",
+    lambda: {("warm",): python_pool.hits, ("cold",): python_pool.cold_starts}, "counter", ("start",)
+)
+metrics.collected(
+    "java_pool_workers", "Warm JVM workers by state.",
+    lambda: {(state,): java_pool.stats()[state] for state in ("idle", "busy", "starting")},
+    label_names=("state",)
+)
+metrics.collected(
+    "java_pool_jobs_total", "Java jobs by JVM start.",
+    lambda: {("warm",): java_pool.hits, ("cold",): java_pool.cold_starts}, "counter", ("start",)
+)
+metrics.collected(
+    "analysis_cache_lookups_total", "Analysis cache lookups by result.",
+    lambda: {(result,): analysis_cache.stats()[result] for result in ("memory_hits", "disk_hits", "misses")},
+    "counter", ("result",)
+)
+metrics.collected(
+    "compile_cache_lookups_total", "Compile cache lookups by result.",
+    lambda: {(result,): compile_cache.stats()[result] for result in ("hits", "misses")}, "counter", ("result",)
+)
+
+
+def metric_language(language):
+    # Label values must stay bounded: anything unsupported is "other"
+    return language if language in ANALYZERS else "other"
+
+
+def result_status(result):
+    return "error" if isinstance(result, dict) and "error" in result else "ok"
+
+
+def run_status(result):
+    if result.get("timed_out") or result.get("compile_timed_out"):
+        return "timeout"
+    # No exit code: the program did not build or could not start
+    return "ok" if "exit_code" in result else "error"
+
+
+def instrumented(endpoint, status_of=result_status):
+    # Counts and times a JSON endpoint whose body (input_data) names the
+    # language
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            start = time.perf_counter()
+            language = metric_language(kwargs["input_data"].language.lower())
+            status = "error"
+            try:
+                result = await handler(**kwargs)
+                status = status_of(result)
+                return result
+            except HTTPException as e:
+                status = "rejected" if e.status_code == 429 else "error"
+                raise
+            finally:
+                REQUESTS.inc(endpoint, language, status)
+                REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, language)
+        return wrapper
+    return decorate
+
+
+def record_stages(endpoint, language, timings):
+    language = metric_language(language)
+    for stage, seconds in timings.items():
+        # Per-plugin splits ("traverse.loops") only exist in debug runs
+        if "." not in stage:
+            STAGE_SECONDS.observe(seconds, endpoint, language, stage)
+
+
+def record_timeouts(endpoint, language, result):
+    if result.get("compile_timed_out"):
+        TIMEOUTS.inc(endpoint, metric_language(language), "compile")
+    elif result.get("timed_out"):
+        TIMEOUTS.inc(endpoint, metric_language(language), "execute")
+
+
+def timings_ms(timings):
+    return {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
+
+
+@app.get("/metrics")
+def export_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.on_event("startup")
+def start_worker_pools():
+    python_pool.start()
+    java_pool.start()
+    # Built (once per version) now rather than by the first job
+    launcher.path()
+
+
+@app.on_event("shutdown")
+def shutdown_scheduler():
+    scheduler.shutdown()
+    python_pool.close()
+    java_pool.close()
+    if batch_pool is not None:
+        batch_pool.shutdown(wait=False, cancel_futures=True)
+
+
 class CodeInput(BaseModel):
     code: str
     language: str
     user_input: str = ""
+    profile: bool = False
+    line_profile: bool = False
+
+
+class StreamInput(CodeInput):
+    # Keep stdin open for {"type": "stdin"} messages until {"type": "eof"}
+    interactive: bool = False
+
+
+class BenchmarkInput(BaseModel):
+    language: str
+    candidates: List[str]
+    user_input: str = ""
+    runs: int = 10
+    warmups: int = 1
+
+
+class LineEdit(BaseModel):
+    start_line: int
+    end_line: int
+    text: str = ""
+
+
+class IncrementalInput(BaseModel):
+    language: str
+    session_id: Optional[str] = None
+    code: Optional[str] = None
+    edits: List[LineEdit] = []
+
+
+class EmpiricalInput(BaseModel):
+    code: str
+    language: str
+    input_kind: str = "array"
+    sizes: Optional[List[int]] = None
+    repeats: int = 3
 
 
 @app.get("/")
@@ -52,268 +331,679 @@ def root():
 
 
 # ============================================================
-# PYTHON ANALYSIS LOGIC
+# ANALYZE ENDPOINT
 # ============================================================
 
-def analyze_python_logic(code: str):
-
-    parser = ASTParser(code)
-    tree = parser.get_tree()
-
-    # Loop analysis
-    loop_analyzer = LoopAnalyzer()
-    loop_analyzer.visit(tree)
-
-    # Recursion detection
-    recursion_detector = RecursionDetector()
-    recursion_detector.visit(tree)
-
-    # Complexity estimation
-    complexity_engine = ComplexityEngine()
-    estimated_complexity = complexity_engine.estimate(
-        loop_analyzer.max_depth,
-        recursion_detector.recursive_functions
-    )
-
-    # Optimization suggestions
-    optimizer = Optimizer()
-    suggestions = optimizer.suggest(
-        loop_analyzer.max_depth,
-        recursion_detector.recursive_functions
-    )
-
-    # CFG generation
-    cfg_generator = CFGGenerator(code)
-    cfg_graph = cfg_generator.generate()
-
-    nodes = [
-        {
-            "id": node,
-            "label": data["label"],
-            "lineno": data.get("lineno")
-        }
-        for node, data in cfg_graph.nodes(data=True)
-    ]
-
-    edges = [
-        {
-            "source": source,
-            "target": target
-        }
-        for source, target in cfg_graph.edges()
-    ]
-
-    # Cyclomatic complexity
-    cyclomatic = CyclomaticComplexity()
-    cyclomatic_complexity = cyclomatic.calculate(tree)
-
-    # Pattern detection
-    pattern_detector = PatternDetector()
-    issues = pattern_detector.detect(tree)
-
-    # Quality score
-    quality_scorer = QualityScorer()
-    quality_score = quality_scorer.score(
-        cyclomatic_complexity,
-        loop_analyzer.max_depth,
-        recursion_detector.recursive_functions,
-        issues
-    )
+def run_analysis(language, code, timings=None, detailed=False):
 
-    return {
-        "loop_depth": loop_analyzer.max_depth,
-        "recursive_functions": list(recursion_detector.recursive_functions),
-        "estimated_complexity": estimated_complexity,
-        "suggestions": suggestions,
-        "cyclomatic_complexity": cyclomatic_complexity,
-        "quality_score": quality_score,
-        "issues": issues,
-        "cfg": {
-            "nodes": nodes,
-            "edges": edges
-        }
-    }
+    analyzer = get_analyzer(language)
+
+    if analyzer is None:
+        return {"error": "Unsupported language"}
+
+    # The Python analyzer times its own stages; the others are timed whole
+    if language == "python":
+        return analyzer(code, timings, detailed)
+
+    timer = StageTimer(timings)
+    result = analyzer(code)
+    timer.mark("analyze")
+    return result
+
+
+async def cache_call(method, *args):
+    # The sqlite tier blocks, so with it cache calls run on a thread
+    if not analysis_cache.disk_tier:
+        return method(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+
+async def cached_analysis(language, code, timings, detailed=False):
+    # -> (result, analysis id, cache hit). The id is the cache key, which
+    # /analyze/{analysis_id}/... endpoints look the result up by.
+    timer = StageTimer(timings)
+    key = cache_key(language, code)
+
+    cached = await cache_call(analysis_cache.get_by_key, key)
+    timer.mark("cache_lookup")
+
+    if cached is not None:
+        return cached, key, True
+
+    result = run_analysis(language, code, timings, detailed)
+
+    if "error" not in result:
+        await cache_call(analysis_cache.put_by_key, key, result)
+
+    return result, key, False
+
+
+# ---- CFG payloads ----
+# cfg_format: "full" (a dict per node and edge) or "compact" (see
+# analyzer.cfg_wire). encoding: "json", "gzip" (gzip-compressed JSON
+# sent with Content-Encoding, so browsers and HTTP clients decode it
+# transparently) or "msgpack" (needs the msgpack package on the server).
+
+CFG_FORMATS = ("full", "compact")
+ENCODINGS = ("json", "gzip", "msgpack")
+
+
+def check_payload_options(cfg_format, encoding):
+    if cfg_format not in CFG_FORMATS:
+        raise HTTPException(status_code=400, detail=f"cfg_format must be one of {', '.join(CFG_FORMATS)}")
+    if encoding not in ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(ENCODINGS)}")
+
+
+def encode_payload(payload, encoding):
+    if encoding == "json":
+        return payload
+
+    if encoding == "gzip":
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        return Response(gzip.compress(body, 6), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=400, detail="msgpack encoding is not available on this server")
+    return Response(msgpack.packb(payload), media_type="application/msgpack")
+
+
+@app.post("/analyze")
+@instrumented("analyze")
+async def analyze_code(input_data: CodeInput, debug: bool = False, cfg_format: str = "full", encoding: str = "json"):
+    # ?debug=true adds the stage breakdown ("timings_ms") to the response
+
+    check_payload_options(cfg_format, encoding)
+
+    language = input_data.language.lower()
+    timings = {}
+
+    result, _, cache_hit = await cached_analysis(language, input_data.code, timings, detailed=debug)
+
+    if cfg_format == "compact" and "cfg" in result:
+        timer = StageTimer(timings)
+        result = {**result, "cfg": compact_cfg(result["cfg"])}
+        timer.mark("compact")
+
+    record_stages("analyze", language, timings)
+
+    if debug:
+        result = {**result, "cache_hit": cache_hit, "timings_ms": timings_ms(timings)}
+
+    return encode_payload(result, encoding)
 
 
 # ============================================================
-# ANALYZE ENDPOINT
+# CFG OVERVIEW / EXPANSION ENDPOINTS
 # ============================================================
+# For large inputs: /analyze/overview returns the analysis without the
+# CFG, plus one entry per function (node and edge counts, calls between
+# functions) and an analysis_id. A function's subgraph is then fetched
+# on demand from /analyze/{analysis_id}/functions/{function_id}. The
+# full result stays in the analysis cache; an expired id answers 404.
 
-@app.post("/analyze")
-async def analyze_code(input_data: CodeInput):
+@app.post("/analyze/overview")
+@instrumented("analyze_overview")
+async def analyze_overview(input_data: CodeInput, encoding: str = "json"):
+
+    check_payload_options("full", encoding)
 
     language = input_data.language.lower()
+    timings = {}
 
-    if language == "python":
-        return analyze_python_logic(input_data.code)
+    result, analysis_id, _ = await cached_analysis(language, input_data.code, timings)
+    record_stages("analyze_overview", language, timings)
 
-    elif language == "c":
-        return analyze_c(input_data.code)
+    if "cfg" not in result:
+        return encode_payload(result, encoding)
 
-    elif language == "cpp":
-        return analyze_cpp(input_data.code)
+    overview = {key: value for key, value in result.items() if key != "cfg"}
+    overview["analysis_id"] = analysis_id
+    overview["cfg_overview"] = cfg_overview(result["cfg"], result.get("call_graph"))
 
-    elif language == "java":
-        return analyze_java(input_data.code)
+    return encode_payload(overview, encoding)
 
-    else:
-        return {"error": "Unsupported language"}
+
+@app.get("/analyze/{analysis_id}/functions/{function_id}")
+def analyze_function(analysis_id: str, function_id: int, cfg_format: str = "full", encoding: str = "json"):
+
+    check_payload_options(cfg_format, encoding)
+
+    result = analysis_cache.get_by_key(analysis_id)
+    if result is None or "cfg" not in result:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis. Request /analyze/overview again.")
+
+    subgraph = function_subgraph(result["cfg"], function_id, compact=cfg_format == "compact")
+    if subgraph is None:
+        raise HTTPException(status_code=404, detail=f"No function {function_id} in this analysis")
+
+    return encode_payload({"analysis_id": analysis_id, **subgraph}, encoding)
+
+
+@app.get("/analyze/cache")
+def analyze_cache_stats():
+    return analysis_cache.stats()
 
 
 # ============================================================
-# RUN ENDPOINT (Multi-Language Execution)
+# INCREMENTAL ANALYZE ENDPOINT
 # ============================================================
+# Editor integration: the first request sends the full code and gets a
+# session_id; later requests send only line edits against it. Python
+# sessions reparse and re-analyze just the statements an edit touches.
 
-@app.post("/run")
-async def run_code(input_data: CodeInput):
+@app.post("/analyze/incremental")
+@instrumented("analyze_incremental")
+async def analyze_incremental(input_data: IncrementalInput):
 
     language = input_data.language.lower()
-    code = input_data.code
-    user_input = input_data.user_input
 
-    try:
-        with tempfile.TemporaryDirectory() as temp_dir:
+    # Other languages have no per-statement state: analyze the full code
+    if language != "python":
+        if input_data.code is None:
+            raise HTTPException(status_code=400, detail="Incremental edits are only supported for Python")
 
-            # ====================================================
-            # PYTHON
-            # ====================================================
-            if language == "python":
+        result = run_analysis(language, input_data.code)
+        return {**result, "session_id": None, "incremental": {"full_parse": True}}
 
-                file_path = os.path.join(temp_dir, "main.py")
+    sessions = get_incremental_sessions()
+    session_id = input_data.session_id
+    session = sessions.get(session_id) if session_id else None
 
-                with open(file_path, "w") as f:
-                    f.write(code)
+    if input_data.code is not None:
+        if session is None:
+            session_id, session = sessions.create(input_data.code)
+        else:
+            session.reset(input_data.code)
 
-                command = ["python", file_path]
+    elif session is None:
+        raise HTTPException(status_code=409, detail="Unknown or expired session. Resend the full code.")
 
-            # ====================================================
-            # C
-            # ====================================================
-            elif language == "c":
+    try:
+        for edit in input_data.edits:
+            session.apply_edit(edit.start_line, edit.end_line, edit.text)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result, stats = session.analyze()
+    except SyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"Syntax error: {e.msg} (line {e.lineno})")
 
-                file_path = os.path.join(temp_dir, "main.c")
-                exe_path = os.path.join(temp_dir, "main")
+    return {**result, "session_id": session_id, "incremental": stats}
 
-                with open(file_path, "w") as f:
-                    f.write(code)
 
-                compile_process = subprocess.run(
-                    ["gcc", file_path, "-o", exe_path],
-                    capture_output=True,
-                    text=True
+# ============================================================
+# BATCH ANALYZE ENDPOINT
+# ============================================================
+
+async def read_uploads(files):
+    # -> [(filename, bytes)]. The uploads are spooled by the multipart
+    # parser and read into memory only up to MAX_BATCH_TOTAL_BYTES
+    # together, the most source a batch may hold.
+    declared = sum(upload.size or 0 for upload in files)
+    if declared > MAX_BATCH_TOTAL_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload has {declared} bytes, the limit is {MAX_BATCH_TOTAL_BYTES}"
+        )
+
+    uploads = []
+    total = 0
+
+    for upload in files:
+        chunks = []
+        while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+            total += len(chunk)
+            if total > MAX_BATCH_TOTAL_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload has more than {MAX_BATCH_TOTAL_BYTES} bytes"
                 )
+            chunks.append(chunk)
+        uploads.append((upload.filename or "upload", b"".join(chunks)))
+
+    return uploads
 
-                if compile_process.returncode != 0:
-                    return {"stderr": compile_process.stderr}
 
-                command = [exe_path]
+@app.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
 
-            # ====================================================
-            # C++
-            # ====================================================
-            elif language == "cpp":
+    # Collect (name, language, source) from plain files and archives;
+    # decompressing is CPU-bound, so it runs off the event loop
+    uploads = await read_uploads(files)
 
-                file_path = os.path.join(temp_dir, "main.cpp")
-                exe_path = os.path.join(temp_dir, "main")
+    loop = asyncio.get_running_loop()
+    try:
+        sources, skipped = await loop.run_in_executor(
+            None, collect_sources, uploads, MAX_BATCH_FILES, MAX_BATCH_FILE_BYTES, MAX_BATCH_TOTAL_BYTES
+        )
+    except BatchLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-                with open(file_path, "w") as f:
-                    f.write(code)
+    async def stream():
+        results = []
 
-                compile_process = subprocess.run(
-                    ["g++", file_path, "-o", exe_path],
-                    capture_output=True,
-                    text=True
-                )
+        for entry in skipped:
+            yield json.dumps(entry) + "\n"
 
-                if compile_process.returncode != 0:
-                    return {"stderr": compile_process.stderr}
+        loop = asyncio.get_running_loop()
+        pool = get_batch_pool()
 
-                command = [exe_path]
+        async def analyze_one(name, language, code):
+            entry = await loop.run_in_executor(pool, analyze_file, name, language, code)
+            if "result" in entry:
+                await cache_call(analysis_cache.put, language, code, entry["result"])
+            return entry
 
-            # ====================================================
-            # JAVA
-            # ====================================================
-            elif language == "java":
+        # Cached files are answered immediately, the rest fan out
+        pending = []
 
-                file_path = os.path.join(temp_dir, "Main.java")
+        for name, language, code in sources:
+            cached = await cache_call(analysis_cache.get, language, code)
 
-                with open(file_path, "w") as f:
-                    f.write(code)
+            if cached is not None:
+                entry = {"file": name, "language": language, "result": cached}
+                results.append(entry)
+                yield json.dumps(entry) + "\n"
+                continue
+
+            pending.append(analyze_one(name, language, code))
+
+        for next_done in asyncio.as_completed(pending):
+            entry = await next_done
+            results.append(entry)
+            yield json.dumps(entry) + "\n"
+
+        summary = summarize(results)
+        summary["skipped"] = len(skipped)
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
-                compile_process = subprocess.run(
-                    ["javac", file_path],
-                    capture_output=True,
-                    text=True,
-                    cwd=temp_dir
-                )
 
-                if compile_process.returncode != 0:
-                    return {"stderr": compile_process.stderr}
+# ============================================================
+# STREAMING FILE ANALYZE ENDPOINT
+# ============================================================
+# One large C, C++ or Java file (generated or amalgamated sources),
+# scanned through mmap in constant memory and answered with the
+# function-level CFG. The language comes from the form field or the
+# file name. Not cached: hashing the file would read it a second time.
+
+@app.post("/analyze/file")
+async def analyze_file_upload(file: UploadFile = File(...), language: Optional[str] = Form(None)):
+
+    language = (language or language_for(file.filename or "") or "").lower()
+
+    # Uploads are spooled to a temporary file; fileno() moves a small
+    # one out of memory, so it can always be mapped
+    size = os.fstat(file.file.fileno()).st_size
+    if size > MAX_STREAM_FILE_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File has {size} bytes, the limit is {MAX_STREAM_FILE_BYTES}"
+        )
+
+    # Imported here: it loads the C-family scanner
+    from analyzer.clike_stream import analyze_stream
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, analyze_stream, language, file.file)
 
-                command = ["java", "Main"]
 
-            else:
-                return {"stderr": "Unsupported language"}
+# ============================================================
+# EMPIRICAL COMPLEXITY ENDPOINT
+# ============================================================
 
-            # ====================================================
-            # EXECUTION
-            # ====================================================
+MAX_EMPIRICAL_SIZES = 12
+MAX_EMPIRICAL_REPEATS = 5
 
-            start_time = time.time()
 
-            process = subprocess.Popen(
-                command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=temp_dir
+@app.post("/analyze/empirical")
+@instrumented("analyze_empirical")
+async def analyze_empirical(input_data: EmpiricalInput):
+
+    language = input_data.language.lower()
+    sizes = sorted(set(input_data.sizes or DEFAULT_SIZES))
+    repeats = max(1, min(input_data.repeats, MAX_EMPIRICAL_REPEATS))
+
+    if input_data.input_kind not in INPUT_KINDS:
+        return {"error": f"input_kind must be one of {', '.join(INPUT_KINDS)}"}
+
+    if not 3 <= len(sizes) <= MAX_EMPIRICAL_SIZES or sizes[0] < 1:
+        return {"error": f"Provide between 3 and {MAX_EMPIRICAL_SIZES} positive sizes"}
+
+    # Keep our own share of the pool so a sweep never trips the 429 path
+    slots = asyncio.Semaphore(scheduler.max_concurrency)
+
+    async def measure(n):
+        async with slots:
+            result = await scheduler.submit(
+                execute,
+                language,
+                input_data.code,
+                generate_input(input_data.input_kind, n),
+                timeout=RUN_TIMEOUT,
+                compile_timeout=COMPILE_TIMEOUT,
+                cache=compile_cache,
+                python_pool=python_pool,
+                java_pool=java_pool,
+                limits=sandbox_limits
             )
+        record_timeouts("analyze_empirical", language, result)
+        return result
 
+    # Smallest size first: compiles once and surfaces errors early. A
+    # full queue rejects the whole sweep, like a single /run.
+    try:
+        first = await measure(sizes[0])
+        if first.get("cpu_time") is None:
+            return {"error": "Program failed on the smallest input", "run": first}
+
+        jobs = [(n, asyncio.ensure_future(measure(n))) for n in sizes for _ in range(repeats)]
+        try:
+            runs = await asyncio.gather(*(job for _, job in jobs))
+        except QueueFullError:
+            # The sizes still waiting for a slot are not submitted
+            for _, job in jobs:
+                job.cancel()
+            raise
+    except QueueFullError as e:
+        raise queue_full(e)
+
+    # Best (minimum) CPU time per size is the least noisy estimate
+    timings = {}
+    for (n, _), run in zip(jobs, runs):
+        cpu_time = run.get("cpu_time")
+        if cpu_time is None or run.get("exit_code"):
+            continue
+        timings[n] = min(timings.get(n, cpu_time), cpu_time)
+
+    measured = sorted(timings)
+
+    return {
+        "sizes": measured,
+        "cpu_times": [timings[n] for n in measured],
+        "failed_sizes": [n for n in sizes if n not in timings],
+        **fit_complexity(measured, [timings[n] for n in measured])
+    }
+
+
+# ============================================================
+# RUN ENDPOINT (Multi-Language Execution)
+# ============================================================
+
+@app.post("/run")
+@instrumented("run", run_status)
+async def run_code(input_data: CodeInput, debug: bool = False):
+    # ?debug=true adds the queue wait / compile / execute split
+    # ("timings_ms") to the response
+
+    language = input_data.language.lower()
+    timings = {}
+    start = time.perf_counter()
+
+    try:
+        result = await scheduler.submit(
+            execute_line_profile if input_data.line_profile else execute,
+            language,
+            input_data.code,
+            input_data.user_input,
+            timeout=RUN_TIMEOUT,
+            compile_timeout=COMPILE_TIMEOUT,
+            cache=compile_cache,
+            profile=input_data.profile,
+            python_pool=python_pool,
+            java_pool=java_pool,
+            limits=sandbox_limits,
+            timings=timings
+        )
+    except QueueFullError as e:
+        raise queue_full(e)
+
+    # Whatever the job itself did not account for was spent queued
+    # (and handing the job to and from the worker thread)
+    timings["queue_wait"] = max(time.perf_counter() - start - sum(timings.values()), 0.0)
+
+    record_stages("run", language, timings)
+    record_timeouts("run", language, result)
+
+    if debug:
+        return {**result, "timings_ms": timings_ms(timings)}
+
+    return result
+
+
+def execute_line_profile(language, code, user_input, **options):
+    # Blocking: a line-profiled run, its summary joined to the CFG nodes
+    # that /analyze returns for the same code
+    result = execute(language, code, user_input, line_profile=True, **options)
+
+    if language != "python":
+        result["line_profile"] = {"error": "Line profiling is only available for Python"}
+        return result
+
+    summary = result.get("line_profile")
+    if summary is None:
+        reason = "the program timed out" if result.get("timed_out") else "the program did not run to the end"
+        result["line_profile"] = {"error": f"No line profile: {reason}"}
+        return result
+
+    # Imported here: it builds the CFG with the Python analyzer's modules
+    from analyzer.hotspots import map_hotspots
+
+    start = time.perf_counter()
+    try:
+        result["line_profile"] = map_hotspots(code, summary)
+    except (SyntaxError, TypeError, ValueError):
+        result["line_profile"] = {"error": "Line profile could not be read"}
+
+    timings = options.get("timings")
+    if timings is not None:
+        timings["hotspots"] = time.perf_counter() - start
+
+    return result
+
+
+# ============================================================
+# STREAMING RUN ENDPOINT
+# ============================================================
+# WebSocket variant of /run. The client sends a StreamInput as its first
+# message, then optionally {"type": "stdin", "data": ...},
+# {"type": "eof"} or {"type": "kill"}. The server streams stdout/stderr
+# chunks and CPU/memory samples as they happen and ends with an "exit"
+# message (see runner.streaming). Always a cold start: warm workers
+# return output only when the job ends.
+
+STREAM_SAMPLE_INTERVAL = float(os.environ.get("ALGOLENS_STREAM_SAMPLE_INTERVAL", "0.1"))
+
+
+@app.websocket("/run/stream")
+async def run_stream(websocket: WebSocket):
+
+    await websocket.accept()
+
+    try:
+        input_data = StreamInput(**await websocket.receive_json())
+    except (ValueError, ValidationError) as e:
+        await websocket.send_json({"type": "error", "message": f"Invalid request: {e}"})
+        await websocket.close()
+        return
+    except WebSocketDisconnect:
+        return
+
+    language = input_data.language.lower()
+    start = time.perf_counter()
+    status = "error"
+
+    try:
+        status = await _prepare_stream(websocket, input_data, language)
+    finally:
+        label = metric_language(language)
+        REQUESTS.inc("run_stream", label, status)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, "run_stream", label)
+
+
+async def _prepare_stream(websocket, input_data, language):
+
+    with ExitStack() as stack:
+        status = "error"
+        try:
+            command, cwd, error = await scheduler.submit(
+                stack.enter_context,
+                prepare(language, input_data.code, COMPILE_TIMEOUT, compile_cache)
+            )
+        except QueueFullError as e:
+            error = str(e)
+            status = "rejected"
+        except subprocess.TimeoutExpired:
+            error = "Compilation timed out."
+            status = "timeout"
+            TIMEOUTS.inc("run_stream", metric_language(language), "compile")
+
+        if error is None:
+            run = StreamingRun(
+                command, cwd, RUN_TIMEOUT, sandbox_limits.for_language(language),
+                sample_interval=STREAM_SAMPLE_INTERVAL
+            )
+            # The program starts only once the job holds a scheduler slot
+            job = asyncio.ensure_future(scheduler.submit(run.run, asyncio.get_running_loop()))
+            started = asyncio.ensure_future(run.started.wait())
+            await asyncio.wait((job, started), return_when=asyncio.FIRST_COMPLETED)
+            started.cancel()
+
+            if run.process is None:
+                try:
+                    await job
+                except QueueFullError as e:
+                    error = str(e)
+                    status = "rejected"
+                except OSError as e:
+                    error = str(e)
+
+        if error is not None:
+            await websocket.send_json({"type": "error", "message": error})
+            await websocket.close()
+            return status
+
+        return await _stream_run(websocket, run, job, input_data, language)
+
+
+async def _stream_run(websocket, run, job, input_data, language):
+    # -> request status for the metrics
+
+    if input_data.user_input:
+        run.write_input(input_data.user_input)
+    if not input_data.interactive:
+        run.close_input()
+
+    async def supervise():
+        status, rusage = await job
+        await run.finish(status, rusage)
+
+    async def receive():
+        while True:
             try:
-                stdout, stderr = process.communicate(
-                    input=user_input,
-                    timeout=5
-                )
-            except subprocess.TimeoutExpired:
-                process.kill()
-                return {
-                    "stdout": "",
-                    "stderr": "Execution timed out.",
-                    "execution_time": None,
-                    "memory_usage_kb": None,
-                    "runtime_hint": "Possible infinite loop"
-                }
-
-            end_time = time.time()
-            execution_time = round(end_time - start_time, 6)
-
-            # Safe memory usage
+                message = await websocket.receive_json()
+            except (WebSocketDisconnect, ValueError):
+                run.kill()
+                return
+
+            kind = message.get("type")
+
             try:
-                memory_usage = psutil.Process(process.pid).memory_info().rss // 1024
-            except:
-                memory_usage = 0
-
-            runtime_hint = (
-                "Very Fast" if execution_time < 0.05 else
-                "Fast" if execution_time < 0.2 else
-                "Moderate" if execution_time < 1 else
-                "Slow"
-            )
+                if kind == "stdin":
+                    run.write_input(str(message.get("data", "")))
+                elif kind == "eof":
+                    run.close_input()
+                elif kind == "kill":
+                    run.kill()
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "message": str(e)})
+                run.kill()
+
+    supervisor = asyncio.create_task(supervise())
+    receiver = asyncio.create_task(receive())
+    status = "disconnected"
+
+    try:
+        while True:
+            event = await run.next_event()
+            await websocket.send_json(event)
+            if event["type"] == "exit":
+                break
+
+        status = "ok"
+        if event["timed_out"]:
+            status = "timeout"
+            TIMEOUTS.inc("run_stream", metric_language(language), "execute")
+
+        await websocket.close()
 
-            return {
-                "stdout": stdout,
-                "stderr": stderr,
-                "execution_time": execution_time,
-                "memory_usage_kb": memory_usage,
-                "runtime_hint": runtime_hint
-            }
-
-    except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "execution_time": None,
-            "memory_usage_kb": None,
-            "runtime_hint": "Error"
-        }
+    except (WebSocketDisconnect, RuntimeError):
+        # Client went away mid-run
+        pass
+
+    finally:
+        receiver.cancel()
+        run.kill()
+        run.discard_output()
+        # Reaped before the working directory is removed
+        await asyncio.gather(supervisor, return_exceptions=True)
+
+    return status
+
+
+# ============================================================
+# BENCHMARK ENDPOINT
+# ============================================================
+# Runs 2+ candidate programs on the same input, interleaved, and
+# compares their CPU and wall time distributions (see runner.benchmark).
+# The whole benchmark holds one scheduler slot.
+
+MAX_BENCHMARK_CANDIDATES = 4
+MAX_BENCHMARK_RUNS = 50
+MAX_BENCHMARK_WARMUPS = 5
+
+BENCHMARK_BUDGET = float(os.environ.get("ALGOLENS_BENCHMARK_BUDGET", "60"))
+
+
+@app.post("/benchmark")
+@instrumented("benchmark")
+async def benchmark(input_data: BenchmarkInput):
+
+    if not 2 <= len(input_data.candidates) <= MAX_BENCHMARK_CANDIDATES:
+        return {"error": f"Provide between 2 and {MAX_BENCHMARK_CANDIDATES} candidates"}
+
+    runs = max(3, min(input_data.runs, MAX_BENCHMARK_RUNS))
+    warmups = max(0, min(input_data.warmups, MAX_BENCHMARK_WARMUPS))
+
+    try:
+        return await scheduler.submit(
+            run_benchmark,
+            input_data.language.lower(),
+            input_data.candidates,
+            input_data.user_input,
+            runs=runs,
+            warmups=warmups,
+            timeout=RUN_TIMEOUT,
+            compile_timeout=COMPILE_TIMEOUT,
+            cache=compile_cache,
+            python_pool=python_pool,
+            limits=sandbox_limits,
+            budget=BENCHMARK_BUDGET
+        )
+    except QueueFullError as e:
+        raise queue_full(e)
+
+
+@app.get("/run/stats")
+def run_stats():
+    return {**scheduler.stats(), "python_pool": python_pool.stats(), "java_pool": java_pool.stats()}
+
+
+@app.get("/run/cache")
+def run_cache_stats():
+    return compile_cache.stats()
@@ -0,0 +1,247 @@
+import math
+import subprocess
+import time
+from contextlib import ExitStack
+
+from runner.executor import prepare
+from runner.profiler import run_process
+from runner.sandbox import Limits
+
+
+# Compares candidate programs for the same input. Each candidate is
+# compiled once, then all candidates run in interleaved rounds (the order
+# rotates every round) so drift in machine load hits them all alike.
+# Runs are sequential on one scheduler slot: parallel runs would measure
+# each other. Python candidates share one reserved warm worker, so no
+# sample includes interpreter startup.
+
+SIGNIFICANCE = 0.05
+
+# Largest sample sizes for the exact Mann-Whitney distribution
+EXACT_LIMIT = 20
+
+
+# ============================================================
+# Statistics
+# ============================================================
+
+def percentile(sorted_values, fraction):
+    # Linear interpolation between closest ranks
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(values):
+    ordered = sorted(values)
+    count = len(ordered)
+    mean = sum(ordered) / count
+    variance = sum((value - mean) ** 2 for value in ordered) / (count - 1) if count > 1 else 0.0
+
+    return {
+        "min": round(ordered[0], 6),
+        "median": round(percentile(ordered, 0.5), 6),
+        "mean": round(mean, 6),
+        "p95": round(percentile(ordered, 0.95), 6),
+        "max": round(ordered[-1], 6),
+        "std": round(math.sqrt(variance), 6)
+    }
+
+
+def _ranks(values):
+    # Average ranks (1-based) with ties sharing the mean of their ranks,
+    # plus the sum of t^3 - t over tie groups for the variance correction
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    tie_term = 0
+    start = 0
+
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+
+        rank = (start + end) / 2 + 1
+        for index in order[start:end + 1]:
+            ranks[index] = rank
+
+        ties = end - start + 1
+        tie_term += ties ** 3 - ties
+        start = end + 1
+
+    return ranks, tie_term
+
+
+def _exact_p(u, m, n):
+    # Two-sided p-value from the exact null distribution of U, counted
+    # with the recurrence f(m, n, u) = f(m-1, n, u-n) + f(m, n-1, u)
+    max_u = m * n
+    counts = [[1] + [0] * max_u for _ in range(n + 1)]  # m = 0: only U = 0
+
+    for i in range(1, m + 1):
+        previous = counts
+        counts = [[1] + [0] * max_u]
+        for j in range(1, n + 1):
+            row = [0] * (max_u + 1)
+            for value in range(i * j + 1):
+                row[value] = counts[j - 1][value] + (previous[j][value - j] if value >= j else 0)
+            counts.append(row)
+
+    distribution = counts[n]
+    total = sum(distribution)
+    low = min(u, max_u - u)
+    tail = sum(distribution[:math.floor(low) + 1]) / total
+    return min(1.0, 2 * tail)
+
+
+def mann_whitney(a, b):
+    # -> (U statistic of `a`, two-sided p-value, method)
+    m, n = len(a), len(b)
+    ranks, tie_term = _ranks(list(a) + list(b))
+    u = sum(ranks[:m]) - m * (m + 1) / 2
+
+    if tie_term == 0 and m <= EXACT_LIMIT and n <= EXACT_LIMIT:
+        return u, _exact_p(u, m, n), "exact"
+
+    # Normal approximation with tie and continuity corrections
+    total = m + n
+    variance = m * n / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return u, 1.0, "normal"
+
+    z = (abs(u - m * n / 2) - 0.5) / math.sqrt(variance)
+    p_value = math.erfc(max(z, 0) / math.sqrt(2))
+    return u, min(1.0, p_value), "normal"
+
+
+def compare(index_a, samples_a, index_b, samples_b, metric):
+    u, p_value, method = mann_whitney(samples_a, samples_b)
+    median_a = percentile(sorted(samples_a), 0.5)
+    median_b = percentile(sorted(samples_b), 0.5)
+
+    if p_value >= SIGNIFICANCE:
+        verdict = "no significant difference"
+    else:
+        verdict = f"candidate {index_a if median_a < median_b else index_b} is faster"
+
+    return {
+        "a": index_a,
+        "b": index_b,
+        "metric": metric,
+        "median_ratio": round(median_b / median_a, 4) if median_a else None,
+        "u": u,
+        "p_value": round(p_value, 6),
+        "method": method,
+        "verdict": verdict
+    }
+
+
+# ============================================================
+# Runs
+# ============================================================
+
+def run_benchmark(language, candidates, user_input, runs=10, warmups=1, timeout=5, compile_timeout=10,
+                  cache=None, python_pool=None, limits=None, budget=None):
+
+    limits = (limits or Limits()).for_language(language)
+
+    try:
+        with ExitStack() as stack:
+
+            prepared = []
+            for index, code in enumerate(candidates):
+                command, cwd, error = stack.enter_context(prepare(language, code, compile_timeout, cache))
+                if error is not None:
+                    return {"error": f"Candidate {index} failed to build", "candidate": index, "stderr": error}
+                prepared.append((command, cwd))
+
+            run_once = _cold_runner(user_input, timeout, limits)
+            if language == "python" and python_pool is not None:
+                try:
+                    run_once = _warm_runner(stack.enter_context(python_pool.reserve()), user_input, timeout, limits)
+                except (OSError, RuntimeError):
+                    pass
+
+            return _measure(prepared, run_once, runs, warmups, budget)
+
+    except subprocess.TimeoutExpired:
+        return {"error": "Compilation timed out."}
+
+
+def _cold_runner(user_input, timeout, limits):
+    def run_once(command, cwd):
+        return run_process(command, user_input, cwd, timeout, limits=limits)
+    return run_once
+
+
+def _warm_runner(run, user_input, timeout, limits):
+    def run_once(command, cwd):
+        return run(command[-1], user_input, cwd, timeout, limits)
+    return run_once
+
+
+def _measure(prepared, run_once, runs, warmups, budget):
+    count = len(prepared)
+    wall_times = [[] for _ in prepared]
+    cpu_times = [[] for _ in prepared]
+    memory = [[] for _ in prepared]
+
+    start = time.monotonic()
+    completed = 0
+
+    for round_index in range(warmups + runs):
+        if budget is not None and completed >= 2 and time.monotonic() - start > budget:
+            break
+
+        for offset in range(count):
+            index = (round_index + offset) % count
+            command, cwd = prepared[index]
+            result = run_once(command, cwd)
+
+            if result is None:
+                return {"error": "Python worker failed", "candidate": index}
+            if result.timed_out:
+                return {"error": f"Candidate {index} timed out", "candidate": index}
+            if result.returncode != 0:
+                return {
+                    "error": f"Candidate {index} exited with code {result.returncode}",
+                    "candidate": index,
+                    "stderr": result.stderr
+                }
+
+            if round_index >= warmups:
+                wall_times[index].append(result.wall_time)
+                cpu_times[index].append(result.user_time + result.system_time)
+                memory[index].append(result.peak_rss_kb)
+
+        if round_index >= warmups:
+            completed += 1
+
+    comparisons = []
+    for a in range(count):
+        for b in range(a + 1, count):
+            comparisons.append(compare(a, cpu_times[a], b, cpu_times[b], "cpu_time"))
+            comparisons.append(compare(a, wall_times[a], b, wall_times[b], "wall_time"))
+
+    return {
+        "runs": completed,
+        "warmups": warmups,
+        "stopped_early": completed < runs,
+        "candidates": [
+            {
+                "index": index,
+                "wall_time": summarize(wall_times[index]),
+                "cpu_time": summarize(cpu_times[index]),
+                # Unknown for runs without a per-program peak (no launcher)
+                "memory_usage_kb": summarize(memory[index]) if None not in memory[index] else None,
+                "samples": {
+                    "wall_time": [round(value, 6) for value in wall_times[index]],
+                    "cpu_time": [round(value, 6) for value in cpu_times[index]]
+                }
+            }
+            for index in range(count)
+        ],
+        "comparisons": comparisons
+    }
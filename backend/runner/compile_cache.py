@@ -0,0 +1,295 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+STALE_BUILD_SECONDS = 3600
+
+
+class CompileCache:
+    # On-disk cache of compiled artifacts (binaries, .class files).
+    #
+    # Each entry is a directory named by the hash of language, compiler
+    # command and source. Entries are built in a scratch directory and
+    # renamed into place, so readers never see a half-written artifact.
+    # Entries are pinned while a job copies them out (see
+    # runner.executor.prepare) and skipped by eviction meanwhile.
+    #
+    # The directory is shared by every server process, each with its own
+    # index, so a job also holds a shared flock on its entry; eviction
+    # takes it exclusively, without waiting, and renames the entry away
+    # before deleting it. A hit on an entry another process evicted is
+    # rebuilt.
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> size in bytes (LRU order)
+        self._pins = {}                 # key -> number of jobs using it
+        self._build_locks = {}          # key -> lock held while compiling
+
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_existing()
+
+    # ---- Keys ----
+
+    @staticmethod
+    def make_key(language, flags, source):
+        digest = hashlib.sha256()
+        digest.update(language.encode())
+        digest.update(b"\0")
+        digest.update("\0".join(flags).encode())
+        digest.update(b"\0")
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    # ---- Public API ----
+
+    @contextmanager
+    def acquire(self, key, build):
+        # Yields (artifact_dir, error). `build(out_dir)` compiles into
+        # out_dir and returns an error string, or None on success.
+        path = self._path(key)
+
+        with self._lock:
+            hit = key in self._entries
+            if hit:
+                self._touch(key)
+
+        held = self._share(path) if hit else None
+
+        if held is None:
+            with self._lock:
+                if hit:
+                    self._forget(key)
+                build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+            with build_lock:
+                held, error = self._build(key, build)
+
+            if error is not None:
+                yield None, error
+                return
+
+        try:
+            yield path, None
+        finally:
+            os.close(held)
+            with self._lock:
+                self._unpin(key)
+                self._evict()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    # ---- Internals ----
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def _build(self, key, build):
+        # -> (fd holding the entry's shared lock, None) or (None, error)
+        path = self._path(key)
+
+        with self._lock:
+            # Another thread finished the same build while we waited
+            built = key in self._entries
+            if built:
+                self._touch(key)
+            else:
+                self.misses += 1
+
+        if built:
+            held = self._share(path)
+            if held is not None:
+                return held, None
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+
+        # Another worker process may already have built it, and may evict
+        # it again before it is locked
+        held = self._share(path)
+        while held is None:
+            scratch = tempfile.mkdtemp(prefix="build-", dir=self.root)
+
+            try:
+                error = build(scratch)
+            except Exception:
+                self._discard_build(key, scratch)
+                raise
+
+            if error is not None:
+                self._discard_build(key, scratch)
+                return None, error
+
+            try:
+                os.rename(scratch, path)
+            except OSError:
+                shutil.rmtree(scratch, ignore_errors=True)
+            held = self._share(path)
+
+        size = _dir_size(path)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = size
+                self.total_bytes += size
+            self._pin(key)
+            self._build_locks.pop(key, None)
+
+        return held, None
+
+    def _discard_build(self, key, scratch):
+        shutil.rmtree(scratch, ignore_errors=True)
+        with self._lock:
+            self._build_locks.pop(key, None)
+
+    @staticmethod
+    def _share(path):
+        # -> fd holding a shared lock on the entry, or None if it is gone
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            return None
+
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        # Evicted (renamed away) while we waited for the lock
+        try:
+            current = os.stat(path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(fd).st_ino:
+            os.close(fd)
+            return None
+        return fd
+
+    def _forget(self, key):
+        # Caller holds self._lock; the entry of a _touch() was evicted by
+        # another process, so that was no hit
+        self._unpin(key)
+        self.hits -= 1
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _touch(self, key):
+        # Caller holds self._lock
+        self._entries.move_to_end(key)
+        self._pin(key)
+        self.hits += 1
+
+        # Keep mtime in LRU order so a restart reloads the same order
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _pin(self, key):
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def _unpin(self, key):
+        count = self._pins.get(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+        else:
+            self._pins.pop(key, None)
+
+    def _evict(self):
+        # Caller holds self._lock
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key in self._pins:
+                continue
+
+            if not self._remove(key):
+                continue
+
+            size = self._entries.pop(key)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def _remove(self, key):
+        # -> False if a job of another process is copying the entry
+        path = self._path(key)
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            return True
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+
+        # Out of the way first, so no job finds it half deleted
+        trash = tempfile.mkdtemp(prefix="build-", dir=self.root)
+        try:
+            os.rename(path, trash)
+        except OSError:
+            trash = path
+        try:
+            shutil.rmtree(trash, ignore_errors=True)
+        finally:
+            os.close(fd)
+        return True
+
+    def _load_existing(self):
+        entries = []
+
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+
+            if name.startswith("build-"):
+                # Scratch dir left behind by a crashed build
+                if time.time() - os.path.getmtime(path) > STALE_BUILD_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+
+            if os.path.isdir(path):
+                entries.append((os.path.getmtime(path), name, _dir_size(path)))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self.total_bytes += size
+
+        self._evict()
+
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
@@ -0,0 +1,320 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+from runner.java_pool import CompileError
+from runner.profiler import run_process
+from runner.sandbox import LIMIT_EXIT_CODES, Limits
+
+
+# ============================================================
+# Compiled Languages
+# ============================================================
+# "compile" builds into {out}, "run" executes from the artifact dir.
+# The compile command is part of the cache key, so changing flags
+# here never serves a stale artifact.
+
+COMPILERS = {
+    "c": {
+        "source": "main.c",
+        "compile": ["gcc", "{source}", "-o", "{out}/main"],
+        "run": ["{out}/main"]
+    },
+    "cpp": {
+        "source": "main.cpp",
+        "compile": ["g++", "{source}", "-o", "{out}/main"],
+        "run": ["{out}/main"]
+    },
+    "java": {
+        "source": "Main.java",
+        "compile": ["javac", "-d", "{out}", "{source}"],
+        "run": ["java", "-cp", "{out}", "Main"]
+    }
+}
+
+
+def _format(command, **values):
+    return [part.format(**values) for part in command]
+
+
+def _compile(spec, source_path, out_dir, timeout):
+    compile_process = subprocess.run(
+        _format(spec["compile"], source=source_path, out=out_dir),
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+
+    if compile_process.returncode != 0:
+        return compile_process.stderr
+
+    return None
+
+
+# ============================================================
+# Preparing a job
+# ============================================================
+
+@contextmanager
+def prepare(language, code, compile_timeout=10, cache=None):
+    # Writes the source and compiles it if needed. Yields (command, cwd,
+    # error); the working directory and the job's copy of the artifact
+    # stay valid until the block exits. Raises subprocess.TimeoutExpired
+    # when the compiler times out.
+    with tempfile.TemporaryDirectory() as temp_dir:
+
+        # ====================================================
+        # PYTHON
+        # ====================================================
+        if language == "python":
+
+            file_path = os.path.join(temp_dir, "main.py")
+
+            with open(file_path, "w") as f:
+                f.write(code)
+
+            yield ["python", file_path], temp_dir, None
+            return
+
+        # ====================================================
+        # C / C++ / JAVA
+        # ====================================================
+        if language not in COMPILERS:
+            yield None, temp_dir, "Unsupported language"
+            return
+
+        spec = COMPILERS[language]
+
+        file_path = os.path.join(temp_dir, spec["source"])
+
+        with open(file_path, "w") as f:
+            f.write(code)
+
+        def build(out_dir):
+            return _compile(spec, file_path, out_dir, compile_timeout)
+
+        if cache is None:
+            error = build(temp_dir)
+            if error is not None:
+                yield None, temp_dir, error
+            else:
+                yield _format(spec["run"], out=temp_dir), temp_dir, None
+            return
+
+        key = cache.make_key(language, spec["compile"], code)
+
+        # The job runs a private copy: it can write to its own binary or
+        # class files, and must not change the build other jobs are served
+        run_dir = os.path.join(temp_dir, "build")
+        with cache.acquire(key, build) as (artifact_dir, error):
+            if error is None:
+                shutil.copytree(artifact_dir, run_dir)
+
+        if error is not None:
+            yield None, temp_dir, error
+        else:
+            yield _format(spec["run"], out=run_dir), temp_dir, None
+
+
+# Blocking execution of a single job. Called from the JobScheduler's
+# worker threads, never directly on the event loop.
+
+def execute(language, code, user_input, timeout=5, compile_timeout=10, cache=None, profile=False,
+            python_pool=None, limits=None, timings=None, line_profile=False, java_pool=None):
+    # timings: optional dict, filled with seconds spent in "compile"
+    # (writing the source and building it, or the cache lookup) and
+    # "execute". line_profile (Python only) adds the raw line profile
+    # summary as "line_profile", None if the program did not finish.
+    # A warm JVM compiles and runs in one step, timed as "execute".
+
+    limits = (limits or Limits()).for_language(language)
+    start = time.perf_counter()
+
+    try:
+        if language == "java" and java_pool is not None and not profile:
+            response = _execute_warm_java(java_pool, code, user_input, timeout, limits)
+            if response is not None:
+                if timings is not None:
+                    timings["compile"] = 0.0
+                    timings["execute"] = time.perf_counter() - start
+                return response
+
+        with prepare(language, code, compile_timeout, cache) as (command, cwd, error):
+            if timings is not None:
+                timings["compile"] = time.perf_counter() - start
+
+            if error is not None:
+                return {"stderr": error}
+
+            try:
+                if line_profile and language == "python":
+                    return _run_line_profile(command, user_input, cwd, timeout, limits)
+                return _execute(language, command, user_input, cwd, timeout, limits, profile, python_pool)
+            finally:
+                if timings is not None:
+                    timings["execute"] = time.perf_counter() - start - timings["compile"]
+
+    except subprocess.TimeoutExpired:
+        if timings is not None:
+            timings["compile"] = time.perf_counter() - start
+        return {
+            "stdout": "",
+            "stderr": "Compilation timed out.",
+            "execution_time": None,
+            "memory_usage_kb": None,
+            "runtime_hint": "Error",
+            "compile_timed_out": True
+        }
+
+    except Exception as e:
+        return {
+            "stdout": "",
+            "stderr": str(e),
+            "execution_time": None,
+            "memory_usage_kb": None,
+            "runtime_hint": "Error"
+        }
+
+
+# ============================================================
+# EXECUTION
+# ============================================================
+
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+
+def _execute(language, command, user_input, cwd, timeout, limits, profile, python_pool):
+
+    if language == "java":
+        return {**_run(command, user_input, cwd, timeout, limits, profile), "warm_start": False}
+
+    if language != "python":
+        return _run(command, user_input, cwd, timeout, limits, profile)
+
+    # Warm workers do not sample memory; profiled runs start cold
+    if python_pool is not None and not profile:
+        result = python_pool.run(command[-1], user_input, cwd, timeout, limits)
+        if result is not None:
+            return {**_response(result, profile), "warm_start": True}
+
+    response = _run(command, user_input, cwd, timeout, limits, profile)
+    return {**response, "warm_start": False}
+
+
+def _execute_warm_java(java_pool, code, user_input, timeout, limits):
+    # Compiles in the worker's JVM, so no javac process and no artifact
+    # cache; None when the job has to run cold. Warm workers do not
+    # sample memory either, so profiled runs start cold.
+    result = java_pool.run(code, user_input, timeout, limits)
+    if result is None:
+        return None
+    if isinstance(result, CompileError):
+        return {"stderr": result.stderr, "warm_start": True}
+    return {**_response(result), "warm_start": True}
+
+
+# ============================================================
+# LINE PROFILING (Python)
+# ============================================================
+# A cold run under runner/line_tracer.py, which writes one summary file
+# next to main.py when the program ends. The run keeps the normal
+# timeout; the tracer's budgets cap what profiling adds to it at about
+# LINE_PROFILE_ALLOC_SECONDS plus 0.5-1.3 s for LINE_PROFILE_MAX_EVENTS,
+# depending on the interpreter and machine (see line_tracer.py).
+
+LINE_TRACER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "line_tracer.py")
+LINE_PROFILE_MAX_EVENTS = 1000000
+LINE_PROFILE_ALLOC_SECONDS = 0.5
+MAX_LINE_PROFILE_BYTES = 4 * 1024 * 1024
+
+
+def _run_line_profile(command, user_input, cwd, timeout, limits):
+    summary_path = os.path.join(cwd, ".line_profile.json")
+    traced = [
+        command[0], LINE_TRACER, summary_path,
+        str(LINE_PROFILE_MAX_EVENTS), str(LINE_PROFILE_ALLOC_SECONDS), command[-1]
+    ]
+
+    response = _run(traced, user_input, cwd, timeout, limits)
+    response["line_profile"] = _read_line_profile(summary_path)
+    return {**response, "warm_start": False}
+
+
+def _read_line_profile(path):
+    # The program can write to its working directory, so the file is
+    # only trusted to be bounded JSON
+    try:
+        if os.path.getsize(path) > MAX_LINE_PROFILE_BYTES:
+            return None
+        with open(path) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return summary if isinstance(summary, dict) else None
+
+
+def _run(command, user_input, cwd, timeout, limits, profile=False):
+
+    result = run_process(
+        command,
+        user_input,
+        cwd,
+        timeout,
+        sample_interval=PROFILE_SAMPLE_INTERVAL if profile else None,
+        limits=limits
+    )
+
+    return _response(result, profile)
+
+
+def _response(result, profile=False):
+
+    if result.timed_out:
+        return {
+            "stdout": "",
+            "stderr": "Execution timed out.",
+            "execution_time": None,
+            "memory_usage_kb": None,
+            "runtime_hint": "Possible infinite loop",
+            "timed_out": True
+        }
+
+    execution_time = round(result.wall_time, 6)
+    cpu_time = result.user_time + result.system_time
+
+    runtime_hint = (
+        "Very Fast" if execution_time < 0.05 else
+        "Fast" if execution_time < 0.2 else
+        "Moderate" if execution_time < 1 else
+        "Slow"
+    )
+
+    # Killed by the kernel for exceeding a sandbox limit
+    stderr = result.stderr
+    limit_hit = LIMIT_EXIT_CODES.get(result.returncode)
+    if limit_hit is not None:
+        runtime_hint = limit_hit
+        stderr = f"{stderr}\n{limit_hit}." if stderr else f"{limit_hit}."
+
+    response = {
+        "stdout": result.stdout,
+        "stderr": stderr,
+        "exit_code": result.returncode,
+        "execution_time": execution_time,
+        "cpu_time": round(cpu_time, 6),
+        "cpu_user_time": round(result.user_time, 6),
+        "cpu_system_time": round(result.system_time, 6),
+        "memory_usage_kb": result.peak_rss_kb,
+        "output_truncated": result.output_truncated,
+        "runtime_hint": runtime_hint
+    }
+
+    if profile:
+        response["memory_samples"] = result.memory_samples
+
+    return response
@@ -0,0 +1,518 @@
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.EOFException;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.management.ManagementFactory;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.net.StandardProtocolFamily;
+import java.net.URI;
+import java.net.UnixDomainSocketAddress;
+import java.nio.channels.Channels;
+import java.nio.channels.ServerSocketChannel;
+import java.nio.channels.SocketChannel;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.Arrays;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import javax.tools.Diagnostic;
+import javax.tools.DiagnosticCollector;
+import javax.tools.FileObject;
+import javax.tools.ForwardingJavaFileManager;
+import javax.tools.JavaCompiler;
+import javax.tools.JavaFileObject;
+import javax.tools.SimpleJavaFileObject;
+import javax.tools.StandardJavaFileManager;
+import javax.tools.ToolProvider;
+
+
+// Warm JVM worker, started by runner.java_pool as
+//
+//   java -cp BUILD_DIR JavaWorker SOCKET_PATH
+//
+// It binds a Unix domain socket (JDK 16+), prints "ready" on stdout,
+// accepts the pool's single connection and then serves one job at a time
+// until the connection closes or a job leaves it unclean. Frames are
+// big-endian DataOutput values; a byte blob is an int length + bytes.
+//
+//   job:   source blob, stdin blob, long timeout_ms, int output_limit
+//   reply: byte kind (0 ran, 1 compile error), int exit_code,
+//          boolean timed_out, long wall_ns, long cpu_ns,
+//          long allocated_bytes, stdout blob, long stdout_dropped,
+//          stderr blob, long stderr_dropped, boolean recycle
+//
+// Main.java is compiled in memory through javax.tools with one shared
+// file manager, so the compiler's own classes and the platform class
+// index stay warm; compiled classes are cached by source. Every job
+// loads its classes into a fresh class loader, so static state never
+// leaks between jobs, and runs Main.main on its own thread (named "main",
+// like the launcher's) in its own thread group, with System.in/out/err
+// swapped for the job's buffers.
+//
+// cpu_ns is the whole JVM's CPU time over the job (JIT and GC included,
+// as for a cold `java Main`); allocated_bytes is the heap allocated by
+// the job's main thread, a total rather than a peak, so the pool does not
+// report it as the job's memory. System.exit would end the worker, so
+// the pool sends programs that visibly call it to a cold `java Main`.
+
+public final class JavaWorker {
+
+    // Compiled programs kept by source
+    static final int CACHED_PROGRAMS = 32;
+
+    static final byte RAN = 0;
+    static final byte COMPILE_ERROR = 1;
+
+    private final JavaCompiler compiler;
+    private final StandardJavaFileManager fileManager;
+    private final Map<String, Map<String, byte[]>> compiled =
+        new LinkedHashMap<String, Map<String, byte[]>>(16, 0.75f, true) {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<String, Map<String, byte[]>> eldest) {
+                return size() > CACHED_PROGRAMS;
+            }
+        };
+
+    private final InputStream stdin = System.in;
+    private final PrintStream stdout = System.out;
+    private final PrintStream stderr = System.err;
+
+    JavaWorker(JavaCompiler compiler) {
+        this.compiler = compiler;
+        this.fileManager = compiler.getStandardFileManager(null, null, StandardCharsets.UTF_8);
+    }
+
+    public static void main(String[] args) throws Exception {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            // A JRE without jdk.compiler
+            System.out.println("no compiler");
+            System.exit(1);
+        }
+        JavaWorker worker = new JavaWorker(compiler);
+
+        Path socketPath = Path.of(args[0]);
+        SocketChannel channel;
+        try (ServerSocketChannel server = ServerSocketChannel.open(StandardProtocolFamily.UNIX)) {
+            server.bind(UnixDomainSocketAddress.of(socketPath));
+            System.out.println("ready");
+            System.out.flush();
+            channel = server.accept();
+        }
+        Files.deleteIfExists(socketPath);
+
+        DataInputStream in = new DataInputStream(new BufferedInputStream(Channels.newInputStream(channel)));
+        DataOutputStream out = new DataOutputStream(new BufferedOutputStream(Channels.newOutputStream(channel)));
+
+        while (true) {
+            byte[] source;
+            try {
+                source = readBlob(in);
+            } catch (EOFException e) {
+                break;
+            }
+            byte[] input = readBlob(in);
+            long timeoutMs = in.readLong();
+            int outputLimit = in.readInt();
+
+            boolean recycle = worker.run(new String(source, StandardCharsets.UTF_8), input, timeoutMs, outputLimit, out);
+            out.flush();
+            if (recycle) {
+                break;
+            }
+        }
+
+        // Threads a job left behind must not keep the worker alive
+        Runtime.getRuntime().halt(0);
+    }
+
+    // ============================================================
+    // Compiling
+    // ============================================================
+
+    // -> class name -> bytes, or null with javac-style diagnostics in `errors`
+    Map<String, byte[]> compile(String source, StringBuilder errors) {
+        Map<String, byte[]> classes = compiled.get(source);
+        if (classes != null) {
+            return classes;
+        }
+
+        classes = new HashMap<>();
+        DiagnosticCollector<JavaFileObject> diagnostics = new DiagnosticCollector<>();
+        Boolean ok = compiler.getTask(
+            null,
+            new MemoryFileManager(fileManager, classes),
+            diagnostics,
+            List.of("-proc:none"),
+            null,
+            List.of(new SourceFile(source))
+        ).call();
+
+        if (!ok) {
+            formatDiagnostics(diagnostics.getDiagnostics(), source, errors);
+            return null;
+        }
+
+        compiled.put(source, classes);
+        return classes;
+    }
+
+    static void formatDiagnostics(List<Diagnostic<? extends JavaFileObject>> diagnostics, String source, StringBuilder errors) {
+        // Same layout as javac's command line output
+        String[] lines = source.split("\r?\n", -1);
+        int errorCount = 0;
+
+        for (Diagnostic<? extends JavaFileObject> diagnostic : diagnostics) {
+            String kind;
+            if (diagnostic.getKind() == Diagnostic.Kind.ERROR) {
+                kind = "error";
+                errorCount++;
+            } else if (diagnostic.getKind() == Diagnostic.Kind.NOTE) {
+                errors.append("Note: ").append(diagnostic.getMessage(null)).append('\n');
+                continue;
+            } else {
+                kind = "warning";
+            }
+
+            long line = diagnostic.getLineNumber();
+            if (line < 1 || line > lines.length) {
+                errors.append(kind).append(": ").append(diagnostic.getMessage(null)).append('\n');
+                continue;
+            }
+
+            String[] message = diagnostic.getMessage(null).split("\n", 2);
+            errors.append("Main.java:").append(line).append(": ").append(kind).append(": ").append(message[0]).append('\n');
+            errors.append(lines[(int) line - 1]).append('\n');
+            long column = Math.max(diagnostic.getColumnNumber(), 1);
+            errors.append(" ".repeat((int) column - 1)).append("^\n");
+            if (message.length > 1) {
+                errors.append(message[1]).append('\n');
+            }
+        }
+
+        errors.append(errorCount).append(errorCount == 1 ? " error\n" : " errors\n");
+    }
+
+    static final class SourceFile extends SimpleJavaFileObject {
+        private final String source;
+
+        SourceFile(String source) {
+            super(URI.create("string:///Main.java"), Kind.SOURCE);
+            this.source = source;
+        }
+
+        @Override
+        public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+            return source;
+        }
+    }
+
+    static final class MemoryFileManager extends ForwardingJavaFileManager<StandardJavaFileManager> {
+        // Class files go to `classes` instead of the disk. Never closed:
+        // that would close the shared file manager.
+        private final Map<String, byte[]> classes;
+
+        MemoryFileManager(StandardJavaFileManager fileManager, Map<String, byte[]> classes) {
+            super(fileManager);
+            this.classes = classes;
+        }
+
+        @Override
+        public JavaFileObject getJavaFileForOutput(Location location, String className,
+                                                   JavaFileObject.Kind kind, FileObject sibling) {
+            URI uri = URI.create("mem:///" + className.replace('.', '/') + kind.extension);
+            return new SimpleJavaFileObject(uri, kind) {
+                @Override
+                public OutputStream openOutputStream() {
+                    return new ByteArrayOutputStream() {
+                        @Override
+                        public void close() {
+                            classes.put(className, toByteArray());
+                        }
+                    };
+                }
+            };
+        }
+    }
+
+    static final class JobClassLoader extends ClassLoader {
+        private final Map<String, byte[]> classes;
+
+        JobClassLoader(Map<String, byte[]> classes) {
+            super("algolens-job", ClassLoader.getPlatformClassLoader());
+            this.classes = classes;
+        }
+
+        @Override
+        protected Class<?> findClass(String name) throws ClassNotFoundException {
+            byte[] bytes = classes.get(name);
+            if (bytes == null) {
+                throw new ClassNotFoundException(name);
+            }
+            return defineClass(name, bytes, 0, bytes.length);
+        }
+    }
+
+    // ============================================================
+    // Running
+    // ============================================================
+
+    // -> true if the worker has to be replaced after this job
+    boolean run(String source, byte[] input, long timeoutMs, int outputLimit, DataOutputStream out) throws IOException {
+        StringBuilder errors = new StringBuilder();
+        Map<String, byte[]> classes = compile(source, errors);
+
+        if (classes == null) {
+            byte[] diagnostics = errors.toString().getBytes(StandardCharsets.UTF_8);
+            BoundedStream kept = new BoundedStream(outputLimit);
+            kept.write(diagnostics, 0, diagnostics.length);
+            writeReply(out, COMPILE_ERROR, 1, false, 0, 0, 0, new BoundedStream(0), kept, false);
+            return false;
+        }
+
+        BoundedStream jobOut = new BoundedStream(outputLimit);
+        BoundedStream jobErr = new BoundedStream(outputLimit);
+        PrintStream printOut = new PrintStream(jobOut, false, StandardCharsets.UTF_8);
+        PrintStream printErr = new PrintStream(jobErr, true, StandardCharsets.UTF_8);
+
+        ThreadGroup group = new ThreadGroup("algolens-job");
+        Job job = new Job(new JobClassLoader(classes), printErr);
+        Thread main = new Thread(group, job, "main");
+        main.setContextClassLoader(job.loader);
+
+        // A program can start threads outside its group (by naming a parent
+        // group, or through an executor or timer), so every thread that is
+        // new after the job counts, not only the group's
+        Set<Thread> existing = new HashSet<>(Thread.getAllStackTraces().keySet());
+
+        System.setIn(new ByteArrayInputStream(input));
+        System.setOut(printOut);
+        System.setErr(printErr);
+
+        long cpuStart = processCpuTime();
+        long start = System.nanoTime();
+        long deadline = start + timeoutMs * 1_000_000L;
+        boolean finished;
+
+        try {
+            main.start();
+            // Like the JVM itself, a run ends when every non-daemon thread
+            // of the program has ended
+            finished = awaitThreads(group, deadline);
+        } catch (InterruptedException e) {
+            finished = false;
+        }
+
+        long wallNs = System.nanoTime() - start;
+        long cpuNs = processCpuTime() - cpuStart;
+
+        printOut.flush();
+        printErr.flush();
+        System.setIn(stdin);
+        System.setOut(stdout);
+        System.setErr(stderr);
+
+        // Threads still running, a timeout or a VM error all leave state
+        // behind that the next job must not see
+        boolean recycle = !finished || group.activeCount() > 0 || startedThreads(existing) || job.fatal;
+
+        writeReply(out, RAN, job.exitCode, !finished, wallNs, cpuNs, job.allocatedBytes,
+                   jobOut, jobErr, recycle);
+        return recycle;
+    }
+
+    static boolean awaitThreads(ThreadGroup group, long deadline) throws InterruptedException {
+        while (true) {
+            Thread[] threads = new Thread[group.activeCount() + 8];
+            int count = group.enumerate(threads, true);
+
+            Thread waiting = null;
+            for (Thread thread : Arrays.copyOf(threads, count)) {
+                if (thread.isAlive() && !thread.isDaemon()) {
+                    waiting = thread;
+                    break;
+                }
+            }
+            if (waiting == null) {
+                return true;
+            }
+
+            long remaining = deadline - System.nanoTime();
+            if (remaining <= 0) {
+                return false;
+            }
+            waiting.join(Math.max(remaining / 1_000_000L, 1));
+        }
+    }
+
+    static boolean startedThreads(Set<Thread> existing) {
+        for (Thread thread : Thread.getAllStackTraces().keySet()) {
+            if (thread.isAlive() && !existing.contains(thread)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    static long processCpuTime() {
+        java.lang.management.OperatingSystemMXBean os = ManagementFactory.getOperatingSystemMXBean();
+        if (os instanceof com.sun.management.OperatingSystemMXBean) {
+            return ((com.sun.management.OperatingSystemMXBean) os).getProcessCpuTime();
+        }
+        return 0;
+    }
+
+    static final class Job implements Runnable {
+        final JobClassLoader loader;
+        final PrintStream err;
+        volatile int exitCode;
+        volatile long allocatedBytes;
+        volatile boolean fatal;
+
+        Job(JobClassLoader loader, PrintStream err) {
+            this.loader = loader;
+            this.err = err;
+        }
+
+        @Override
+        public void run() {
+            try {
+                Class<?> mainClass;
+                try {
+                    mainClass = Class.forName("Main", true, loader);
+                } catch (ClassNotFoundException e) {
+                    err.println("Error: Could not find or load main class Main");
+                    err.println("Caused by: java.lang.ClassNotFoundException: Main");
+                    exitCode = 1;
+                    return;
+                }
+
+                Method main;
+                try {
+                    main = mainClass.getMethod("main", String[].class);
+                } catch (NoSuchMethodException e) {
+                    main = null;
+                }
+                if (main == null || !Modifier.isStatic(main.getModifiers())) {
+                    err.println("Error: Main method not found in class Main, please define the main method as:");
+                    err.println("   public static void main(String[] args)");
+                    exitCode = 1;
+                    return;
+                }
+
+                // The launcher also runs a Main that is not public
+                main.setAccessible(true);
+                main.invoke(null, (Object) new String[0]);
+            } catch (InvocationTargetException e) {
+                uncaught(e.getCause());
+            } catch (Throwable e) {
+                // ExceptionInInitializerError from Main's static init and
+                // the like
+                uncaught(e);
+            } finally {
+                allocatedBytes = currentThreadAllocatedBytes();
+            }
+        }
+
+        private void uncaught(Throwable e) {
+            // Same report as the launcher's, without the reflection frames
+            // between the worker and Main.main
+            StackTraceElement[] trace = e.getStackTrace();
+            int end = trace.length;
+            for (int i = 0; i < trace.length; i++) {
+                String className = trace[i].getClassName();
+                if (className.startsWith("jdk.internal.reflect.") || className.startsWith("java.lang.reflect.")) {
+                    end = i;
+                    break;
+                }
+            }
+            e.setStackTrace(Arrays.copyOf(trace, end));
+
+            err.print("Exception in thread \"main\" ");
+            e.printStackTrace(err);
+            exitCode = 1;
+            fatal = e instanceof VirtualMachineError;
+        }
+    }
+
+    static long currentThreadAllocatedBytes() {
+        java.lang.management.ThreadMXBean threads = ManagementFactory.getThreadMXBean();
+        if (threads instanceof com.sun.management.ThreadMXBean) {
+            return ((com.sun.management.ThreadMXBean) threads).getCurrentThreadAllocatedBytes();
+        }
+        return 0;
+    }
+
+    // ============================================================
+    // Bounded output and framing
+    // ============================================================
+
+    static final class BoundedStream extends OutputStream {
+        // Keeps the first `limit` bytes and counts the rest, like the
+        // Python side's OutputBuffer
+        private final int limit;
+        private final ByteArrayOutputStream kept = new ByteArrayOutputStream();
+        private long dropped;
+
+        BoundedStream(int limit) {
+            this.limit = limit;
+        }
+
+        @Override
+        public synchronized void write(int b) {
+            if (kept.size() < limit) {
+                kept.write(b);
+            } else {
+                dropped++;
+            }
+        }
+
+        @Override
+        public synchronized void write(byte[] b, int off, int len) {
+            int room = Math.max(limit - kept.size(), 0);
+            int n = Math.min(room, len);
+            kept.write(b, off, n);
+            dropped += len - n;
+        }
+
+        synchronized void writeTo(DataOutputStream out) throws IOException {
+            out.writeInt(kept.size());
+            kept.writeTo(out);
+            out.writeLong(dropped);
+        }
+    }
+
+    static byte[] readBlob(DataInputStream in) throws IOException {
+        byte[] blob = new byte[in.readInt()];
+        in.readFully(blob);
+        return blob;
+    }
+
+    static void writeReply(DataOutputStream out, byte kind, int exitCode, boolean timedOut,
+                           long wallNs, long cpuNs, long allocatedBytes, BoundedStream jobOut,
+                           BoundedStream jobErr, boolean recycle) throws IOException {
+        out.writeByte(kind);
+        out.writeInt(exitCode);
+        out.writeBoolean(timedOut);
+        out.writeLong(wallNs);
+        out.writeLong(cpuNs);
+        out.writeLong(allocatedBytes);
+        jobOut.writeTo(out);
+        jobErr.writeTo(out);
+        out.writeBoolean(recycle);
+    }
+}
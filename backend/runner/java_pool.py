@@ -0,0 +1,275 @@
+import hashlib
+import math
+import os
+import re
+import shutil
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
+
+from runner.profiler import ProcessResult
+from runner.sandbox import Limits, OutputBuffer
+from runner.worker_pool import RESPONSE_GRACE, WorkerPool
+
+
+# Java source of the worker, built with javac when the pool first starts
+WORKER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "java", "JavaWorker.java")
+
+# Fewer JVM threads and no perf data files; the JIT is left at its
+# defaults so warm runs are timed like cold `java Main` ones. The heap is
+# capped at the sandbox memory limit, like a cold run's (see
+# Limits.for_language).
+JVM_OPTIONS = ["-XX:+UseSerialGC", "-XX:-UsePerfData"]
+
+# Programs that visibly end, hold on to or step outside the worker's JVM
+# (starting processes) run cold. This is a textual screen, not a
+# guarantee: an exit it misses (through reflection, say) kills the worker
+# mid-job, and the job fails like any other job whose worker died.
+COLD_ONLY = re.compile(r"\bSystem\s*\.\s*exit\b|\bRuntime\b|\bhalt\s*\(|\bProcessBuilder\b")
+
+# See JavaWorker.java for the frame layout
+REPLY_HEADER = struct.Struct(">bi?qqq")
+BLOB_LENGTH = struct.Struct(">i")
+DROPPED = struct.Struct(">q")
+
+COMPILE_ERROR = 1
+
+
+class CompileError:
+    # A warm worker's javac diagnostics for the job's source
+    __slots__ = ("stderr",)
+
+    def __init__(self, stderr):
+        self.stderr = stderr
+
+
+def _blob(data):
+    return BLOB_LENGTH.pack(len(data)) + data
+
+
+def _read_exact(reader, size):
+    data = reader.read(size)
+    if len(data) != size:
+        raise EOFError
+    return data
+
+
+def _read_output(reader):
+    size, = BLOB_LENGTH.unpack(_read_exact(reader, BLOB_LENGTH.size))
+    kept = _read_exact(reader, size)
+    dropped, = DROPPED.unpack(_read_exact(reader, DROPPED.size))
+
+    buffer = OutputBuffer(size)
+    buffer.write(kept)
+    buffer.dropped = dropped
+    return buffer
+
+
+def read_reply(reader):
+    kind, exit_code, timed_out, wall_ns, cpu_ns, allocated = REPLY_HEADER.unpack(
+        _read_exact(reader, REPLY_HEADER.size)
+    )
+    stdout = _read_output(reader)
+    stderr = _read_output(reader)
+    recycle = _read_exact(reader, 1) != b"\0"
+
+    return {
+        "kind": kind,
+        "exit_code": exit_code,
+        "timed_out": timed_out,
+        "wall_time": wall_ns / 1e9,
+        "cpu_time": cpu_ns / 1e9,
+        "allocated_bytes": allocated,
+        "stdout": stdout.text(),
+        "stderr": stderr.text(),
+        "output_truncated": stdout.truncated or stderr.truncated,
+        "recycle": recycle
+    }
+
+
+class JavaWorker:
+    # One warm JVM running runner/java/JavaWorker.java, reached over a
+    # Unix socket in a private directory that is also the programs'
+    # working directory
+
+    def __init__(self, java, class_dir, limits):
+        self.directory = tempfile.mkdtemp(prefix="algolens-jvm-")
+        socket_path = os.path.join(self.directory, "worker.sock")
+
+        self.process = subprocess.Popen(
+            limits.command([java, *JVM_OPTIONS, "-cp", class_dir, "JavaWorker", socket_path]),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.directory,
+            start_new_session=True,
+            preexec_fn=limits.preexec(None)
+        )
+        self.jobs = 0
+        self.healthy = True
+        self.stalled = False
+        self.channel = None
+        self.reader = None
+
+        # Blocks until the JVM is up and listening, so an idle worker is warm
+        if self.process.stdout.readline() != b"ready\n":
+            self.close()
+            raise RuntimeError("JVM worker failed to start")
+
+        try:
+            self.channel = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.channel.connect(socket_path)
+        except OSError:
+            self.close()
+            raise
+        self.reader = self.channel.makefile("rb")
+
+    def run(self, code, user_input, timeout, output_limit):
+        # -> the worker's reply, or None if it died or stopped answering
+        self.jobs += 1
+
+        timer = threading.Timer(timeout + RESPONSE_GRACE, self.stall)
+        timer.start()
+
+        try:
+            self.channel.sendall(
+                _blob(code.encode())
+                + _blob((user_input or "").encode())
+                + struct.pack(">qi", int(timeout * 1000), output_limit)
+            )
+            reply = read_reply(self.reader)
+        except (OSError, EOFError, struct.error):
+            reply = None
+        finally:
+            timer.cancel()
+
+        if reply is None or reply["recycle"]:
+            self.healthy = False
+        return reply
+
+    def stall(self):
+        self.stalled = True
+        self.kill()
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        self.kill()
+        self.process.wait()
+        self.process.stdout.close()
+        if self.reader is not None:
+            self.reader.close()
+        if self.channel is not None:
+            self.channel.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class JavaWorkerPool(WorkerPool):
+    # Pre-started JVMs that compile Main.java in-process and run each job
+    # in its own class loader; a miss falls back to javac + `java Main`.
+    # The worker is built with javac once per version of its source, into
+    # `build_dir`. Without a JDK every job simply runs cold.
+
+    def __init__(self, size, max_jobs=50, java="java", javac="javac", build_dir=None, limits=None,
+                 job_time=15):
+        super().__init__(size, max_jobs)
+        self.java = java
+        self.javac = javac
+        self.build_dir = build_dir or os.path.join(tempfile.gettempdir(), "algolens-java-worker")
+
+        # The sandbox limits apply to the whole JVM, as to a cold one, with
+        # the CPU limit covering every job the worker may take: `job_time`
+        # seconds each, for compiling and running. The job timeout itself
+        # is enforced by the worker. A job that runs out of heap gets
+        # OutOfMemoryError and retires its worker.
+        limits = (limits or Limits()).for_language("java")
+        self.limits = Limits(
+            limits.address_space,
+            (limits.cpu_time or math.ceil(job_time) + 1) * max_jobs,
+            limits.processes,
+            limits.file_size,
+            limits.output,
+            heap=limits.heap
+        )
+
+        self._build_lock = threading.Lock()
+        self._class_dir = None
+        self._build_error = None
+
+    def run(self, code, user_input, timeout, limits):
+        # -> ProcessResult, CompileError, or None for a cold start
+        if COLD_ONLY.search(code):
+            with self._lock:
+                self.cold_starts += 1
+            return None
+
+        return super().run(code, user_input, timeout, limits.output)
+
+    def _new_worker(self):
+        return JavaWorker(self.java, self._build(), self.limits)
+
+    def _build(self):
+        with self._build_lock:
+            if self._build_error is not None:
+                raise self._build_error
+            if self._class_dir is not None:
+                return self._class_dir
+
+            with open(WORKER_SOURCE, "rb") as f:
+                version = hashlib.sha256(f.read()).hexdigest()[:16]
+            class_dir = os.path.join(self.build_dir, version)
+
+            if not os.path.exists(os.path.join(class_dir, "JavaWorker.class")):
+                try:
+                    self._compile_worker(class_dir)
+                except (OSError, subprocess.SubprocessError) as e:
+                    # No JDK (or a JRE only): stop trying on every refill
+                    self._build_error = RuntimeError(f"cannot build the JVM worker: {e}")
+                    raise self._build_error
+
+            self._class_dir = class_dir
+            return class_dir
+
+    def _compile_worker(self, class_dir):
+        # Into a fresh directory renamed into place, so a concurrent
+        # server process never sees a half-written build
+        os.makedirs(self.build_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.build_dir)
+        try:
+            subprocess.run(
+                [self.javac, "-d", staging, WORKER_SOURCE],
+                capture_output=True,
+                check=True,
+                timeout=120
+            )
+            os.replace(staging, class_dir)
+        except OSError:
+            if not os.path.exists(os.path.join(class_dir, "JavaWorker.class")):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _result(self, reply):
+        if reply["kind"] == COMPILE_ERROR:
+            return CompileError(reply["stderr"])
+
+        result = ProcessResult()
+        result.stdout = reply["stdout"]
+        result.stderr = reply["stderr"]
+        result.returncode = reply["exit_code"]
+        result.timed_out = reply["timed_out"]
+        result.wall_time = reply["wall_time"]
+        # The JVM reports one CPU total, not a user/system split
+        result.user_time = reply["cpu_time"]
+        result.system_time = 0.0
+        # The worker's resident size is shared by every job and what the
+        # job allocated is not what it held, so peak memory is unknown
+        result.peak_rss_kb = None
+        result.output_truncated = reply["output_truncated"]
+        return result
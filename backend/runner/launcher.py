@@ -0,0 +1,127 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+
+# C source of the exec launcher, built with the C compiler on first use
+LAUNCHER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "native", "launcher.c")
+
+
+# ============================================================
+# Per-job peak memory
+# ============================================================
+# A child forked from the server reports the server's resident size as
+# its ru_maxrss, however little the program itself uses: the kernel
+# carries the pre-exec memory's high-water mark across execve. Jobs are
+# therefore started through a small launcher that forks the program and
+# reports the program's own ru_maxrss back over a pipe (see launcher.c).
+#
+# Without a C compiler, jobs run directly and their peak memory is
+# reported as unknown (None) rather than as the server's.
+
+class Launcher:
+    __slots__ = ("cc", "build_dir", "_lock", "_path", "_error")
+
+    def __init__(self, cc="cc", build_dir=None):
+        self.cc = cc
+        self.build_dir = build_dir or os.path.join(tempfile.gettempdir(), "algolens-launcher")
+        self._lock = threading.Lock()
+        self._path = None
+        self._error = None
+
+    def path(self):
+        # -> the built launcher, or None when it cannot be built
+        with self._lock:
+            if self._path is None and self._error is None:
+                try:
+                    self._path = self._build()
+                except (OSError, subprocess.SubprocessError) as e:
+                    # Do not retry on every job
+                    self._error = e
+            return self._path
+
+    def launch(self, command):
+        return Launch(command, self.path())
+
+    def _build(self):
+        with open(LAUNCHER_SOURCE, "rb") as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:16]
+        path = os.path.join(self.build_dir, version, "launcher")
+        if os.path.exists(path):
+            return path
+
+        # Into a fresh directory renamed into place, so a concurrent
+        # server process never sees a half-written build
+        os.makedirs(self.build_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.build_dir)
+        try:
+            subprocess.run(
+                [self.cc, "-O2", "-o", os.path.join(staging, "launcher"), LAUNCHER_SOURCE],
+                capture_output=True,
+                check=True,
+                timeout=60
+            )
+            os.replace(staging, os.path.dirname(path))
+        except OSError:
+            if not os.path.exists(path):
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return path
+
+
+class Launch:
+    # One command started through the launcher: pass `argv` and
+    # `pass_fds` to Popen, call started() once it returns (or close() if
+    # it raised) and maxrss() after the job has exited
+    __slots__ = ("argv", "pass_fds", "launched", "_reader")
+
+    def __init__(self, command, launcher_path):
+        self.launched = launcher_path is not None
+        if not self.launched:
+            self.argv = command
+            self.pass_fds = ()
+            self._reader = None
+            return
+
+        self._reader, writer = os.pipe()
+        self.argv = [launcher_path, str(writer), *command]
+        self.pass_fds = (writer,)
+
+    def started(self):
+        # The launcher holds the write end now
+        for fd in self.pass_fds:
+            os.close(fd)
+        self.pass_fds = ()
+
+    def maxrss(self):
+        # The program's ru_maxrss; None without the launcher, or when it
+        # was killed (timeout) before the program exited
+        if self._reader is None:
+            return None
+
+        with os.fdopen(self._reader) as f:
+            report = f.read().strip()
+        self._reader = None
+        return int(report) if report else None
+
+    def program(self, process):
+        # psutil.Process of the program itself: the launcher's child, None
+        # before it has been forked or after it has exited
+        if not self.launched:
+            return process
+        children = process.children()
+        return children[0] if children else None
+
+    def close(self):
+        self.started()
+        if self._reader is not None:
+            os.close(self._reader)
+            self._reader = None
+
+
+launcher = Launcher()
@@ -0,0 +1,322 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+import traceback
+import types
+
+
+# Line profiler for one Python program, run by the executor as
+#
+#   python line_tracer.py SUMMARY_PATH MAX_EVENTS ALLOC_SECONDS main.py
+#
+# It runs main.py the way `python main.py` would (fresh __main__, same
+# argv, sys.path[0] and exit status) while counting hits and time per
+# line of main.py, and tracemalloc allocation sites on those lines. The
+# totals are kept in the child and written to SUMMARY_PATH once, as one
+# small JSON document, when the program ends:
+#
+#   {"mode": ..., "complete": bool, "events": n, "elapsed_ns": ...,
+#    "lines": [[line, hits, ns], ...],
+#    "allocations": [[line, bytes, blocks], ...], "peak_alloc": bytes,
+#    "allocations_complete": bool}
+#
+# Time per line is self time: while one of the program's own functions
+# runs, its lines are charged, not the line that called it. Calls into
+# the standard library and builtins stay with the calling line. Allocation sites are what is still allocated when
+# allocation tracing stops (program end at the latest), by the line that
+# allocated it.
+#
+# Overhead budget. On 3.12+ sys.monitoring delivers events only for the
+# program's own code objects; older interpreters fall back to
+# sys.settrace. Per line event, measured on one machine (a slower one
+# scales these up, to about 1.2 us on 3.11 on some):
+#
+#   sys.monitoring (3.12, 3.13)   0.45-0.6 us
+#   sys.settrace (3.11)           0.45-0.65 us
+#   sys.settrace (3.8-3.10)       0.65-1.25 us
+#
+# the upper end for lines that call the program's own functions, whose
+# call and return events are handled too. Line tracing stops after
+# MAX_EVENTS line events. tracemalloc is the expensive part (3-5x
+# on allocation-heavy loops), so it only runs for the first
+# ALLOC_SECONDS. Past either budget the rest of the program runs at full
+# speed and the summary marks that part as incomplete, so profiling adds
+# at most about ALLOC_SECONDS plus MAX_EVENTS line events to any run.
+#
+# Standard library only: this runs as a plain script from the job's
+# working directory.
+
+# Budgets are checked every this many line events
+CHECK_EVERY = 1024
+
+
+class Profile:
+    __slots__ = ("filename", "max_events", "alloc_deadline", "hits", "times", "events", "complete",
+                 "allocations", "peak_alloc", "allocations_complete", "stop_tracing")
+
+    def __init__(self, filename, max_events, alloc_seconds):
+        self.filename = filename
+        self.max_events = max_events
+        self.alloc_deadline = time.perf_counter_ns() + int(alloc_seconds * 1e9)
+
+        self.hits = {}
+        self.times = {}
+        self.events = 0
+        self.complete = True
+
+        self.allocations = []
+        self.peak_alloc = 0
+        self.allocations_complete = True
+
+        self.stop_tracing = None
+
+    def start(self, code):
+        tracemalloc.start(1)
+        tracer = trace_with_monitoring if hasattr(sys, "monitoring") else trace_with_settrace
+        return tracer(code, self)
+
+    def check_budget(self, now):
+        # -> False once line tracing has to stop
+        if tracemalloc.is_tracing() and now >= self.alloc_deadline:
+            self.allocations_complete = False
+            self.freeze_allocations()
+
+        if self.events >= self.max_events:
+            self.complete = False
+            self.stop()
+            return False
+
+        return True
+
+    def stop(self):
+        self.stop_tracing()
+        self.freeze_allocations()
+
+    def freeze_allocations(self):
+        # Take the per-line totals now and stop paying for tracemalloc
+        if not tracemalloc.is_tracing():
+            return
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, self.filename)])
+        self.peak_alloc = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.allocations = [
+            [stat.traceback[0].lineno, stat.size, stat.count]
+            for stat in snapshot.statistics("lineno")
+            if stat.traceback[0].lineno > 0
+        ]
+
+    def to_dict(self, mode, elapsed):
+        return {
+            "mode": mode,
+            "complete": self.complete,
+            "events": self.events,
+            "elapsed_ns": elapsed,
+            "lines": [[line, hits, self.times.get(line, 0)] for line, hits in sorted(self.hits.items())],
+            "allocations": self.allocations,
+            "peak_alloc": self.peak_alloc,
+            "allocations_complete": self.allocations_complete
+        }
+
+
+# ============================================================
+# Tracers
+# ============================================================
+
+class FrameStack:
+    # [current line, since] per active frame of main.py. Starting a
+    # frame pauses its caller's line and ending it resumes that line, so
+    # each line is charged its self time.
+    __slots__ = ("profile", "frames")
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.frames = []
+
+    def _charge(self, frame, now):
+        line = frame[0]
+        if line:
+            times = self.profile.times
+            times[line] = times.get(line, 0) + now - frame[1]
+        frame[1] = now
+
+    def push(self, now):
+        if self.frames:
+            self._charge(self.frames[-1], now)
+        self.frames.append([0, now])
+
+    def pop(self, now):
+        if self.frames:
+            self._charge(self.frames.pop(), now)
+            if self.frames:
+                self.frames[-1][1] = now
+
+    def line(self, line, now):
+        if self.frames:
+            frame = self.frames[-1]
+            self._charge(frame, now)
+            frame[0] = line
+
+        hits = self.profile.hits
+        hits[line] = hits.get(line, 0) + 1
+        self.profile.events += 1
+
+
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_objects(const)
+
+
+def trace_with_monitoring(code, profile):
+    # 3.12+: LINE and start/end events enabled only on main.py's code
+    # objects, so calls into the standard library cost nothing
+    monitoring = sys.monitoring
+    events = monitoring.events
+    tool = monitoring.PROFILER_ID
+    clock = time.perf_counter_ns
+    frames = FrameStack(profile)
+    codes = set(_code_objects(code))
+
+    def on_start(code, offset):
+        frames.push(clock())
+
+    def on_line(code, line):
+        now = clock()
+        frames.line(line, now)
+        if profile.events % CHECK_EVERY == 0:
+            profile.check_budget(now)
+
+    def on_end(code, offset, value):
+        frames.pop(clock())
+
+    def on_unwind(code, offset, exception):
+        # Global event: fires for every frame an exception leaves
+        if code in codes:
+            frames.pop(clock())
+
+    def stop():
+        monitoring.set_events(tool, 0)
+        for code_object in codes:
+            monitoring.set_local_events(tool, code_object, 0)
+
+    monitoring.use_tool_id(tool, "algolens")
+    for event, callback in (
+        (events.PY_START, on_start),
+        (events.PY_RESUME, on_start),
+        (events.PY_RETURN, on_end),
+        (events.PY_YIELD, on_end),
+        (events.LINE, on_line),
+        (events.PY_UNWIND, on_unwind)
+    ):
+        monitoring.register_callback(tool, event, callback)
+
+    local_events = events.PY_START | events.PY_RESUME | events.PY_RETURN | events.PY_YIELD | events.LINE
+    for code_object in codes:
+        monitoring.set_local_events(tool, code_object, local_events)
+    monitoring.set_events(tool, events.PY_UNWIND)
+
+    profile.stop_tracing = stop
+    return "sys.monitoring"
+
+
+def trace_with_settrace(code, profile):
+    # Fallback: a global trace function that only returns a local tracer
+    # for frames of main.py. Generators get "return" on every yield and
+    # "call" on every resume, like PY_YIELD / PY_RESUME above.
+    filename = profile.filename
+    clock = time.perf_counter_ns
+    frames = FrameStack(profile)
+    tracing = [True]
+
+    def global_trace(frame, event, arg):
+        if frame.f_code.co_filename != filename or not tracing[0]:
+            return None
+        frames.push(clock())
+        return local_trace
+
+    def local_trace(frame, event, arg):
+        if not tracing[0]:
+            return None
+
+        now = clock()
+        if event == "line":
+            frames.line(frame.f_lineno, now)
+            if profile.events % CHECK_EVERY == 0 and not profile.check_budget(now):
+                return None
+        elif event == "return":
+            frames.pop(now)
+
+        return local_trace
+
+    def stop():
+        tracing[0] = False
+        sys.settrace(None)
+
+    sys.settrace(global_trace)
+    profile.stop_tracing = stop
+    return "sys.settrace"
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+def _exit_status(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code & 0xFF
+    print(code, file=sys.stderr)
+    return 1
+
+
+def main():
+    summary_path, max_events, alloc_seconds = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+    path = os.path.abspath(sys.argv[4])
+
+    sys.argv = sys.argv[4:]
+    sys.path[0] = os.path.dirname(path)
+
+    module = types.ModuleType("__main__")
+    module.__file__ = path
+    module.__builtins__ = __builtins__
+    sys.modules["__main__"] = module
+
+    try:
+        with open(path, "rb") as f:
+            code = compile(f.read(), path, "exec")
+    except SyntaxError as e:
+        traceback.print_exception(type(e), e, None)
+        sys.exit(1)
+
+    profile = Profile(path, max_events, alloc_seconds)
+    mode = profile.start(code)
+    status = 0
+    start = time.perf_counter_ns()
+
+    try:
+        exec(code, module.__dict__)
+    except SystemExit as e:
+        status = _exit_status(e.code)
+    except BaseException as e:
+        # Drop this frame so the traceback starts at the user's module
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        status = 1
+
+    elapsed = time.perf_counter_ns() - start
+    if profile.complete:
+        profile.stop()
+
+    with open(summary_path, "w") as f:
+        json.dump(profile.to_dict(mode, elapsed), f, separators=(",", ":"))
+
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+/*
+ * Exec launcher for sandboxed jobs:
+ *
+ *   launcher REPORT_FD COMMAND [ARGS...]
+ *
+ * Forks COMMAND, waits for it, writes its ru_maxrss to REPORT_FD and
+ * exits the way it did (same exit code, or the same signal re-raised).
+ *
+ * A process forked from the server and then exec'd reports the server's
+ * resident size as its peak: the kernel keeps the pre-exec memory's
+ * high-water mark in ru_maxrss. COMMAND is forked from this program
+ * instead, which is a few hundred KB.
+ */
+
+#include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+int main(int argc, char **argv) {
+    if (argc < 3) {
+        fprintf(stderr, "usage: launcher REPORT_FD COMMAND [ARGS...]\n");
+        return 126;
+    }
+
+    int report = atoi(argv[1]);
+    fcntl(report, F_SETFD, FD_CLOEXEC);
+
+    pid_t pid = fork();
+    if (pid < 0) {
+        perror("fork");
+        return 126;
+    }
+    if (pid == 0) {
+        execvp(argv[2], argv + 2);
+        fprintf(stderr, "%s: %s\n", argv[2], strerror(errno));
+        _exit(errno == ENOENT ? 127 : 126);
+    }
+
+    int status;
+    struct rusage usage;
+    while (wait4(pid, &status, 0, &usage) < 0) {
+        if (errno != EINTR) {
+            return 126;
+        }
+    }
+
+    dprintf(report, "%ld\n", usage.ru_maxrss);
+    close(report);
+
+    if (WIFEXITED(status)) {
+        return WEXITSTATUS(status);
+    }
+
+    /* Die of the same signal, without a core file of the launcher */
+    struct rlimit no_core = {0, 0};
+    setrlimit(RLIMIT_CORE, &no_core);
+    signal(WTERMSIG(status), SIG_DFL);
+    raise(WTERMSIG(status));
+    return 128 + WTERMSIG(status);
+}
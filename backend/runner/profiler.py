@@ -0,0 +1,187 @@
+import os
+import subprocess
+import threading
+import time
+
+from runner.launcher import launcher
+from runner.sandbox import DRAIN_GRACE, OutputBuffer, kill_group, kill_session, pipe_ids
+
+
+# Runs a child process and measures it from the kernel's point of view:
+# user/system CPU time come from wait4()'s rusage, peak RSS from the
+# program's own rusage as reported by the launcher (runner/launcher.py;
+# None without it), wall time from the monotonic clock. Optionally a
+# background thread samples RSS while the child is alive to build a
+# memory-over-time series.
+#
+# The child leads its own process group; on timeout, and once it has
+# exited, the whole group is killed so nothing it spawned outlives it.
+# With `limits` (runner.sandbox.Limits) its rlimits are set before exec
+# (a JVM also gets its heap flag) and stdout/stderr are kept up to
+# limits.output bytes each.
+
+class ProcessResult:
+    __slots__ = (
+        "stdout", "stderr", "returncode", "timed_out",
+        "wall_time", "user_time", "system_time",
+        "peak_rss_kb", "memory_samples", "output_truncated"
+    )
+
+    def __init__(self):
+        self.stdout = ""
+        self.stderr = ""
+        self.returncode = None
+        self.timed_out = False
+        self.wall_time = 0.0
+        self.user_time = 0.0
+        self.system_time = 0.0
+        self.peak_rss_kb = None
+        self.memory_samples = None
+        self.output_truncated = False
+
+
+def run_process(command, user_input, cwd, timeout, sample_interval=None, limits=None):
+    result = ProcessResult()
+
+    launch = launcher.launch(limits.command(command) if limits is not None else command)
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(
+            launch.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            start_new_session=True,
+            pass_fds=launch.pass_fds,
+            preexec_fn=limits.preexec(timeout) if limits is not None else None
+        )
+    except BaseException:
+        launch.close()
+        raise
+    launch.started()
+    pipes = pipe_ids(process.stdin.fileno(), process.stdout.fileno(), process.stderr.fileno())
+
+    output_limit = limits.output if limits is not None else float("inf")
+    stdout = OutputBuffer(output_limit)
+    stderr = OutputBuffer(output_limit)
+
+    threads = [
+        threading.Thread(target=_feed, args=(process.stdin, user_input)),
+        threading.Thread(target=_drain, args=(process.stdout, stdout)),
+        threading.Thread(target=_drain, args=(process.stderr, stderr))
+    ]
+
+    finished = threading.Event()
+
+    if sample_interval:
+        result.memory_samples = []
+        threads.append(threading.Thread(
+            target=_sample,
+            args=(launch, process.pid, start, sample_interval, finished, result.memory_samples)
+        ))
+
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    reap_lock = threading.Lock()
+
+    def on_timeout():
+        with reap_lock:
+            if not finished.is_set():
+                result.timed_out = True
+                kill_group(process.pid)
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
+
+    # Wait for exit without reaping (WNOWAIT), so the timeout kill can
+    # never hit a recycled pid; then reap with wait4 to collect rusage.
+    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    result.wall_time = time.perf_counter() - start
+
+    with reap_lock:
+        finished.set()
+    timer.cancel()
+
+    # Still unreaped, so the group id cannot have been reused yet
+    kill_group(process.pid)
+
+    _, status, rusage = os.wait4(process.pid, 0)
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # The pipes end once everything holding them is gone. A process that
+    # left the group (setsid) can keep them open, so the wait is bounded
+    # by the job's deadline: past it, the run has timed out and whatever
+    # still holds the pipes is killed. Reader threads that still do not
+    # finish are left behind rather than waited for.
+    _join(threads, max(start + timeout, time.perf_counter() + DRAIN_GRACE))
+
+    if any(thread.is_alive() for thread in threads):
+        result.timed_out = True
+        kill_session(process.pid, pipes)
+        _join(threads, time.perf_counter() + DRAIN_GRACE)
+
+    result.returncode = process.returncode
+    result.stdout = stdout.text()
+    result.stderr = stderr.text()
+    result.output_truncated = stdout.truncated or stderr.truncated
+    result.user_time = rusage.ru_utime
+    result.system_time = rusage.ru_stime
+    # wait4's ru_maxrss would be the launcher's, which starts out with
+    # the server's resident size
+    maxrss = launch.maxrss()
+    result.peak_rss_kb = maxrss_kb(maxrss) if maxrss is not None else None
+
+    return result
+
+
+# ---- Helpers ----
+
+def _feed(pipe, data):
+    try:
+        if data:
+            pipe.write(data.encode())
+    except (BrokenPipeError, OSError):
+        pass
+    finally:
+        try:
+            pipe.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+
+def _join(threads, deadline):
+    for thread in threads:
+        thread.join(max(deadline - time.perf_counter(), 0))
+
+
+def _drain(pipe, buffer):
+    with pipe:
+        for chunk in iter(lambda: pipe.read1(65536), b""):
+            buffer.write(chunk)
+
+
+def _sample(launch, pid, start, interval, finished, samples):
+    import psutil  # only profiled runs sample memory
+
+    try:
+        process = psutil.Process(pid)
+        program = None
+        while not finished.is_set():
+            program = program or launch.program(process)
+            if program is not None:
+                rss = program.memory_info().rss // 1024
+                samples.append([round(time.perf_counter() - start, 6), rss])
+            finished.wait(interval)
+    except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+        pass
+
+
+def maxrss_kb(maxrss):
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    if os.uname().sysname == "Darwin":
+        return maxrss // 1024
+    return maxrss
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import threading
+
+from runner.profiler import ProcessResult, maxrss_kb
+from runner.python_worker import read_frame, write_frame
+from runner.worker_pool import RESPONSE_GRACE, WorkerPool
+
+
+# Workers run `-m runner.python_worker` from the backend directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class PythonWorker:
+    # One warm interpreter running runner/python_worker.py
+
+    def __init__(self, python):
+        self.process = subprocess.Popen(
+            [python, "-m", "runner.python_worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=BACKEND_DIR,
+            start_new_session=True
+        )
+        self.jobs = 0
+        self.healthy = True
+        self.stalled = False
+
+        # Blocks until the interpreter is up, so an idle worker is warm
+        if read_frame(self.process.stdout.fileno()) is None:
+            self.close()
+            raise RuntimeError("Python worker failed to start")
+
+    def run(self, path, user_input, cwd, timeout, limits):
+        # -> the worker's reply, or None if it died or stopped answering
+        self.jobs += 1
+
+        timer = threading.Timer(timeout + RESPONSE_GRACE, self.stall)
+        timer.start()
+
+        try:
+            write_frame(self.process.stdin.fileno(), {
+                "path": path,
+                "cwd": cwd,
+                "stdin": user_input or "",
+                "timeout": timeout,
+                "limits": limits.to_dict()
+            })
+            reply = read_frame(self.process.stdout.fileno())
+        except (OSError, ValueError):
+            reply = None
+        finally:
+            timer.cancel()
+
+        if reply is None or reply["recycle"]:
+            self.healthy = False
+        return reply
+
+    def stall(self):
+        self.stalled = True
+        self.kill()
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        self.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+
+
+class PythonWorkerPool(WorkerPool):
+    # Pre-started Python interpreters; a miss falls back to a cold
+    # `python main.py`. Workers are also retired when a job leaves
+    # processes behind.
+
+    def __init__(self, size, max_jobs=100, python="python"):
+        super().__init__(size, max_jobs)
+        self.python = python
+
+    def _new_worker(self):
+        return PythonWorker(self.python)
+
+    def _result(self, reply):
+        result = ProcessResult()
+        result.stdout = reply["stdout"]
+        result.stderr = reply["stderr"]
+        result.returncode = reply["returncode"]
+        result.timed_out = reply["timed_out"]
+        result.wall_time = reply["wall_time"]
+        result.user_time = reply["user_time"]
+        result.system_time = reply["system_time"]
+        result.peak_rss_kb = maxrss_kb(reply["maxrss"])
+        result.output_truncated = reply["output_truncated"]
+        return result
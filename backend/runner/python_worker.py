@@ -0,0 +1,262 @@
+import atexit
+import json
+import os
+import select
+import struct
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+from runner.sandbox import DRAIN_GRACE, Limits, OutputBuffer, apply_limits, kill_group, kill_session, pipe_ids
+
+
+# Warm Python worker, started by runner.python_pool as
+# `python -m runner.python_worker`. It imports nothing but the standard
+# library and runner.sandbox, then serves jobs over its stdin/stdout: each job is
+# run in a child forked from this already-initialized interpreter, so
+# the child skips interpreter startup but still gets a fresh process,
+# a fresh __main__ namespace and its own resource usage. The worker
+# never runs user code itself.
+#
+# Frames are a 4-byte big-endian length followed by JSON.
+
+HEADER = struct.Struct(">I")
+
+
+def read_frame(fd):
+    header = _read_exact(fd, HEADER.size)
+    if header is None:
+        return None
+    return json.loads(_read_exact(fd, HEADER.unpack(header)[0]))
+
+
+def write_frame(fd, message):
+    data = json.dumps(message).encode()
+    data = HEADER.pack(len(data)) + data
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def _read_exact(fd, size):
+    chunks = []
+    while size:
+        chunk = os.read(fd, size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+# ============================================================
+# Child: runs one program
+# ============================================================
+
+def run_child(job, stdin_fd, stdout_fd, stderr_fd, inherited):
+    # Own process group, so the worker can kill whatever the program spawns
+    os.setpgid(0, 0)
+
+    os.dup2(stdin_fd, 0)
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+
+    for fd in inherited:
+        os.close(fd)
+
+    apply_limits(Limits.from_dict(job["limits"]), job["timeout"])
+
+    path = job["path"]
+    os.chdir(job["cwd"])
+    sys.argv = [path]
+    sys.path[0] = job["cwd"]
+
+    main = types.ModuleType("__main__")
+    main.__file__ = path
+    sys.modules["__main__"] = main
+
+    status = 0
+
+    try:
+        with open(path, "rb") as f:
+            code = compile(f.read(), path, "exec")
+        exec(code, main.__dict__)
+
+    except SystemExit as e:
+        status = _exit_status(e.code)
+
+    except SyntaxError as e:
+        traceback.print_exception(type(e), e, None)
+        status = 1
+
+    except BaseException as e:
+        # Drop this frame so the traceback starts at the user's module
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        status = 1
+
+    # The shutdown steps of a cold `python main.py` that the program can
+    # observe: join non-daemon threads, run atexit handlers, flush stdio.
+    # A full interpreter finalization would add ~10 ms per job.
+    threading = sys.modules.get("threading")
+    if threading is not None:
+        threading._shutdown()
+
+    atexit._run_exitfuncs()
+
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            status = status or 120
+
+    os._exit(status)
+
+
+def _exit_status(code):
+    # Same mapping as the interpreter applies to SystemExit
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code & 0xFF
+    print(code, file=sys.stderr)
+    return 1
+
+
+# ============================================================
+# Worker loop
+# ============================================================
+
+def supervise(pid, stdout_fd, stderr_fd, timeout, output_limit):
+    # Drains the job's stdout/stderr pipes into bounded buffers until it
+    # exits or times out. Waits on a pidfd where the kernel has one,
+    # otherwise polls. -> (status, rusage, timed_out, contaminated,
+    # stdout, stderr)
+    deadline = time.monotonic() + timeout
+    buffers = {stdout_fd: OutputBuffer(output_limit), stderr_fd: OutputBuffer(output_limit)}
+    streams = [stdout_fd, stderr_fd]
+    pipes = pipe_ids(stdout_fd, stderr_fd)
+    timed_out = False
+    pidfd = None
+
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pass
+
+    while True:
+        waited, status, rusage = os.wait4(pid, os.WNOHANG)
+        if waited:
+            break
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            kill_group(pid)
+            timed_out = True
+            _, status, rusage = os.wait4(pid, 0)
+            break
+
+        waitables = streams + [pidfd] if pidfd is not None else streams
+        ready, _, _ = select.select(waitables, [], [], remaining if pidfd is not None else min(remaining, 0.005))
+        for fd in ready:
+            if fd != pidfd:
+                _read_into(fd, buffers, streams)
+
+    if pidfd is not None:
+        os.close(pidfd)
+
+    # A process left over from the job means this worker is no longer
+    # clean: it is killed here and the worker retired. Once the group is
+    # gone the pipes reach EOF, unless a process that left the group
+    # (setsid) holds them: past the deadline the job has timed out, and
+    # everything else in this worker's session or holding the pipes is
+    # killed. Pipes that still do not end are closed unread.
+    contaminated = kill_group(pid)
+
+    end = max(deadline, time.monotonic() + DRAIN_GRACE)
+    killed = False
+    while streams:
+        ready, _, _ = select.select(streams, [], [], max(end - time.monotonic(), 0))
+        if ready:
+            _read_into(ready[0], buffers, streams)
+            continue
+        if killed:
+            for fd in streams:
+                os.close(fd)
+            break
+        timed_out = contaminated = killed = True
+        kill_session(os.getsid(0), pipes)
+        end = time.monotonic() + DRAIN_GRACE
+
+    return status, rusage, timed_out, contaminated, buffers[stdout_fd], buffers[stderr_fd]
+
+
+def _read_into(fd, buffers, streams):
+    chunk = os.read(fd, 65536)
+    if chunk:
+        buffers[fd].write(chunk)
+    else:
+        streams.remove(fd)
+        os.close(fd)
+
+
+def main():
+    # Keep the protocol off fds 0/1 so stray writes cannot corrupt it
+    channel_in = os.dup(0)
+    channel_out = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    write_frame(channel_out, {"ready": True, "pid": os.getpid()})
+
+    while True:
+        job = read_frame(channel_in)
+        if job is None:
+            return
+
+        # stdin comes from an unlinked file, output through pipes so
+        # RLIMIT_FSIZE only applies to files the program writes itself
+        stdin_file = tempfile.TemporaryFile()
+        stdin_file.write(job["stdin"].encode())
+        stdin_file.seek(0)
+
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+
+        start = time.perf_counter()
+        pid = os.fork()
+
+        if pid == 0:
+            run_child(
+                job, stdin_file.fileno(), stdout_write, stderr_write,
+                (channel_in, channel_out, stdout_read, stdout_write, stderr_read, stderr_write)
+            )
+
+        os.close(stdout_write)
+        os.close(stderr_write)
+        stdin_file.close()
+
+        status, rusage, timed_out, contaminated, stdout, stderr = supervise(
+            pid, stdout_read, stderr_read, job["timeout"], job["limits"]["output"]
+        )
+        wall_time = time.perf_counter() - start
+
+        write_frame(channel_out, {
+            "stdout": stdout.text(),
+            "stderr": stderr.text(),
+            "output_truncated": stdout.truncated or stderr.truncated,
+            "returncode": os.waitstatus_to_exitcode(status),
+            "timed_out": timed_out,
+            "wall_time": wall_time,
+            "user_time": rusage.ru_utime,
+            "system_time": rusage.ru_stime,
+            "maxrss": rusage.ru_maxrss,
+            "recycle": contaminated
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import math
+import os
+import resource
+import signal
+
+
+# Resource limits for executed programs. They are applied in the child
+# between fork and exec (or, for warm Python workers, in the forked job
+# process) and set soft = hard so the program cannot raise them again.
+# The CPU hard limit is one second above the soft one: the soft limit
+# sends SIGXCPU, the hard one SIGKILL.
+#
+# RLIMIT_NPROC counts every process and thread of the user the server
+# runs as, not just the job's own; run the server as a dedicated user
+# for it to be a per-job bound. Root ignores it.
+
+MB = 1024 * 1024
+
+
+# Threads a JVM starts before main() (GC, JIT compilers, signal
+# dispatcher, ...), allowed on top of the job's process limit
+JVM_THREADS = 64
+
+
+class Limits:
+    __slots__ = ("address_space", "cpu_time", "processes", "file_size", "output", "heap")
+
+    def __init__(self, address_space=512 * MB, cpu_time=None, processes=256, file_size=16 * MB, output=MB,
+                 heap=None):
+        self.address_space = address_space  # bytes of virtual memory
+        self.cpu_time = cpu_time            # seconds; None derives it from the wall timeout
+        self.processes = processes
+        self.file_size = file_size          # largest file the program may write
+        self.output = output                # bytes kept per stream (stdout, stderr)
+        self.heap = heap                    # JVM -Xmx in bytes; None for other runtimes
+
+    def for_language(self, language):
+        if language != "java":
+            return self
+
+        # The JVM reserves far more address space than it touches (the
+        # heap, code cache and class space up front), so RLIMIT_AS would
+        # stop it before main(). Memory is bounded by -Xmx instead, at the
+        # same size; the process limit makes room for the JVM's threads.
+        return Limits(
+            None,
+            self.cpu_time,
+            self.processes + JVM_THREADS if self.processes is not None else None,
+            self.file_size,
+            self.output,
+            heap=self.address_space
+        )
+
+    def command(self, command):
+        # `command` with the runtime's own memory flag, for a JVM
+        if self.heap is None:
+            return command
+        return [command[0], jvm_heap_option(self.heap), *command[1:]]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    def preexec(self, timeout):
+        # For subprocess.Popen(preexec_fn=...): runs in the child, so it
+        # only calls setrlimit.
+        return lambda: apply_limits(self, timeout)
+
+
+def jvm_heap_option(heap):
+    return f"-Xmx{max(heap // MB, 1)}m"
+
+
+def apply_limits(limits, timeout):
+    cpu_time = limits.cpu_time or math.ceil(timeout) + 1
+
+    for name, value in (
+        (resource.RLIMIT_AS, limits.address_space),
+        (resource.RLIMIT_CPU, cpu_time),
+        (resource.RLIMIT_NPROC, limits.processes),
+        (resource.RLIMIT_FSIZE, limits.file_size)
+    ):
+        if value is None:
+            continue
+
+        soft = value
+        hard = value + 1 if name == resource.RLIMIT_CPU else value
+
+        _, current = resource.getrlimit(name)
+        if current != resource.RLIM_INFINITY:
+            soft, hard = min(soft, current), min(hard, current)
+        resource.setrlimit(name, (soft, hard))
+
+
+def kill_group(pid):
+    # True if any process of the group was still alive
+    try:
+        os.killpg(pid, signal.SIGKILL)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+# Seconds the output pipes get to reach EOF after the job exits at its
+# deadline, and again once kill_session has run
+DRAIN_GRACE = 0.25
+
+
+def pipe_ids(*fds):
+    # Identities of pipes, for kill_session
+    return {f"pipe:[{os.fstat(fd).st_ino}]" for fd in fds}
+
+
+def kill_session(session, pipes=()):
+    # What kill_group misses: processes of the job that moved to another
+    # group (setpgid) are still in its session; ones that also left the
+    # session (setsid) are found by the job's pipes they hold open. Scans
+    # /proc, so it is only called when a job's output does not end by
+    # its deadline. The caller itself is never killed. True if any
+    # process was found.
+    found = False
+    own = os.getpid()
+
+    try:
+        pids = [int(name) for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return False
+
+    for pid in pids:
+        if pid == own:
+            continue
+        try:
+            if session is not None and os.getsid(pid) == session or _holds(pid, pipes):
+                os.kill(pid, signal.SIGKILL)
+                found = True
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    return found
+
+
+def _holds(pid, pipes):
+    if not pipes:
+        return False
+    directory = f"/proc/{pid}/fd"
+    try:
+        for fd in os.listdir(directory):
+            try:
+                if os.readlink(os.path.join(directory, fd)) in pipes:
+                    return True
+            except OSError:
+                pass
+    except OSError:
+        pass
+    return False
+
+
+# ============================================================
+# Bounded output
+# ============================================================
+
+class OutputBuffer:
+    # Keeps the first `limit` bytes of a stream and counts the rest. The
+    # stream is still drained to the end so the program never blocks on
+    # a full pipe.
+
+    __slots__ = ("limit", "chunks", "size", "dropped")
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.chunks = []
+        self.size = 0
+        self.dropped = 0
+
+    def write(self, chunk):
+        room = max(self.limit - self.size, 0)
+        if len(chunk) > room:
+            self.dropped += len(chunk) - room
+            chunk = chunk[:room]
+        if chunk:
+            self.chunks.append(chunk)
+            self.size += len(chunk)
+
+    @property
+    def truncated(self):
+        return self.dropped > 0
+
+    def text(self):
+        text = b"".join(self.chunks).decode(errors="replace")
+        if self.dropped:
+            text += f"\n... [output truncated: {self.dropped} more bytes]"
+        return text
+
+
+# Exit codes of a program killed by the kernel for hitting a limit
+LIMIT_EXIT_CODES = {
+    -signal.SIGXCPU: "CPU time limit exceeded",
+    -signal.SIGXFSZ: "File size limit exceeded"
+}
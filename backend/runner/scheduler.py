@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobScheduler:
+    # Runs blocking jobs (compile + execute) on a bounded thread pool so the
+    # event loop never waits on a child process. At most `max_concurrency`
+    # jobs run at once and at most `max_queue` more may wait; anything past
+    # that is rejected immediately instead of piling up.
+
+    def __init__(self, max_concurrency, max_queue):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="algolens-run"
+        )
+
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.running = 0
+        self.rejected = 0
+        self.completed = 0
+
+    @property
+    def queued(self):
+        return self.pending - self.running
+
+    async def submit(self, func, *args, **kwargs):
+        if self.pending >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise QueueFullError("Execution queue is full, try again later.")
+
+        self.pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor,
+                self._run,
+                func,
+                args,
+                kwargs
+            )
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def _run(self, func, args, kwargs):
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
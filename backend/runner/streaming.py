@@ -0,0 +1,314 @@
+import asyncio
+import codecs
+import os
+import subprocess
+import threading
+import time
+
+from runner.launcher import launcher
+from runner.profiler import maxrss_kb
+from runner.sandbox import DRAIN_GRACE, LIMIT_EXIT_CODES, kill_group, kill_session, pipe_ids
+
+
+# Maximum stdin the client may have in flight before the program reads it
+MAX_PENDING_INPUT = 1024 * 1024
+
+# Output reads pause while this many messages wait for a slow client;
+# the program then blocks on its full pipe instead of the server
+# buffering for it.
+MAX_QUEUED_EVENTS = 64
+
+
+class StreamingRun:
+    # A child process whose stdout/stderr are forwarded as they arrive.
+    #
+    # The pipes are non-blocking and read from event loop callbacks.
+    # `next_event()` returns the messages for the client, in order:
+    #
+    #   {"type": "stdout" | "stderr", "data": ...}
+    #   {"type": "sample", "time": ..., "cpu_time": ..., "memory_kb": ...}
+    #   {"type": "exit", ...}        always last
+    #
+    # The blocking part, starting the program and waiting for it to exit,
+    # is `run()`, meant to run on a JobScheduler thread so streamed runs
+    # count against the same concurrency limit as /run. `started` is set
+    # once the program has a slot and has been started (or failed to).
+
+    def __init__(self, command, cwd, timeout, limits, sample_interval=0.1):
+        self.command = command
+        self.cwd = cwd
+        self.timeout = timeout
+        self.limits = limits
+        self.sample_interval = sample_interval
+
+        self.events = asyncio.Queue()
+        self.launch = None
+        self.process = None
+        self.start_time = None
+        self.timed_out = False
+        self.reaped = False
+        self.reap_lock = threading.Lock()
+
+        self.pending_input = b""
+        self.input_closing = False
+
+        self.forwarded = {}             # stream -> bytes sent
+        self.dropped = {}               # stream -> bytes over the output limit
+        self.decoders = {}
+        self.pipes = {}
+        self.pipe_ids = set()
+        self.open_streams = set()
+        self.streams_closed = None
+        self.started = asyncio.Event()
+        self.paused = False
+        self.discarding = False
+
+    # ---- Lifecycle ----
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.streams_closed = asyncio.Event()
+        self.launch = launcher.launch(self.limits.command(self.command))
+        self.start_time = time.perf_counter()
+
+        try:
+            self.process = subprocess.Popen(
+                self.launch.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.cwd,
+                start_new_session=True,
+                pass_fds=self.launch.pass_fds,
+                preexec_fn=self.limits.preexec(self.timeout)
+            )
+        except BaseException:
+            self.launch.close()
+            raise
+        self.launch.started()
+        self.pipe_ids = pipe_ids(self.process.stdin.fileno(), self.process.stdout.fileno(), self.process.stderr.fileno())
+
+        for name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            os.set_blocking(pipe.fileno(), False)
+            self.forwarded[name] = 0
+            self.dropped[name] = 0
+            self.decoders[name] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            self.pipes[name] = pipe
+            self.open_streams.add(name)
+            self.loop.add_reader(pipe.fileno(), self._read, name)
+
+        os.set_blocking(self.process.stdin.fileno(), False)
+
+        self.timer = self.loop.call_later(self.timeout, self._on_timeout)
+        self.sampler = self.loop.create_task(self._sample())
+
+    def run(self, loop):
+        # Blocking: starts the program on `loop`, then wait()s for it
+        asyncio.run_coroutine_threadsafe(self._start(), loop).result()
+        return self.wait()
+
+    async def _start(self):
+        try:
+            self.start()
+        finally:
+            self.started.set()
+
+    def wait(self):
+        # Blocking: returns (status, rusage) once the child has exited.
+        # The child is left unreaped until its process group is killed,
+        # so the group id cannot be reused in between.
+        os.waitid(os.P_PID, self.process.pid, os.WEXITED | os.WNOWAIT)
+
+        with self.reap_lock:
+            kill_group(self.process.pid)
+            _, status, rusage = os.wait4(self.process.pid, 0)
+            self.reaped = True
+
+        return status, rusage
+
+    async def finish(self, status, rusage):
+        # After wait(): flush the remaining output, then emit "exit"
+        wall_time = time.perf_counter() - self.start_time
+        self.timer.cancel()
+        self.sampler.cancel()
+        self._close_input()
+
+        # A process that left the group (setsid) can hold the pipes open
+        # after the program exits; the wait for them ends at the job's
+        # deadline, like the run itself
+        remaining = self.start_time + self.timeout - time.perf_counter()
+        if not await self._streams_closed(max(remaining, DRAIN_GRACE)):
+            self.timed_out = True
+            await self.loop.run_in_executor(None, kill_session, self.process.pid, self.pipe_ids)
+            if not await self._streams_closed(DRAIN_GRACE):
+                self._close_streams()
+
+        returncode = os.waitstatus_to_exitcode(status)
+        self.process.returncode = returncode
+
+        # The program's own peak, reported by the launcher; rusage's is
+        # the launcher's (see runner/launcher.py)
+        maxrss = self.launch.maxrss()
+
+        await self.events.put({
+            "type": "exit",
+            "exit_code": returncode,
+            "timed_out": self.timed_out,
+            "limit_exceeded": LIMIT_EXIT_CODES.get(returncode),
+            "execution_time": round(wall_time, 6),
+            "cpu_time": round(rusage.ru_utime + rusage.ru_stime, 6),
+            "memory_usage_kb": maxrss_kb(maxrss) if maxrss is not None else None,
+            "output_truncated": any(self.dropped.values()),
+            "dropped_bytes": self.dropped
+        })
+
+    async def next_event(self):
+        event = await self.events.get()
+
+        if self.paused and self.events.qsize() < MAX_QUEUED_EVENTS // 2:
+            self._resume()
+
+        return event
+
+    def discard_output(self):
+        # The client is gone: keep draining the pipes so finish() can
+        # complete, but queue nothing more
+        self.discarding = True
+        if self.paused:
+            self._resume()
+
+    def kill(self):
+        with self.reap_lock:
+            if self.process is not None and not self.reaped:
+                kill_group(self.process.pid)
+
+    # ---- stdin ----
+
+    def write_input(self, data):
+        if self.input_closing:
+            return
+
+        self.pending_input += data.encode()
+        if len(self.pending_input) > MAX_PENDING_INPUT:
+            raise ValueError("Too much unread input; the program is not reading stdin")
+
+        self._flush_input()
+
+    def close_input(self):
+        self.input_closing = True
+        if not self.pending_input:
+            self._close_input()
+
+    def _flush_input(self):
+        stdin = self.process.stdin
+        if stdin.closed:
+            return
+
+        try:
+            while self.pending_input:
+                written = os.write(stdin.fileno(), self.pending_input)
+                self.pending_input = self.pending_input[written:]
+        except BlockingIOError:
+            self.loop.add_writer(stdin.fileno(), self._flush_input)
+            return
+        except OSError:
+            # The program closed stdin or exited
+            self.pending_input = b""
+
+        self.loop.remove_writer(stdin.fileno())
+        if self.input_closing:
+            self._close_input()
+
+    def _close_input(self):
+        stdin = self.process.stdin
+        if not stdin.closed:
+            self.loop.remove_writer(stdin.fileno())
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    # ---- Output ----
+
+    def _read(self, name):
+        pipe = self.pipes[name]
+        try:
+            chunk = os.read(pipe.fileno(), 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""
+
+        if not chunk:
+            self.loop.remove_reader(pipe.fileno())
+            pipe.close()
+            self._emit(name, self.decoders[name].decode(b"", final=True))
+            self.open_streams.discard(name)
+            if not self.open_streams:
+                self.streams_closed.set()
+            return
+
+        # Past the output limit the stream is still drained, not sent
+        room = max(self.limits.output - self.forwarded[name], 0)
+        if len(chunk) > room:
+            self.dropped[name] += len(chunk) - room
+            chunk = chunk[:room]
+
+        self.forwarded[name] += len(chunk)
+        self._emit(name, self.decoders[name].decode(chunk))
+
+        if self.events.qsize() >= MAX_QUEUED_EVENTS and not (self.paused or self.discarding):
+            self.paused = True
+            for stream in self.open_streams:
+                self.loop.remove_reader(self.pipes[stream].fileno())
+
+    async def _streams_closed(self, timeout):
+        try:
+            await asyncio.wait_for(self.streams_closed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _close_streams(self):
+        # Stop reading pipes that never reach EOF
+        for name in list(self.open_streams):
+            pipe = self.pipes[name]
+            self.loop.remove_reader(pipe.fileno())
+            pipe.close()
+            self.open_streams.discard(name)
+        self.streams_closed.set()
+
+    def _emit(self, name, text):
+        if text and not self.discarding:
+            self.events.put_nowait({"type": name, "data": text})
+
+    def _resume(self):
+        self.paused = False
+        for name in self.open_streams:
+            self.loop.add_reader(self.pipes[name].fileno(), self._read, name)
+
+    # ---- Timeout and samples ----
+
+    def _on_timeout(self):
+        self.timed_out = True
+        self.kill()
+
+    async def _sample(self):
+        import psutil
+
+        try:
+            process = psutil.Process(self.process.pid)
+            program = None
+            while True:
+                program = program or self.launch.program(process)
+                if program is not None:
+                    cpu = program.cpu_times()
+                    await self.events.put({
+                        "type": "sample",
+                        "time": round(time.perf_counter() - self.start_time, 6),
+                        "cpu_time": round(cpu.user + cpu.system, 6),
+                        "memory_kb": program.memory_info().rss // 1024
+                    })
+                await asyncio.sleep(self.sample_interval)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            pass
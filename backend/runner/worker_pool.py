@@ -0,0 +1,182 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from runner.profiler import ProcessResult
+
+
+# Extra time a worker gets to answer after the job's own timeout
+RESPONSE_GRACE = 5.0
+
+
+class WorkerPool:
+    # Pre-started worker processes for /run. A job takes an idle worker
+    # (a pool hit) or, when none is free, falls back to a cold run by the
+    # caller. Workers are retired after `max_jobs` jobs, when a job
+    # leaves them unclean, or when they stop answering; replacements
+    # start in the background. A job whose worker dies under it fails
+    # rather than running cold, as the program may already have run.
+    #
+    # Subclasses provide _new_worker() and _result(reply). A worker has
+    # `jobs`, `healthy`, `stalled` (killed for not answering), `process`,
+    # run(*job) -> reply or None, and close().
+
+    def __init__(self, size, max_jobs=100):
+        self.size = size
+        self.max_jobs = max_jobs
+
+        self._lock = threading.Lock()
+        self._idle = []
+        self._busy = 0
+        self._starting = 0
+        self._closed = False
+
+        self.hits = 0
+        self.cold_starts = 0
+        self.recycled = 0
+        self.failures = 0
+
+    def start(self):
+        self._refill()
+
+    def run(self, *job):
+        # -> the result from a warm worker, or None for a cold start when
+        # no worker was free
+        with self._lock:
+            worker = self._take()
+            if worker is None:
+                self.cold_starts += 1
+
+        if worker is None:
+            self._refill()
+            return None
+
+        start = time.perf_counter()
+        try:
+            result = self._run_on(worker, *job)
+        finally:
+            self._release(worker)
+
+        if result is None:
+            result = self._failed(worker, time.perf_counter() - start)
+        return result
+
+    @contextmanager
+    def reserve(self):
+        # Holds one warm worker for a series of jobs, so every job of the
+        # series (e.g. benchmark runs) is measured the same way. Yields a
+        # run(*job) function that returns None if the worker fails. Starts
+        # a worker when none is idle.
+        with self._lock:
+            worker = self._take()
+
+        if worker is None:
+            worker = self._new_worker()
+            with self._lock:
+                self._busy += 1
+
+        try:
+            yield lambda *args: self._run_on(worker, *args)
+        finally:
+            self._release(worker)
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.cold_starts
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "starting": self._starting,
+                "max_jobs": self.max_jobs,
+                "hits": self.hits,
+                "cold_starts": self.cold_starts,
+                "recycled": self.recycled,
+                "failures": self.failures,
+                "hit_rate": round(self.hits / requests, 4) if requests else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for worker in idle:
+            worker.close()
+
+    # ---- Subclasses ----
+
+    def _new_worker(self):
+        # Blocks until the worker is ready; raises OSError or RuntimeError
+        raise NotImplementedError
+
+    def _result(self, reply):
+        raise NotImplementedError
+
+    # ---- Internals ----
+
+    def _take(self):
+        # Caller holds self._lock
+        if not self._idle:
+            return None
+        self._busy += 1
+        return self._idle.pop()
+
+    def _failed(self, worker, wall_time):
+        # The result of a job whose worker died or was killed; after
+        # _release(), so the worker has exited
+        result = ProcessResult()
+        result.stderr = "The worker running this program stopped before the program finished."
+        result.returncode = worker.process.poll()
+        result.timed_out = worker.stalled
+        result.wall_time = wall_time
+        return result
+
+    def _run_on(self, worker, *job):
+        reply = worker.run(*job)
+
+        with self._lock:
+            if reply is None:
+                self.failures += 1
+                return None
+            self.hits += 1
+
+        return self._result(reply)
+
+    def _release(self, worker):
+        with self._lock:
+            self._busy -= 1
+            if not worker.healthy or worker.jobs >= self.max_jobs:
+                self.recycled += 1
+            elif not self._closed and len(self._idle) + self._busy < self.size:
+                self._idle.append(worker)
+                worker = None
+
+        if worker is not None:
+            worker.close()
+            self._refill()
+
+    def _refill(self):
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - len(self._idle) - self._busy - self._starting
+            self._starting += max(missing, 0)
+
+        for _ in range(missing):
+            threading.Thread(target=self._spawn, daemon=True).start()
+
+    def _spawn(self):
+        try:
+            worker = self._new_worker()
+        except (OSError, RuntimeError):
+            worker = None
+
+        with self._lock:
+            self._starting -= 1
+            if worker is not None and not self._closed:
+                self._idle.append(worker)
+                worker = None
+
+        if worker is not None:
+            worker.close()
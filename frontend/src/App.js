@@ -44,6 +44,7 @@ const [userInput, setUserInput] = useState("");
 const [result, setResult] = useState(null);
 const [output, setOutput] = useState("");
 const [comparisonResult, setComparisonResult] = useState(null);
+const [nodeProfile, setNodeProfile] = useState({});
 
 const graphRef = useRef();
 
@@ -65,7 +66,7 @@ const runCode = async () => {
 
     if (data.execution_time !== undefined) {
       text += `\n\n⏱ Execution Time: ${data.execution_time} sec`;
-      text += `\n🧠 Memory Usage: ${data.memory_usage_kb} KB`;
+      text += `\n🧠 Memory Usage: ${formatMemory(data.memory_usage_kb)}`;
       text += `\n📈 Runtime Hint: ${data.runtime_hint}`;
     }
 
@@ -75,6 +76,43 @@ const runCode = async () => {
   }
 };
 
+/* ============================= LINE PROFILE ============================= */
+
+// Python only: runs with per-line profiling and shades the CFG nodes of
+// the last analysis by their share of the run time
+const profileCode = async () => {
+  try {
+    const res = await fetch("http://127.0.0.1:8000/run", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ code, language, user_input: userInput, line_profile: true })
+    });
+
+    const data = await res.json();
+    const profile = data.line_profile || {};
+
+    if (profile.error) {
+      setNodeProfile({});
+      setOutput((data.stderr ? "Error:\n" + data.stderr + "\n\n" : "") + profile.error);
+      return;
+    }
+
+    setNodeProfile(Object.fromEntries(profile.nodes.map(n => [n.id, n])));
+
+    const hottest = profile.nodes
+      .filter(n => profile.hotspots.includes(n.id))
+      .sort((a, b) => b.time_ms - a.time_ms)
+      .map(n => `  Lines ${n.lineno}-${n.end_lineno}: ${n.time_ms} ms, ${n.hits} hits`);
+
+    let text = data.stderr ? "Error:\n" + data.stderr : data.stdout || "";
+    text += `\n\n🔥 Hotspots (${profile.mode}${profile.complete ? "" : ", partial"}):\n${hottest.join("\n")}`;
+    text += `\n🧠 Peak traced allocations: ${profile.peak_alloc_kb} KB`;
+    setOutput(text);
+  } catch {
+    setOutput("Backend connection failed.");
+  }
+};
+
 /* ============================= ANALYZE ============================= */
 
 const analyzeCode = async () => {
@@ -91,23 +129,33 @@ const analyzeCode = async () => {
 
 /* ============================= COMPARE ============================= */
 
+// Peak memory is unknown (null) for warm JVM runs
+const formatMemory = (kb) => (kb == null ? "n/a" : `${kb} KB`);
+
 const compareAlgorithms = async () => {
-  const resA = await fetch("http://127.0.0.1:8000/run", {
+  const res = await fetch("http://127.0.0.1:8000/benchmark", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ code, language, user_input: userInput })
+    body: JSON.stringify({ language, candidates: [code, codeB], user_input: userInput })
   });
 
-  const resB = await fetch("http://127.0.0.1:8000/run", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ code: codeB, language, user_input: userInput })
-  });
+  const data = await res.json();
+
+  if (data.error || !data.candidates) {
+    setComparisonResult({ error: data.error || data.detail || "Benchmark failed" });
+    return;
+  }
 
-  const dataA = await resA.json();
-  const dataB = await resB.json();
+  // Medians over the benchmark runs; the verdict comes from the CPU time test
+  const [a, b] = data.candidates;
+  const verdict = data.comparisons.find((c) => c.metric === "cpu_time");
 
-  setComparisonResult({ A: dataA, B: dataB });
+  setComparisonResult({
+    A: { execution_time: a.wall_time.median, cpu_time: a.cpu_time.median, memory_usage_kb: a.memory_usage_kb?.median ?? null },
+    B: { execution_time: b.wall_time.median, cpu_time: b.cpu_time.median, memory_usage_kb: b.memory_usage_kb?.median ?? null },
+    runs: data.runs,
+    verdict
+  });
 };
 
 /* ============================= CFG LOGIC ============================= */
@@ -166,6 +214,7 @@ return (
     setLanguage(selected);
     setCode(templates[selected]);
     setResult(null);
+    setNodeProfile({});
   }}
   style={dropdownStyle}
 >
@@ -194,6 +243,9 @@ return (
 <div style={centerBtn}>
   <button style={analyzeBtn} onClick={analyzeCode}>Analyze</button>
   <button style={runBtn} onClick={runCode}>Run</button>
+  {language === "python" && (
+    <button style={runBtn} onClick={profileCode}>Profile</button>
+  )}
 </div>
 
 {/* ================= ANALYSIS CARDS ================= */}
@@ -235,6 +287,7 @@ return (
       name: n.label,
       lineno: n.lineno,
       type: getNodeType(n.label),
+      profile: nodeProfile[n.id],
 
       // ✅ Proper structured vertical layout
       fx: 0,
@@ -246,9 +299,12 @@ return (
 
   nodeThreeObject={(node) => {
     const geometry = new THREE.SphereGeometry(12, 32, 32);
+    // Profiled nodes shade from their type color towards red by heat
+    const color = new THREE.Color(getColor(node.type));
+    if (node.profile) color.lerp(new THREE.Color("#ff1744"), node.profile.heat);
     const material = new THREE.MeshStandardMaterial({
-      color: getColor(node.type),
-      emissive: getColor(node.type),
+      color,
+      emissive: color,
       emissiveIntensity: 0.5,
       roughness: 0.4,
       metalness: 0.1
@@ -256,7 +312,8 @@ return (
     return new THREE.Mesh(geometry, material);
   }}
 
-  nodeLabel={node => `${node.name}\nLine: ${node.lineno || "-"}`}
+  nodeLabel={node => `${node.name}\nLine: ${node.lineno || "-"}` +
+    (node.profile ? `\n${node.profile.time_ms} ms, ${node.profile.hits} hits` : "")}
 
   /* ✅ Professional Links */
   linkColor={() => "#00f0ff"}
@@ -301,37 +358,37 @@ return (
 <div style={battleCard}>
 <h2>🏆 Battle Result</h2>
 
-<p>⏱ A Time: {comparisonResult.A.execution_time ?? "N/A"} sec</p>
-<p>⏱ B Time: {comparisonResult.B.execution_time ?? "N/A"} sec</p>
-<p>🧠 A Memory: {comparisonResult.A.memory_usage_kb ?? "N/A"} KB</p>
-<p>🧠 B Memory: {comparisonResult.B.memory_usage_kb ?? "N/A"} KB</p>
+{comparisonResult.error ? (
+  <h2 style={{color:"#ffaa00"}}>⚠ {comparisonResult.error}</h2>
+) : (<>
+<p>⏱ A Time: {comparisonResult.A.execution_time} sec (CPU {comparisonResult.A.cpu_time} sec)</p>
+<p>⏱ B Time: {comparisonResult.B.execution_time} sec (CPU {comparisonResult.B.cpu_time} sec)</p>
+<p>🧠 A Memory: {formatMemory(comparisonResult.A.memory_usage_kb)}</p>
+<p>🧠 B Memory: {formatMemory(comparisonResult.B.memory_usage_kb)}</p>
+<p>Median of {comparisonResult.runs} runs each</p>
 
 {(() => {
-  const timeA = comparisonResult.A.execution_time;
-  const timeB = comparisonResult.B.execution_time;
-
-  if (timeA == null || timeB == null)
-    return <h2 style={{color:"#ffaa00"}}>⚠ Comparison unavailable</h2>;
-
-  const diff = Math.abs(timeA - timeB);
-  const tolerance = 0.005;
-  const percentDiff = ((diff / Math.max(timeA, timeB)) * 100).toFixed(2);
+  const { verdict } = comparisonResult;
+  const percentDiff = verdict.median_ratio == null
+    ? "N/A"
+    : (Math.abs(1 - verdict.median_ratio) * 100).toFixed(2);
 
-  if (diff < tolerance)
+  if (verdict.verdict === "no significant difference")
     return <>
-      <h2 style={{color:"#00e6ff"}}>🤝 Tie (Almost Same Performance)</h2>
-      <p>Performance Difference: {percentDiff}%</p>
+      <h2 style={{color:"#00e6ff"}}>🤝 Tie (No Significant Difference)</h2>
+      <p>Performance Difference: {percentDiff}% (p = {verdict.p_value})</p>
     </>;
 
-  const isAWinner = timeA < timeB;
+  const isAWinner = verdict.verdict === "candidate 0 is faster";
 
   return <>
     <h2 style={{color:isAWinner ? "#00ff99" : "#ff4d4d"}}>
       {isAWinner ? "🚀 Algorithm A Wins" : "🚀 Algorithm B Wins"}
     </h2>
-    <p>Performance Difference: {percentDiff}%</p>
+    <p>Performance Difference: {percentDiff}% (p = {verdict.p_value})</p>
   </>;
 })()}
+</>)}
 
 </div>
 )}